@@ -0,0 +1,211 @@
+# end-to-end control plane benchmark. Runs the real DroneControlRoute against the in-process mock
+# vehicle through flask-socketio test clients and reports handler latency (p50 / p99) for arm,
+# setalt, mode_switch and telemetry, plus fan-out throughput with N clients.
+#
+#   python scripts/benchmark.py --iterations 20 --clients 8
+#   python scripts/benchmark.py --json > bench.json
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC)
+
+from core.config.config import config  # noqa: E402
+
+
+def configure(args):
+    config["vehicle_backend"] = "mock"
+    config["server_mode"] = "development"
+    config["recorder_enabled"] = False
+    config["preflight_enforce"] = False
+    for settings in config["vehicles"].values():
+        settings.pop("replay", None)
+        settings["mock"] = {"arm_delay": args.arm_delay, "mode_delay": args.mode_delay}
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def wait_for(client, event, timeout=30.0):
+    """Polls the test client until `event` arrives, other events are dropped."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        for message in client.get_received():
+            if message["name"] == event:
+                return message["args"][0]
+            if message["name"] == "error":
+                raise BenchmarkError(f"{event}: {message['args'][0]}")
+        time.sleep(0.0005)
+    raise BenchmarkError(f"Timed out waiting for {event}.")
+
+
+def request(client, event, response_event, data=None, timeout=30.0):
+    started = time.perf_counter()
+    client.emit(event, data) if data is not None else client.emit(event)
+    response = wait_for(client, response_event, timeout)
+    return (time.perf_counter() - started) * 1000, response
+
+
+def summary(samples):
+    if not samples:
+        return {"n": 0}
+    values = np.asarray(samples)
+    return {
+        "n": len(values),
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p99_ms": round(float(np.percentile(values, 99)), 2),
+        "max_ms": round(float(values.max()), 2),
+    }
+
+
+def bench_arm(client, iterations):
+    samples = []
+    for _ in range(iterations):
+        elapsed, response = request(client, "arm", "arm_response")
+        if response["message"] is not True:
+            raise BenchmarkError(f"arm failed: {response}")
+        samples.append(elapsed)
+        request(client, "disarm", "disarm_response")
+    return samples
+
+
+def bench_mode_switch(client, iterations):
+    request(client, "arm", "arm_response")
+    samples = []
+    for i in range(iterations):
+        mode = "GUIDED" if i % 2 == 0 else "LOITER"
+        elapsed, _ = request(client, "mode_switch", "mode_switch_response", {"mode": mode})
+        samples.append(elapsed)
+    return samples
+
+
+def bench_setalt(client, iterations, step):
+    samples = []
+    for i in range(iterations):
+        elapsed, _ = request(client, "setalt", "setalt_response", {"height": step * (i + 1)}, timeout=120.0)
+        samples.append(elapsed)
+    request(client, "land", "land_response")
+    return samples
+
+
+def bench_telemetry(client, iterations, duration):
+    """Time to the first frame after joining the stream, and the interval between frames."""
+    first = []
+    for _ in range(iterations):
+        elapsed, _ = request(client, "telemetry", "telemetry_response")
+        first.append(elapsed)
+        request(client, "telemetry_stop", "telemetry_stop_response")
+
+    client.emit("telemetry")
+    arrivals = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        for message in client.get_received():
+            if message["name"] == "telemetry_response":
+                arrivals.append(time.perf_counter())
+        time.sleep(0.0005)
+    client.emit("telemetry_stop")
+    return first, list(np.diff(arrivals) * 1000)
+
+
+def bench_fanout(app, socketio, clients, duration):
+    """N clients on the telemetry stream plus a request loop each, returns frames/s and requests/s."""
+    pool = [socketio.test_client(app) for _ in range(clients)]
+    frames = [0] * clients
+    requests = [0] * clients
+    latencies = [[] for _ in range(clients)]
+    stop = threading.Event()
+
+    def run(index, client):
+        client.emit("telemetry")
+        while not stop.is_set():
+            started = time.perf_counter()
+            client.emit("mission_status")
+            while not stop.is_set():
+                received = client.get_received()
+                frames[index] += sum(1 for m in received if m["name"] == "telemetry_response")
+                if any(m["name"] == "mission_status_response" for m in received):
+                    requests[index] += 1
+                    latencies[index].append((time.perf_counter() - started) * 1000)
+                    break
+                time.sleep(0.0005)
+        client.emit("telemetry_stop")
+
+    threads = [threading.Thread(target=run, args=(i, c), daemon=True) for i, c in enumerate(pool)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join(5.0)
+    for client in pool:
+        client.disconnect()
+
+    return {
+        "clients": clients,
+        "frames_per_s": round(sum(frames) / duration, 1),
+        "frames_per_client_s": round(sum(frames) / duration / clients, 1),
+        "requests_per_s": round(sum(requests) / duration, 1),
+        "request_latency": summary([x for per_client in latencies for x in per_client]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Control plane latency / throughput benchmark on the mock vehicle.")
+    parser.add_argument("--iterations", type=int, default=10, help="samples for arm and telemetry")
+    parser.add_argument("--mode-iterations", type=int, default=4, help="samples for mode_switch")
+    parser.add_argument("--setalt-iterations", type=int, default=2, help="samples for setalt")
+    parser.add_argument("--setalt-step", type=float, default=2.0, help="meters added per setalt sample")
+    parser.add_argument("--clients", type=int, default=4, help="clients for the fan-out run")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per streaming run")
+    parser.add_argument("--arm-delay", type=float, default=0.5, help="mock arming delay in seconds")
+    parser.add_argument("--mode-delay", type=float, default=0.2, help="mock mode switch delay in seconds")
+    parser.add_argument("--json", action="store_true", help="print the report as json")
+    args = parser.parse_args()
+
+    configure(args)
+    import main as server  # builds the app with the mock backend
+
+    client = server.socketio.test_client(server.app)
+    connect_ms, response = request(client, "connection", "connection_response")
+    if response["message"] is not True:
+        raise BenchmarkError("mock vehicle did not connect")
+
+    first_frame, frame_interval = bench_telemetry(client, args.iterations, args.duration)
+    report = {
+        "connection": summary([connect_ms]),
+        "arm": summary(bench_arm(client, args.iterations)),
+        "mode_switch": summary(bench_mode_switch(client, args.mode_iterations)),
+        "setalt": summary(bench_setalt(client, args.setalt_iterations, args.setalt_step)),
+        "telemetry_first_frame": summary(first_frame),
+        "telemetry_frame_interval": summary(frame_interval),
+        "fanout": bench_fanout(server.app, server.socketio, args.clients, args.duration),
+    }
+    client.emit("disconnection")
+    client.disconnect()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n{'operation':<26}{'n':>5}{'p50 ms':>11}{'p99 ms':>11}{'max ms':>11}")
+    for name, stats in report.items():
+        if name == "fanout":
+            continue
+        print(f"{name:<26}{stats['n']:>5}{stats.get('p50_ms', '-'):>11}{stats.get('p99_ms', '-'):>11}{stats.get('max_ms', '-'):>11}")
+    fanout = report["fanout"]
+    print(f"\nfan-out, {fanout['clients']} clients: {fanout['frames_per_s']} telemetry frames/s "
+          f"({fanout['frames_per_client_s']} per client), {fanout['requests_per_s']} requests/s, "
+          f"request p50 {fanout['request_latency'].get('p50_ms')} ms / p99 {fanout['request_latency'].get('p99_ms')} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,19 @@
-# Placeholder for scripts/run_tests.py
+# runs the pytest suite in src/tests, extra arguments are passed through to pytest.
+#
+#   python scripts/run_tests.py
+#   python scripts/run_tests.py -k mission -x
+
+import os
+import sys
+
+import pytest
+
+TESTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "tests")
+
+
+def main():
+    return pytest.main([TESTS, *sys.argv[1:]])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,108 +1,149 @@
-# handles connection-disconenction to the UAV, additionally monitors vehicle status by fetching its state/hearbeat.
+# handles connection-disconenction to the UAV, additionally monitors the link through a heartbeat watchdog.
 
-import threading
-import time
+import logging
 from dronekit import connect
-from models.heartbeat_model import HeartbeatModel
+from adapters.dronekit_adapter.heartbeat_watchdog import HeartbeatWatchdog, EXPIRED
+from adapters.dronekit_adapter.readiness import VehicleReadiness
+from adapters.virtual_adapter.replay_vehicle import ReplayVehicle
+from adapters.virtual_adapter.mock_vehicle import MockVehicle
+from core.config.config import config
+
+log = logging.getLogger(__name__)
 
 class ConnectionHandler:
-    def __init__(self):
+    def __init__(self, backend="dronekit", mock_settings=None):
+        self.backend = backend  # "dronekit", or "mock" for the in-process simulated vehicle
+        self.mock_settings = mock_settings
         self.vehicle = None
         self.is_connected = False
         self.mode = None
-        self.thread = None
-        self.state = None
-        self.current_heartbeat = None
-        self.last_heartbeat_time = time.time()  # Initial timestamp
-        self.monitoring = False
+        self.watchdog = None
+        self.readiness = None
+        self.on_ready_progress = None  # parameter download progress callback, set by the owning service
+        self.on_link_change = None  # (state, link status) callback, set by the owning service
+        self.on_link_expired = None  # takes over from the plain disconnect, e.g. to reconnect
 
     def connect(self, connection_string, baud):
         if self.vehicle is not None:  # Prevent multiple connections
-            print("⚠️ Already connected.")
+            log.warning("⚠️ Already connected.")
             return True
         try:
-            self.vehicle = connect(connection_string, wait_ready=True, baud=baud)
+            self.vehicle = self._open(connection_string, baud)
             self.is_connected = True
-            print("✅ Successfully connected to the Pixhawk.")
+            log.info("✅ Successfully connected to the Pixhawk.")
             self._start_monitoring()
+            self._start_readiness()
             return True
         except Exception as e:
             self.is_connected = False
-            print("❌ Connection failed:", {e})
+            log.error("❌ Connection failed: %s", e)
             return False
         
     def connect_sitl(self, connection_string, baud):
         if self.vehicle is not None:  # Prevent multiple connections
-            print("⚠️ Already connected.")
+            log.warning("⚠️ Already connected.")
             return True
         try:
-            self.vehicle = connect(connection_string, wait_ready=True, baud=baud)
+            self.vehicle = self._open(connection_string, baud)
             self.is_connected = True
-            print("✅ Successfully connected to the Pixhawk.")
+            log.info("✅ Successfully connected to the Pixhawk.")
             self._start_monitoring()
+            self._start_readiness()
             return True
         except Exception as e:
             self.is_connected = False
-            print("❌ Connection failed:", {e})
+            log.error("❌ Connection failed: %s", e)
             return False    
 
+    def connect_replay(self, log_path, speed=1.0, loop=False):
+        if self.vehicle is not None:  # Prevent multiple connections
+            log.warning("⚠️ Already connected.")
+            return True
+        try:
+            self.vehicle = ReplayVehicle(log_path, speed, loop)
+            self.vehicle.start()
+            self.is_connected = True
+            rate = f"{speed}x" if speed else "max"
+            log.info("✅ Replaying %s flight log(s) at %s speed.", len(self.vehicle.paths), rate)
+            # no watchdog, the end of a recording is not a link loss, and no parameter download to wait for
+            self._start_readiness(fetch_params=False)
+            return True
+        except Exception as e:
+            self.is_connected = False
+            log.error("❌ Replay failed: %s", e)
+            return False
+
+    def _open(self, connection_string, baud):
+        if self.backend == "mock":
+            vehicle = MockVehicle(self.mock_settings)
+            vehicle.start()
+            return vehicle
+        # fast connect returns on the first heartbeat, parameters keep downloading in the background
+        return connect(connection_string, wait_ready=not config["fast_connect"], baud=baud)
+
     def disconnect(self):
         try:
+            self._stop_monitoring()
+            if self.readiness:
+                self.readiness.stop()
+                self.readiness = None
             if self.vehicle:
                 self.vehicle.close()
                 self.is_connected = False
                 self.vehicle = None
-            print("✅ Disconnected from the Pixhawk.")
-            self._stop_monitoring()
+            log.info("✅ Disconnected from the Pixhawk.")
             return True
         except Exception as e:
-            print("❌ No active connection to disconnect.")
+            log.error("❌ No active connection to disconnect.")
             return False
 
-    def _get_vehicle_state(self):
-        try:
-            return HeartbeatModel(self.vehicle).get_heartbeat()
-        except Exception as e:
-            return {"error": f"Failed to retrieve vehicle status: {e}"}
+    # readiness, operations wait for the attributes they need instead of the whole connection
 
-    def _monitor_vehicle(self):
-        """Continuously monitor vehicle status and heartbeat."""
-        self.monitoring = True
-        stale_heartbeat_count = 0  # Track consecutive stale heartbeats
+    def _start_readiness(self, fetch_params=True):
+        """:param fetch_params: False for vehicles that never stream PARAM_VALUEs (replays), ready at once"""
+        fetch_params = fetch_params and self.backend == "dronekit" and config["fast_connect"]
+        self.readiness = VehicleReadiness(self.vehicle, fetch_params, self._on_ready_progress,
+                                          config["param_progress_interval"])
+        self.readiness.start()
 
-        while self.monitoring:
-         self.state = self._get_vehicle_state()
+    def _on_ready_progress(self, progress):
+        if self.on_ready_progress:
+            self.on_ready_progress(progress)
 
-         if self.vehicle and self.state:
-            
-            if self.current_heartbeat != self.state["last_heartbeat"]:  # Check if heartbeat is new
-                self.current_heartbeat = self.state["last_heartbeat"]  # Get latest heartbeat
-                self.last_heartbeat_time = time.time()  # Reset timeout
-                stale_heartbeat_count = 0  # Reset redundancy counter
-                # print(self.state)
-                # print("✅ Heartbeat received.")
+    def readiness_status(self):
+        return self.readiness.progress() if self.readiness else None
+
+    def wait_ready(self, operation, timeout):
+        if not self.readiness:
+            return False
+        return self.readiness.wait_for(operation, timeout)
 
-            else:
-                stale_heartbeat_count += 1  # Increment redundant heartbeat counter
-                print(f"⚠️ Redundant heartbeat detected ({stale_heartbeat_count}/5)")
+    # link supervision, HeartbeatWatchdog follows the vehicle's messages and calls back on state changes
 
-            # If 5 redundant heartbeats occur or no heartbeat for 5 seconds → Disconnect
-            if stale_heartbeat_count >= 5 or (time.time() - self.last_heartbeat_time) > 5:
-                print("⚠️ No valid heartbeat detected! Disconnecting...")
-                self.disconnect()
-                break  # Exit monitoring loop
+    def link_status(self):
+        return self.watchdog.status() if self.watchdog else None
 
-         time.sleep(1)  # Blocking delay
+    def _on_link_change(self, state, status):
+        if self.on_link_change:
+            self.on_link_change(state, status)
+        if state == EXPIRED:
+            if self.on_link_expired:
+                self.on_link_expired()
+                return
+            log.warning("⚠️ No valid heartbeat detected! Disconnecting...")
+            self.disconnect()
 
     def _start_monitoring(self):
-        if self.thread is None or not self.thread.is_alive():
-            self.thread = threading.Thread(target=self._monitor_vehicle, daemon=True)
-            self.thread.start()
-            print("Started vehicle monitoring.")
+        if self.watchdog is None:
+            self.watchdog = HeartbeatWatchdog(
+                self.vehicle, self._on_link_change,
+                config["link_timeout"], config["heartbeat_timeout"], config["link_lost_timeout"],
+            )
+            self.watchdog.start()
+            log.info("Started vehicle monitoring.")
 
     def _stop_monitoring(self):
-        self.monitoring = False
-        if self.thread:
-            self.thread.join()
-            self.thread = None
-        print("Stopped vehicle monitoring.")
+        if self.watchdog:
+            self.watchdog.stop()
+            self.watchdog = None
+            log.info("Stopped vehicle monitoring.")
@@ -0,0 +1,97 @@
+# single owner of the vehicle link. Adapters no longer write to the vehicle from whichever Socket.IO
+# or mission thread they run on, they queue short commands (mode / arm / overrides / goto / mavlink
+# sends) here and one dispatcher thread executes them in priority order. Waiting for the vehicle to
+# react stays with the caller, so the dispatcher is never blocked for long and a failsafe LAND goes
+# out ahead of everything still queued, even in the middle of a mission upload.
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from core.utils.metrics import metrics
+
+# priority lanes, lower runs first
+LANE_FAILSAFE = 0   # LAND / RTL / disarm for safety
+LANE_RC = 1         # RC channel overrides
+LANE_MISSION = 2    # mode switches, goto, mission and parameter traffic
+LANE_NAMES = {LANE_FAILSAFE: "failsafe", LANE_RC: "rc", LANE_MISSION: "mission"}
+
+_STOP = -1
+
+
+class DispatcherStopped(Exception):
+    pass
+
+
+class CommandDispatcher:
+    def __init__(self, vehicle, name="mavlink-dispatcher"):
+        self.vehicle = vehicle
+        self.name = name
+        self.queue = queue.PriorityQueue()
+        self.order = itertools.count()  # FIFO inside a lane
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=2.0):
+        if not self.running:
+            return
+        self.running = False
+        self.queue.put((_STOP, next(self.order), None, None, None, None))
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        # fail whatever is still queued so no caller waits forever
+        while True:
+            try:
+                _, _, future, _, _, _ = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if future is not None and future.set_running_or_notify_cancel():
+                future.set_exception(DispatcherStopped("Vehicle link closed."))
+
+    def submit(self, lane, function, *args):
+        """Queues function(*args) on the given lane and returns a Future with its result."""
+        future = Future()
+        if not self.running:
+            future.set_exception(DispatcherStopped("Vehicle link is not running."))
+            return future
+        self.queue.put((lane, next(self.order), future, function, args, time.perf_counter()))
+        return future
+
+    def execute(self, lane, function, *args, timeout=5.0):
+        """Same as submit but waits for the result, runs inline when called from the dispatcher thread."""
+        if threading.current_thread() is self.thread:
+            return function(*args)
+        return self.submit(lane, function, *args).result(timeout)
+
+    def set(self, lane, attribute, value, timeout=5.0):
+        """vehicle.<attribute> = value from the dispatcher thread, e.g. set(LANE_MISSION, 'mode', VehicleMode('GUIDED'))."""
+        return self.execute(lane, setattr, self.vehicle, attribute, value, timeout=timeout)
+
+    def pending(self):
+        return self.queue.qsize()
+
+    def _run(self):
+        while True:
+            lane, _, future, function, args, queued = self.queue.get()
+            if lane == _STOP:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter()
+            try:
+                future.set_result(function(*args))
+            except Exception as e:
+                future.set_exception(e)
+            if metrics.enabled:
+                lane_name = LANE_NAMES.get(lane, str(lane))
+                metrics.observe("dispatcher_queue_wait_seconds", started - queued, lane=lane_name)
+                metrics.observe("dispatcher_command_seconds", time.perf_counter() - started, lane=lane_name)
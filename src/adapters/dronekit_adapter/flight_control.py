@@ -1,57 +1,66 @@
 # controls the arming and disarming of the UAV 
 
+import logging
+import struct
 from dronekit import VehicleMode
+from adapters.dronekit_adapter.dispatcher import LANE_FAILSAFE, LANE_MISSION
+from core.utils.metrics import metrics
 import time
 
+log = logging.getLogger(__name__)
+
 class FlightController():
-    def __init__(self,vehicle,is_connected):
+    def __init__(self,vehicle,is_connected,link):
         self.vehicle = vehicle
+        self.link = link  # CommandDispatcher owning the vehicle writes
         self.is_connected = is_connected
         self.is_arm = False
 
+    @metrics.timed("vehicle_command", op="arm_vehicle")
     def arm_vehicle(self):
      if not self.is_connected or not self.vehicle:
-        print("❌ Vehicle not connected.")
+        log.error("❌ Vehicle not connected.")
         return False
 
      try:
         self.disable_prearm_checks()
         # Switch to STABILIZE mode
-        print("⏳ Switching to STABILIZE mode...")
-        self.vehicle.mode = VehicleMode("STABILIZE")
+        log.info("⏳ Switching to STABILIZE mode...")
+        self.link.set(LANE_MISSION, 'mode', VehicleMode("STABILIZE"))
 
         timeout = 10  # Timeout for mode change
         start_time = time.time()
 
         while self.vehicle.mode.name != "STABILIZE":
             if time.time() - start_time > timeout:
-                print("⚠️ Mode switch timeout: Unable to enter STABILIZE mode.")
+                log.warning("⚠️ Mode switch timeout: Unable to enter STABILIZE mode.")
                 return False
             time.sleep(0.5)
 
-        print("✅ Mode set to STABILIZE. Attempting to arm the vehicle...")
+        log.info("✅ Mode set to STABILIZE. Attempting to arm the vehicle...")
 
         # Attempt to arm the vehicle
-        self.vehicle.armed = True
+        self.link.set(LANE_MISSION, 'armed', True)
         timeout = 10  # Timeout for arming
         start_time = time.time()
 
         while not self.vehicle.armed:
             if time.time() - start_time > timeout:
-                print("⚠️ Arming timeout: Unable to arm the vehicle.")
+                log.warning("⚠️ Arming timeout: Unable to arm the vehicle.")
                 return False
             
-            print("⏳ Waiting for arming...")
+            log.info("⏳ Waiting for arming...")
             time.sleep(1)
 
         self.is_arm = True
-        print("✅ Vehicle armed successfully.")
+        log.info("✅ Vehicle armed successfully.")
         return True
 
      except Exception as e:
-        print(f"❌ Arming failed: {e}")
+        log.error("❌ Arming failed: %s", e)
         return False
 
+    @metrics.timed("vehicle_command", op="disarm_vehicle")
     def disarm_vehicle(self):
         if not self.is_connected or not self.vehicle:
             return "❌ Vehicle not connected."
@@ -60,24 +69,48 @@ class FlightController():
             if not self.vehicle.armed:
                 return "✅ Vehicle is already disarmed."
 
-            self.vehicle.armed = False
+            self.link.set(LANE_FAILSAFE, 'armed', False)
             self.is_arm = False
-            print("✅ Vehicle is disarming...")
+            log.info("✅ Vehicle is disarming...")
             return True
         except Exception as e:
-            print("❌ Failed to disarm the vehicle: ",{e})
+            log.error("❌ Failed to disarm the vehicle: %s", e)
             return False
         
     def disable_prearm_checks(self):
         if self.vehicle is None:
-            print("❌ Vehicle not connected. Cannot disable pre-arm checks.")
+            log.error("❌ Vehicle not connected. Cannot disable pre-arm checks.")
             return
 
         try:
             # Disable all pre-arm checks
-            self.vehicle.parameters['ARMING_CHECK'] = 0
-            print("✅ Pre-arm checks disabled successfully!")
+            if self.set_parameter('ARMING_CHECK', 0):
+                log.info("✅ Pre-arm checks disabled successfully!")
+            else:
+                log.error("❌ Failed to disable pre-arm checks: no ARMING_CHECK echo from the vehicle.")
         except Exception as e:
-            print(f"❌ Failed to disable pre-arm checks: {e}")
+            log.error("❌ Failed to disable pre-arm checks: %s", e)
+
+    def set_parameter(self, name, value, retries=3, interval=1.0):
+        """
+        Sends PARAM_SET from the dispatcher and waits here for the PARAM_VALUE echo, resending every
+        interval. Only the send goes through the dispatcher, a failsafe never queues behind the wait.
+        """
+        parameters = self.vehicle.parameters
+        if not hasattr(parameters, "set"):  # virtual vehicle, parameters are a plain dict
+            self.link.execute(LANE_MISSION, parameters.__setitem__, name, value)
+            return True
+
+        expected = struct.unpack('f', struct.pack('f', value))[0]  # the autopilot echoes a float32
+        for attempt in range(retries + 1):
+            # retries=0 makes dronekit send once and return, wait_ready=False skips its download wait
+            self.link.execute(LANE_MISSION, parameters.set, name, value, 0, False)
+            deadline = time.monotonic() + interval
+            while time.monotonic() < deadline:
+                if parameters.get(name, wait_ready=False) == expected:
+                    return True
+                time.sleep(0.1)
+            log.debug("Parameter %s not echoed yet (attempt %d).", name, attempt + 1)
+        return False
 
         
\ No newline at end of file
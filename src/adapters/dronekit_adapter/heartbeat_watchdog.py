@@ -0,0 +1,170 @@
+# event driven link watchdog. Every MAVLink message from the vehicle refreshes the link from a message
+# listener (a clock read and a sequence check), HEARTBEATs also feed a rate / jitter estimate. The
+# watchdog thread only sleeps until the next deadline, so a silent link is noticed within link_timeout
+# and the CPU cost while the link is healthy is a handful of wakeups per second.
+#
+#   ok -> degraded   no message at all for link_timeout
+#      -> lost       no HEARTBEAT for heartbeat_timeout
+#      -> expired    lost for another lost_timeout, the connection handler gives up on the vehicle
+# any message brings a degraded link back to ok, a lost one needs a heartbeat.
+
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+OK = "ok"
+DEGRADED = "degraded"
+LOST = "lost"
+EXPIRED = "expired"
+
+MAV_TYPE_GCS = 6  # ground stations on the same link send heartbeats too
+
+
+class HeartbeatWatchdog:
+    def __init__(self, vehicle, on_change=None, link_timeout=0.5, heartbeat_timeout=3.0, lost_timeout=5.0):
+        """
+        :param on_change: called with (state, status()) on every state change, from the listener or
+            the watchdog thread, keep it short
+        """
+        self.vehicle = vehicle
+        self.on_change = on_change
+        self.link_timeout = link_timeout
+        self.heartbeat_timeout = heartbeat_timeout
+        self.lost_timeout = lost_timeout
+
+        self.state = OK
+        self.lock = threading.Lock()  # state transitions, the counters are only written by the listener thread
+        self.stopping = threading.Event()
+        self.wakeup = threading.Event()  # state changed, the pending deadline may be too late now
+        self.thread = None
+
+        now = time.monotonic()
+        self.last_message = now
+        self.last_heartbeat = now
+        self.heartbeats = 0
+        self.interval = None   # smoothed heartbeat interval, s
+        self.jitter = 0.0      # smoothed |interval - mean|, s
+        self.received = 0
+        self.dropped = 0
+        self.sequences = {}    # (system, component) -> last MAVLink seq
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stopping.clear()
+        self.vehicle.add_message_listener('*', self._on_message)
+        self.vehicle.add_message_listener('HEARTBEAT', self._on_heartbeat)
+        self.thread = threading.Thread(target=self._run, name="heartbeat-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        self.wakeup.set()
+        try:
+            self.vehicle.remove_message_listener('*', self._on_message)
+            self.vehicle.remove_message_listener('HEARTBEAT', self._on_heartbeat)
+        except Exception:
+            pass  # vehicle already closed
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(1.0)
+        self.thread = None
+
+    # listeners, called for every message so they stay allocation free on the common path
+
+    def _on_message(self, vehicle, name, msg):
+        self.last_message = time.monotonic()
+        self.received += 1
+        get_seq = getattr(msg, "get_seq", None)
+        if get_seq is not None:
+            source = (msg.get_srcSystem(), msg.get_srcComponent())
+            seq = get_seq()
+            last = self.sequences.get(source)
+            if last is not None:
+                gap = (seq - last - 1) & 0xFF
+                if gap < 128:  # larger jumps are duplicates, reordering or a rebooted sender
+                    self.dropped += gap
+            self.sequences[source] = seq
+        if self.state == DEGRADED:
+            self._transition(OK)
+
+    def _on_heartbeat(self, vehicle, name, msg):
+        if getattr(msg, "type", None) == MAV_TYPE_GCS:
+            return
+        now = time.monotonic()
+        if self.heartbeats:
+            interval = now - self.last_heartbeat
+            if self.interval is None:
+                self.interval = interval
+            else:
+                # RFC 3550 style smoothing
+                self.jitter += (abs(interval - self.interval) - self.jitter) / 16
+                self.interval += (interval - self.interval) / 8
+        self.heartbeats += 1
+        self.last_heartbeat = now
+        if self.state != OK:
+            self._transition(OK)
+
+    # watchdog thread
+
+    def _deadline(self):
+        """Monotonic time of the next possible escalation for the current state."""
+        if self.state == OK:
+            return min(self.last_message + self.link_timeout, self.last_heartbeat + self.heartbeat_timeout)
+        if self.state == DEGRADED:
+            return self.last_heartbeat + self.heartbeat_timeout
+        if self.state == LOST:
+            return self.last_heartbeat + self.heartbeat_timeout + self.lost_timeout
+        return None
+
+    def _run(self):
+        while not self.stopping.is_set():
+            deadline = self._deadline()
+            wait = self.heartbeat_timeout if deadline is None else deadline - time.monotonic()
+            if wait > 0:
+                # within a state messages only move the deadline later, waking up on the old one is early
+                # enough. A state change sets wakeup since the new state's deadline can be earlier.
+                self.wakeup.wait(wait)
+                self.wakeup.clear()
+                continue
+
+            now = time.monotonic()
+            if now - self.last_heartbeat >= self.heartbeat_timeout + self.lost_timeout:
+                self._transition(EXPIRED)
+            elif now - self.last_heartbeat >= self.heartbeat_timeout:
+                self._transition(LOST)
+            elif now - self.last_message >= self.link_timeout:
+                self._transition(DEGRADED)
+
+    def _transition(self, state):
+        with self.lock:
+            if state == self.state:
+                return
+            previous, self.state = self.state, state
+        self.wakeup.set()
+        status = self.status()
+        if state == OK:
+            log.info("✅ Vehicle link recovered after %s.", previous)
+        else:
+            log.warning("⚠️ Vehicle link %s, last message %.2f s ago, last heartbeat %.2f s ago.",
+                        state, status["message_age"], status["heartbeat_age"])
+        if self.on_change:
+            try:
+                self.on_change(state, status)
+            except Exception as e:
+                log.error("❌ Link state handler failed: %s", e)
+
+    def status(self):
+        now = time.monotonic()
+        total = self.received + self.dropped
+        return {
+            "state": self.state,
+            "message_age": round(now - self.last_message, 3),
+            "heartbeat_age": round(now - self.last_heartbeat, 3),
+            "heartbeat_rate_hz": round(1.0 / self.interval, 2) if self.interval else None,
+            "jitter_ms": round(self.jitter * 1000, 1),
+            "received": self.received,
+            "dropped": self.dropped,
+            "loss_pct": round(100.0 * self.dropped / total, 2) if total else 0.0,
+        }
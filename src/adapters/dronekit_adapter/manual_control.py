@@ -0,0 +1,117 @@
+# continuous manual flight. The client streams stick axes as often as it likes, the latest value wins,
+# and a fixed rate loop ramps the sticks towards it and sends all four channels as one
+# RC_CHANNELS_OVERRIDE per tick on the dispatcher's RC lane. If the client goes quiet roll, pitch and yaw
+# fall back to centre and the throttle to idle, and stopping hands the channels back to the RC transmitter.
+
+import logging
+import threading
+import time
+
+from adapters.dronekit_adapter.dispatcher import LANE_RC
+
+log = logging.getLogger(__name__)
+
+# axis -> rc channel, same mapping as MotorController
+CHANNELS = {"roll": "1", "pitch": "2", "throttle": "3", "yaw": "4"}
+
+# sticks at rest: centred, throttle at the bottom (0 would be half throttle in STABILIZE)
+IDLE = {"roll": 0.0, "pitch": 0.0, "throttle": -1.0, "yaw": 0.0}
+
+
+class ManualControl:
+    def __init__(self, vehicle, link, rate_hz=30, timeout=0.5, ramp=4.0, min_pwm=1000, max_pwm=2000):
+        """
+        :param rate_hz: override rate, 25-50 Hz is what the autopilot expects from a ground station
+        :param timeout: seconds without client input before the sticks centre and the throttle drops to idle
+        :param ramp: max stick travel per second, in full deflections (axes run -1..1)
+        """
+        self.vehicle = vehicle
+        self.link = link
+        self.period = 1.0 / rate_hz
+        self.timeout = timeout
+        self.ramp = ramp
+        self.min_pwm = min_pwm
+        self.max_pwm = max_pwm
+        self.neutral_pwm = (min_pwm + max_pwm) // 2
+
+        self.target = dict(IDLE)
+        self.current = dict(IDLE)
+        self.last_input = 0.0
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+        self.in_flight = None  # future of the last override, a tick is skipped while it is still queued
+        self.ticks = 0
+        self.skipped = 0
+
+    def start(self):
+        if self.running:
+            return True
+        with self.lock:
+            self.target = dict(IDLE)
+            self.current = dict(IDLE)
+            self.last_input = time.monotonic()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="manual-control", daemon=True)
+        self.thread.start()
+        log.info("🎮 Manual control started at %.0f Hz.", 1.0 / self.period)
+        return True
+
+    def stop(self):
+        if not self.running:
+            return True
+        self.running = False
+        if self.thread is not threading.current_thread():
+            self.thread.join(1.0)
+        # release the channels, the autopilot goes back to the transmitter / its own mode logic
+        self.link.submit(LANE_RC, setattr, self.vehicle.channels, 'overrides', {})
+        log.info("🎮 Manual control stopped (%s ticks, %s skipped).", self.ticks, self.skipped)
+        return True
+
+    def set_axes(self, axes):
+        """axes = {"roll", "pitch", "yaw", "throttle"} in -1..1, missing axes keep their last value."""
+        with self.lock:
+            for axis, value in axes.items():
+                if axis not in CHANNELS:
+                    raise ValueError(f"Unknown axis '{axis}'. Expected one of {tuple(CHANNELS)}.")
+                self.target[axis] = min(max(float(value), -1.0), 1.0)
+            self.last_input = time.monotonic()
+        return True
+
+    def _pwm(self, value):
+        half = (self.max_pwm - self.min_pwm) / 2
+        return int(round(self.neutral_pwm + value * half))
+
+    def _step(self, dt):
+        with self.lock:
+            if time.monotonic() - self.last_input > self.timeout:
+                self.target = dict(IDLE)
+            target = dict(self.target)
+
+        limit = self.ramp * dt
+        for axis, goal in target.items():
+            delta = goal - self.current[axis]
+            self.current[axis] += min(max(delta, -limit), limit)
+        return {channel: self._pwm(self.current[axis]) for axis, channel in CHANNELS.items()}
+
+    def _run(self):
+        next_tick = time.monotonic()
+        last = next_tick
+        while self.running:
+            now = time.monotonic()
+            overrides = self._step(now - last)
+            last = now
+
+            # one bulk override per tick, never pile up ticks behind a busy link
+            if self.in_flight is None or self.in_flight.done():
+                self.in_flight = self.link.submit(LANE_RC, setattr, self.vehicle.channels, 'overrides', overrides)
+                self.ticks += 1
+            else:
+                self.skipped += 1
+
+            next_tick += self.period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()  # fell behind, don't burst to catch up
@@ -0,0 +1,173 @@
+# mavlink mission upload handshake (MISSION_COUNT -> MISSION_REQUEST_INT* -> MISSION_ACK).
+# The autopilot pulls every item itself, so items go out as fast as the link allows instead of on a fixed
+# delay, and a lost message only costs one retransmission. Afterwards a MISSION_REQUEST_LIST reads back
+# the count the autopilot stored, and the checksum of what it requested, acked and reported is compared
+# with the plan.
+
+import struct
+import threading
+import zlib
+
+from pymavlink import mavutil
+
+from adapters.dronekit_adapter.dispatcher import LANE_MISSION
+
+MAV_MISSION_ACCEPTED = mavutil.mavlink.MAV_MISSION_ACCEPTED
+
+# frame, command, current, autocontinue, param1-4, x (lat * 1e7), y (lon * 1e7), z (alt)
+ITEM_LAYOUT = struct.Struct("<BHBB4fiif")
+
+# ack result and item count in front of the items
+RESULT_LAYOUT = struct.Struct("<BH")
+
+
+def wire_item(item):
+    """The item as MISSION_ITEM_INT carries it, params and altitude rounded to float32."""
+    return ITEM_LAYOUT.unpack(ITEM_LAYOUT.pack(*item))
+
+
+def mission_checksum(items, count=None, result=MAV_MISSION_ACCEPTED):
+    """CRC32 over the ack result, the item count and the packed mission items in sequence order."""
+    crc = zlib.crc32(RESULT_LAYOUT.pack(result, len(items) if count is None else count))
+    for item in items:
+        crc = zlib.crc32(ITEM_LAYOUT.pack(*item), crc)
+    return crc
+
+
+class MissionTransferError(Exception):
+    pass
+
+
+class MissionTransfer:
+    def __init__(self, vehicle, link, items, item_timeout=1.0, max_retries=5):
+        self.vehicle = vehicle
+        self.link = link  # CommandDispatcher, sends go out on the mission lane behind failsafe and RC traffic
+        self.items = items
+        self.item_timeout = item_timeout
+        self.max_retries = max_retries
+
+        self.sent = {}               # seq -> item as transmitted in answer to the autopilot's request
+        self.last_requested = None
+        self.ack_type = None
+        self.count = None            # item count the autopilot reports after the upload
+        self.counted = threading.Event()
+        self.activity = threading.Event()
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+
+    def _targets(self):
+        master = getattr(self.vehicle, "_master", None)
+        if master is None:
+            return 0, 0
+        return master.target_system, master.target_component
+
+    def _send_count(self):
+        target_system, target_component = self._targets()
+        self.link.submit(LANE_MISSION, self.vehicle.message_factory.mission_count_send,
+                         target_system, target_component, len(self.items))
+
+    def _send_item(self, seq):
+        target_system, target_component = self._targets()
+        item = wire_item(self.items[seq])
+        frame, command, current, autocontinue, p1, p2, p3, p4, x, y, z = item
+        # queued without waiting, this runs on dronekit's receive thread
+        self.link.submit(
+            LANE_MISSION, self.vehicle.message_factory.mission_item_int_send,
+            target_system, target_component, seq,
+            frame, command, current, autocontinue,
+            p1, p2, p3, p4, x, y, z
+        )
+        self.sent[seq] = item
+
+    def _on_request(self, vehicle, name, msg):
+        seq = msg.seq
+        if seq >= len(self.items):
+            return
+        with self.lock:
+            self.last_requested = seq
+            self._send_item(seq)
+        self.activity.set()
+
+    def _on_ack(self, vehicle, name, msg):
+        # an ack before any request is the autopilot rejecting the count (or an unrelated transaction)
+        if self.last_requested is None and msg.type == MAV_MISSION_ACCEPTED and self.items:
+            return
+        self.ack_type = msg.type
+        self.done.set()
+        self.activity.set()
+
+    def _on_count(self, vehicle, name, msg):
+        self.count = msg.count
+        self.counted.set()
+
+    def _read_count(self):
+        """Asks the autopilot how many items it stored, then closes the download it opened with an ack."""
+        target_system, target_component = self._targets()
+        for _ in range(self.max_retries + 1):
+            self.link.submit(LANE_MISSION, self.vehicle.message_factory.mission_request_list_send,
+                             target_system, target_component)
+            if self.counted.wait(self.item_timeout):
+                self.link.submit(LANE_MISSION, self.vehicle.message_factory.mission_ack_send,
+                                 target_system, target_component, MAV_MISSION_ACCEPTED)
+                return self.count
+        raise MissionTransferError("Autopilot did not report its mission count after the upload.")
+
+    def run(self):
+        """Uploads the items and returns the checksum of what the autopilot accepted."""
+        listeners = (
+            ("MISSION_REQUEST_INT", self._on_request),
+            ("MISSION_REQUEST", self._on_request),
+            ("MISSION_ACK", self._on_ack),
+            ("MISSION_COUNT", self._on_count),
+        )
+        for name, fn in listeners:
+            self.vehicle.add_message_listener(name, fn)
+
+        try:
+            self._send_count()
+            retries = 0
+
+            while not self.done.is_set():
+                self.activity.clear()
+                if self.activity.wait(self.item_timeout) or self.done.is_set():
+                    retries = 0
+                    continue
+
+                # nothing came back within the timeout, retransmit what the autopilot is waiting for
+                retries += 1
+                if retries > self.max_retries:
+                    raise MissionTransferError(
+                        f"Mission upload timed out (last requested item: {self.last_requested})."
+                    )
+                with self.lock:
+                    if self.last_requested is None:
+                        self._send_count()
+                    else:
+                        self._send_item(self.last_requested)
+
+            if self.ack_type != MAV_MISSION_ACCEPTED:
+                raise MissionTransferError(f"Mission rejected by autopilot (MAV_MISSION_RESULT {self.ack_type}).")
+
+            self._read_count()
+            return self.verify()
+
+        finally:
+            for name, fn in listeners:
+                self.vehicle.remove_message_listener(name, fn)
+
+    def verify(self):
+        """
+        Checksums what the autopilot requested, acked and reported and compares it with the plan,
+        returns the checksum when they match.
+        """
+        missing = [seq for seq in range(len(self.items)) if seq not in self.sent]
+        if missing:
+            raise MissionTransferError(f"Autopilot never requested items {missing[:10]}.")
+        received = mission_checksum([self.sent[seq] for seq in sorted(self.sent)], self.count, self.ack_type)
+        expected = mission_checksum([wire_item(item) for item in self.items])
+        if received != expected:
+            raise MissionTransferError(
+                f"Autopilot holds {self.count} items, {len(self.items)} were planned (checksum "
+                f"{received:08x}, expected {expected:08x})."
+            )
+        return received
@@ -1,8 +1,14 @@
 # controls the motors of the UAV
 
+import logging
+from adapters.dronekit_adapter.dispatcher import LANE_RC
+
+log = logging.getLogger(__name__)
+
 class MotorController:
-    def __init__(self, vehicle):
+    def __init__(self, vehicle, link):
         self.vehicle = vehicle
+        self.link = link  # CommandDispatcher, overrides go out on the RC lane
         self.min_pwm = 1000  # Minimum PWM value
         self.max_pwm = 1999  # Maximum PWM value
         self.increment = 10  # Step size for adjustments
@@ -14,78 +20,81 @@ class MotorController:
         # self.yaw = 1500      # Channel 4: Yaw (Rotation left-right)
         self.neutral_pwm = 1500
 
+    def _override(self, channel, pwm):
+        self.link.execute(LANE_RC, self.vehicle.channels.overrides.__setitem__, channel, pwm)
+
     def throttle_up(self):
         try:
             if self.throttle < self.max_pwm:
                 self.throttle += self.increment
-                self.vehicle.channels.overrides['3'] = self.throttle
-                print(f"✅ Throttle increased to {self.throttle}")
+                self._override('3', self.throttle)
+                log.debug("✅ Throttle increased to %s", self.throttle)
             else:
-                print("❌ Throttle cannot exceed 1999.")
+                log.warning("⚠️ Throttle cannot exceed 1999.")
         except Exception as e:
-            print(f"❌ Failed to increase throttle: {e}")
+            log.error("❌ Failed to increase throttle: %s", e)
 
     def throttle_down(self):
         try:
             if self.throttle > self.min_pwm:
                 self.throttle -= self.increment
-                self.vehicle.channels.overrides['3'] = self.throttle
-                print(f"✅ Throttle decreased to {self.throttle}")
+                self._override('3', self.throttle)
+                log.debug("✅ Throttle decreased to %s", self.throttle)
             else:
-                print("❌ Throttle cannot go below 1000.")
+                log.warning("⚠️ Throttle cannot go below 1000.")
         except Exception as e:
-            print(f"❌ Failed to decrease throttle: {e}")
+            log.error("❌ Failed to decrease throttle: %s", e)
 
     def roll_left(self):
         try:
-            self.vehicle.channels.overrides['1'] = self.max_pwm
-            print(f"✅ Rolling left: {self.max_pwm}")
-            self.vehicle.channels.overrides['1'] = self.neutral_pwm
-            print(f"🔄 Reset roll to neutral: {self.neutral_pwm}")
+            self._override('1', self.max_pwm)
+            log.debug("✅ Rolling left: %s", self.max_pwm)
+            self._override('1', self.neutral_pwm)
+            log.debug("🔄 Reset roll to neutral: %s", self.neutral_pwm)
         except Exception as e:
-            print(f"❌ Failed to roll left: {e}")
+            log.error("❌ Failed to roll left: %s", e)
 
     def roll_right(self):
         try:
-            self.vehicle.channels.overrides['1'] = self.min_pwm
-            print(f"✅ Rolling right: {self.min_pwm}")
-            self.vehicle.channels.overrides['1'] = self.neutral_pwm
-            print(f"🔄 Reset roll to neutral: {self.neutral_pwm}")
+            self._override('1', self.min_pwm)
+            log.debug("✅ Rolling right: %s", self.min_pwm)
+            self._override('1', self.neutral_pwm)
+            log.debug("🔄 Reset roll to neutral: %s", self.neutral_pwm)
         except Exception as e:
-            print(f"❌ Failed to roll right: {e}")
+            log.error("❌ Failed to roll right: %s", e)
 
     def pitch_forward(self):
         try:
-            self.vehicle.channels.overrides['2'] = self.max_pwm
-            print(f"✅ Pitching forward: {self.max_pwm}")
-            self.vehicle.channels.overrides['2'] = self.neutral_pwm
-            print(f"🔄 Reset pitch to neutral: {self.neutral_pwm}")
+            self._override('2', self.max_pwm)
+            log.debug("✅ Pitching forward: %s", self.max_pwm)
+            self._override('2', self.neutral_pwm)
+            log.debug("🔄 Reset pitch to neutral: %s", self.neutral_pwm)
         except Exception as e:
-            print(f"❌ Failed to pitch forward: {e}")
+            log.error("❌ Failed to pitch forward: %s", e)
 
     def pitch_backward(self):
         try:
-            self.vehicle.channels.overrides['2'] = self.min_pwm
-            print(f"✅ Pitching backward: {self.min_pwm}")
-            self.vehicle.channels.overrides['2'] = self.neutral_pwm
-            print(f"🔄 Reset pitch to neutral: {self.neutral_pwm}")
+            self._override('2', self.min_pwm)
+            log.debug("✅ Pitching backward: %s", self.min_pwm)
+            self._override('2', self.neutral_pwm)
+            log.debug("🔄 Reset pitch to neutral: %s", self.neutral_pwm)
         except Exception as e:
-            print(f"❌ Failed to pitch backward: {e}")
+            log.error("❌ Failed to pitch backward: %s", e)
 
     def yaw_clockwise(self):
         try:
-            self.vehicle.channels.overrides['4'] = self.max_pwm
-            print(f"✅ Yawing clockwise: {self.max_pwm}")
-            self.vehicle.channels.overrides['4'] = self.neutral_pwm
-            print(f"🔄 Reset yaw to neutral: {self.neutral_pwm}")
+            self._override('4', self.max_pwm)
+            log.debug("✅ Yawing clockwise: %s", self.max_pwm)
+            self._override('4', self.neutral_pwm)
+            log.debug("🔄 Reset yaw to neutral: %s", self.neutral_pwm)
         except Exception as e:
-            print(f"❌ Failed to yaw clockwise: {e}")
+            log.error("❌ Failed to yaw clockwise: %s", e)
 
     def yaw_anticlockwise(self):
         try:
-            self.vehicle.channels.overrides['4'] = self.min_pwm
-            print(f"✅ Yawing anticlockwise: {self.min_pwm}")
-            self.vehicle.channels.overrides['4'] = self.neutral_pwm
-            print(f"🔄 Reset yaw to neutral: {self.neutral_pwm}")
+            self._override('4', self.min_pwm)
+            log.debug("✅ Yawing anticlockwise: %s", self.min_pwm)
+            self._override('4', self.neutral_pwm)
+            log.debug("🔄 Reset yaw to neutral: %s", self.neutral_pwm)
         except Exception as e:
-            print(f"❌ Failed to yaw anticlockwise: {e}")
\ No newline at end of file
+            log.error("❌ Failed to yaw anticlockwise: %s", e)
\ No newline at end of file
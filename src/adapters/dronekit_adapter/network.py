@@ -1,54 +1,153 @@
-import time, threading
+# ground link monitor. Every server heartbeat carries a sequence number and timestamp, the ground station
+# echoes them back on 'ack'. Matching the two gives the round trip time, heartbeats left unanswered for
+# ack_timeout count as lost. A sliding window of the last heartbeats gives loss and latency figures,
+# network_strength() folds them into 0-100, and listeners hear about ok / degraded / lost changes
+# (the fleet lands armed vehicles on lost, the controller slows telemetry down while degraded).
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+from core.config.config import config
+
+log = logging.getLogger(__name__)
+
+UNKNOWN = "unknown"  # no ack seen yet, a ground station that never acks must not trip the failsafe
+OK = "ok"
+DEGRADED = "degraded"
+LOST = "lost"
+
 
 class Network:
-    def __init__(self):
-        # self.network_monitoring = False
-        self.ack = None
-        # self.timestamp_stack = []
-        # self._start_monitoring()
+    def __init__(self, window=None, ack_timeout=None):
+        self.window = deque(maxlen=window or config["ground_window"])  # rtt in s, None for a lost heartbeat
+        self.ack_timeout = ack_timeout or config["ground_ack_timeout"]
+        self.lock = threading.Lock()
+        self.listeners = []  # called with (state, stats()) on every state change
+        self.ack = None      # last ack message as received
+        self.seq = 0
+        self.outstanding = OrderedDict()  # seq -> (hb_timestamp, monotonic send time)
+        self.by_timestamp = {}            # hb_timestamp -> seq, for clients that only echo the timestamp
+        self.state = UNKNOWN
+        self.last_ack = None              # monotonic time of the last matched ack
+        self.last_ack_timestamp = None    # hb_timestamp of the last acked heartbeat
+        self.last_rtt = None
 
     def heartbeat(self):
+        now = time.monotonic()
+        with self.lock:
+            self._expire(now)
+            self.seq += 1
+            timestamp = time.time()
+            self.outstanding[self.seq] = (timestamp, now)
+            self.by_timestamp[timestamp] = self.seq
+            acked = self.last_ack is not None and now - self.last_ack < self.ack_timeout
+            heartbeat = {
+                "source": "raspberrypi",
+                "seq": self.seq,
+                "hb_timestamp": timestamp,
+                "ack_timestamp": self.last_ack_timestamp,
+                "strength": self._strength(),
+                "rtt": self.last_rtt,
+                "status": self.state,
+                "ack": acked,
+            }
+        self._evaluate(now)
+        return heartbeat
+
+    def acknowledge(self, ack):
+        """Matches an ack ({"seq": ..} and / or {"hb_timestamp" | "ack_timestamp": ..}) to its heartbeat."""
+        now = time.monotonic()
+        with self.lock:
+            self.ack = ack
+            seq = ack.get("seq") if isinstance(ack, dict) else None
+            if seq is None and isinstance(ack, dict):
+                seq = self.by_timestamp.get(ack.get("hb_timestamp") or ack.get("ack_timestamp"))
+            sent = self.outstanding.pop(seq, None)
+            if sent is None:
+                return False  # duplicate ack from another client, or one that came in after ack_timeout
+            timestamp, sent_at = sent
+            self.by_timestamp.pop(timestamp, None)
+            self.last_rtt = now - sent_at
+            self.last_ack = now
+            self.last_ack_timestamp = timestamp
+            self.window.append(self.last_rtt)
+        self._evaluate(now)
+        return True
+
+    def _expire(self, now):
+        while self.outstanding:
+            seq, (timestamp, sent_at) = next(iter(self.outstanding.items()))
+            if now - sent_at < self.ack_timeout:
+                break
+            del self.outstanding[seq]
+            self.by_timestamp.pop(timestamp, None)
+            if self.last_ack is not None:  # heartbeats before the first ack say nothing about the link
+                self.window.append(None)
+
+    # link quality
+
+    def stats(self):
+        with self.lock:
+            return self._stats(time.monotonic())
+
+    def _stats(self, now):
+        rtts = sorted(rtt for rtt in self.window if rtt is not None)
+        samples = len(self.window)
         return {
-            "source":"raspberrypi",
-            "hb_timestamp":time.time(),
-            "ack_timestamp":None,
-            "strength":None,
-            "status":"active",
-            "ack":False
+            "state": self.state,
+            "samples": samples,
+            "loss_pct": round(100.0 * (samples - len(rtts)) / samples, 1) if samples else None,
+            "rtt_ms": round(sum(rtts) / len(rtts) * 1000, 1) if rtts else None,
+            "rtt_p95_ms": round(rtts[min(len(rtts) - 1, int(len(rtts) * 0.95))] * 1000, 1) if rtts else None,
+            "since_ack": round(now - self.last_ack, 2) if self.last_ack is not None else None,
+            "strength": self._strength(),
         }
-    
+
     def network_strength(self):
-        pass
-
-    # def check_ack(self):
-    #     """Monitor acknowledgments when network monitoring is active."""
-    #     while True:
-    #         if self.ack:
-    #             if not self.timestamp_stack or self.timestamp_stack[-1] != self.ack["ack_timestamp"]:
-    #                self.timestamp_stack.append(self.ack["ack_timestamp"])
-    #                print(self.timestamp_stack)
-    #             else:
-    #                count = 0
-    #                while count<3:
-    #                    if self.timestamp_stack[-1] != self.ack["ack_timestamp"]:
-    #                       self.timestamp_stack.append(self.ack["ack_timestamp"])
-    #                       break
-    #                    count = count + 1
-    #                    time.sleep(1)
-    #                if count>3:
-    #                    self.network_monitoring = False
-    #                    print("Connection Lost from ground unit, triggering failsafe")
-    #                    self._stop_monitoring()
-    #         time.sleep(1)  # Check every sec (buffer time)        
-                
-
-    # def _start_monitoring(self):
-    #     self.monitoring_thread = threading.Thread(target=self.check_ack)
-    #     self.monitoring_thread.daemon = True
-    #     self.monitoring_thread.start()
-
-    # def _stop_monitoring(self):
-    #     """Stop the monitoring thread safely."""
-    #     if self.monitoring_thread.is_alive():
-    #         self.monitoring_thread.join()
+        with self.lock:
+            return self._strength()
+
+    def _strength(self):
+        """0-100 from the delivery ratio, scaled down linearly between the good and the lost RTT."""
+        if self.last_ack is None or not self.window:
+            return None
+        rtts = [rtt for rtt in self.window if rtt is not None]
+        if not rtts:
+            return 0
+        delivery = len(rtts) / len(self.window)
+        rtt = sum(rtts) / len(rtts)
+        good, bad = config["ground_good_rtt"], config["ground_lost_rtt"]
+        latency = 1.0 if rtt <= good else max(0.0, (bad - rtt) / (bad - good))
+        return int(round(100 * delivery * latency))
+
+    def _evaluate(self, now):
+        with self.lock:
+            if self.last_ack is None:
+                return
+            stats = self._stats(now)
+            loss = stats["loss_pct"] or 0.0
+            rtt = (stats["rtt_ms"] or 0.0) / 1000
+            if now - self.last_ack >= config["ground_lost_timeout"] or loss >= config["ground_lost_loss_pct"] \
+                    or rtt >= config["ground_lost_rtt"]:
+                state = LOST
+            elif loss >= config["ground_degraded_loss_pct"] or rtt >= config["ground_good_rtt"]:
+                state = DEGRADED
+            else:
+                state = OK
+            if state == self.state:
+                return
+            previous, self.state = self.state, state
+            stats["state"] = state
 
+        if state == OK:
+            log.info("✅ Ground link %s (was %s), rtt %s ms.", state, previous, stats["rtt_ms"])
+        else:
+            log.warning("⚠️ Ground link %s, loss %s%%, rtt %s ms, last ack %s s ago.",
+                        state, stats["loss_pct"], stats["rtt_ms"], stats["since_ack"])
+        for listener in list(self.listeners):
+            try:
+                listener(state, stats)
+            except Exception as e:
+                log.error("❌ Ground link listener failed: %s", e)
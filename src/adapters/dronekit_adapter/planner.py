@@ -1,40 +1,89 @@
 # custom UAV's task planner for custom missions
 
+import logging
 from dronekit import LocationGlobalRelative
-import time, math
+import threading, time
 from dronekit import VehicleMode
+from adapters.dronekit_adapter.dispatcher import LANE_FAILSAFE, LANE_MISSION
+from core.utils.geo import haversine
+from core.config.config import config
+from core.utils.metrics import metrics
+from core.utils.logger import throttled
+
+log = logging.getLogger(__name__)
+loop_log = throttled(__name__)  # progress lines from the climb / waypoint loops
+
+
+class ArrivalDetector:
+    """
+    Tracks the distance to a target from location update callbacks and flags arrival as soon as the
+    vehicle is inside the arrival radius, or will be within the lead time at its current groundspeed.
+    """
+
+    def __init__(self, vehicle, target_location, radius, lead_time):
+        self.vehicle = vehicle
+        self.target = target_location
+        self.radius = radius
+        self.lead_time = lead_time
+        self.arrived = threading.Event()
+        self.distance = None
+
+    def __enter__(self):
+        self.vehicle.add_attribute_listener('location.global_relative_frame', self._on_location)
+        self._on_location(self.vehicle, 'location.global_relative_frame', self.vehicle.location.global_relative_frame)
+        return self
+
+    def __exit__(self, *exc):
+        self.vehicle.remove_attribute_listener('location.global_relative_frame', self._on_location)
+
+    def _on_location(self, vehicle, attr_name, location):
+        if location is None or location.lat is None or location.lon is None:
+            return
+        distance = haversine(location.lat, location.lon, self.target.lat, self.target.lon)
+        self.distance = distance
+
+        groundspeed = vehicle.groundspeed or 0.0
+        if distance <= self.radius or distance - self.radius <= groundspeed * self.lead_time:
+            self.arrived.set()
+
+    def wait(self, timeout):
+        return self.arrived.wait(timeout)
+
 
 class Planner:
-    def __init__(self, vehicle):
+    def __init__(self, vehicle, link):
         self.vehicle = vehicle
+        self.link = link  # CommandDispatcher owning the vehicle writes
 
-    def set_mode(self, mode_name):
-        """Set the flight mode and confirm the switch."""
+    @metrics.timed("vehicle_command", op="set_mode")
+    def set_mode(self, mode_name, lane=LANE_MISSION):
+        """Set the flight mode and confirm the switch, safety switches pass lane=LANE_FAILSAFE."""
         try:
             if not self.vehicle:
-                print("❌ No vehicle connected!")
+                log.error("❌ No vehicle connected!")
                 return False
 
-            print(f"🔄 Switching to {mode_name} mode...")
-            self.vehicle.mode = VehicleMode(mode_name)
+            log.info("🔄 Switching to %s mode...", mode_name)
+            self.link.set(lane, 'mode', VehicleMode(mode_name))
             time.sleep(2)  # Allow mode switch time
 
             if self.vehicle.mode.name == mode_name:
-                print(f"✅ Successfully switched to {mode_name}.")
+                log.info("✅ Successfully switched to %s.", mode_name)
                 return True
             else:
-                print(f"❌ Failed to switch to {mode_name}.")
+                log.error("❌ Failed to switch to %s.", mode_name)
                 return False
 
         except Exception as e:
-            print(f"❌ Error: {e}")
+            log.error("❌ Error: %s", e)
             return False
 
 
+    @metrics.timed("vehicle_command", op="takeoff_and_hold")
     def takeoff_and_hold(self, target_alt, hover_mode=None):
      try:
         if not self.vehicle:
-            print("❌ No vehicle connected!")
+            log.error("❌ No vehicle connected!")
             return False
 
         target_alt = float(target_alt)  # Ensure valid altitude input
@@ -46,30 +95,30 @@ class Planner:
         # Decide the hover mode
         hover_mode = "LOITER" if gps_okay else "LAND"
 
-        print(f"📡 GPS Fix Type: {gps_fix} - {'Good' if gps_okay else 'Poor'}")
-        print(f"🔄 Selecting Hover Mode: {hover_mode}")
+        log.info("📡 GPS Fix Type: %s - %s", gps_fix, 'Good' if gps_okay else 'Poor')
+        log.info("🔄 Selecting Hover Mode: %s", hover_mode)
 
         # If already at or above target altitude, no need to climb
         if self.vehicle.location.global_relative_frame.alt >= target_alt:
-            print(f"🚀 Already at {target_alt}m. No climb needed.")
+            log.info("🚀 Already at %sm. No climb needed.", target_alt)
             return True
 
         # Switch to GUIDED mode for takeoff
         if not self.set_mode("GUIDED"):
-            print("⚠️ Failed to switch to GUIDED mode. Aborting takeoff.")
+            log.warning("⚠️ Failed to switch to GUIDED mode. Aborting takeoff.")
             return False
 
-        print(f"🚀 Taking off to {target_alt}m...")
-        self.vehicle.simple_takeoff(target_alt)
+        log.info("🚀 Taking off to %sm...", target_alt)
+        self.link.execute(LANE_MISSION, self.vehicle.simple_takeoff, target_alt)
 
         # Monitor altitude until it reaches target
         while True:
             current_alt = self.vehicle.location.global_relative_frame.alt
-            print(f"📡 Current Altitude: {current_alt:.2f} m")
+            loop_log.info("📡 Current Altitude: %.2f m", current_alt)
 
             # If 95% of target altitude is reached, proceed
             if current_alt >= target_alt * 0.95:
-                print(f"✅ Altitude {target_alt}m reached.")
+                log.info("✅ Altitude %sm reached.", target_alt)
                 break
 
             time.sleep(0.5)  # Small delay to avoid excessive polling
@@ -79,90 +128,124 @@ class Planner:
         gps_okay = gps_fix >= 3
         hover_mode = "LOITER" if gps_okay else "LAND"
 
-        print(f"🔄 Final GPS Check: {gps_fix} - {'Good' if gps_okay else 'Poor'}")
-        print(f"🔄 Switching to {hover_mode} mode...")
+        log.info("🔄 Final GPS Check: %s - %s", gps_fix, 'Good' if gps_okay else 'Poor')
+        log.info("🔄 Switching to %s mode...", hover_mode)
 
         if not self.set_mode(hover_mode):
-            print("⚠️ Failed to switch hover mode. Landing for safety.")
-            self.set_mode("LAND")
+            log.warning("⚠️ Failed to switch hover mode. Landing for safety.")
+            self.set_mode("LAND", LANE_FAILSAFE)
             return False
 
-        print(f"✅ Hovering at {target_alt}m in {hover_mode} mode.")
+        log.info("✅ Hovering at %sm in %s mode.", target_alt, hover_mode)
         return True
 
      except Exception as e:
-        print(f"❌ Error: {e}")
-        print("⚠️ Emergency Landing for Safety!")
-        self.set_mode("LAND")
+        log.error("❌ Error: %s", e)
+        log.warning("⚠️ Emergency Landing for Safety!")
+        self.set_mode("LAND", LANE_FAILSAFE)
         return False
 
+    @metrics.timed("vehicle_command", op="emergency_land")
     def emergency_land(self):
         """Safely land the drone in case of emergency."""
         try:
             if not self.vehicle:
-                print("❌ No vehicle connected!")
+                log.error("❌ No vehicle connected!")
                 return False
 
-            print("⚠️ Emergency detected! Initiating landing...")
+            log.warning("⚠️ Emergency detected! Initiating landing...")
 
             # Check GPS fix before deciding to LAND or RTL
             if self.vehicle.gps_0.fix_type < 3:  # Weak GPS fix
-                print("⚠️ Weak GPS! Performing immediate LAND.")
-                self.set_mode("LAND")
+                log.warning("⚠️ Weak GPS! Performing immediate LAND.")
+                self.set_mode("LAND", LANE_FAILSAFE)
             else:
-                print("🏡 GPS fix strong. Returning to launch (RTL).")
-                self.set_mode("RTL")
+                log.info("🏡 GPS fix strong. Returning to launch (RTL).")
+                self.set_mode("RTL", LANE_FAILSAFE)
 
             return True
 
         except Exception as e:
-            print(f"❌ Error: {e}")
+            log.error("❌ Error: %s", e)
             return False
         
 
     def _distance_to_wp(self, target_location):
-        """Calculate the ground distance in meters between two LocationGlobalRelative points."""
-        dlat = target_location.lat - self.vehicle.location.global_relative_frame.lat
-        dlong = target_location.lon - self.vehicle.location.global_relative_frame.lon
-        return math.sqrt((dlat * 1.113195e5) ** 2 + (dlong * 1.113195e5) ** 2)
+        """Calculate the ground distance in meters between the vehicle and a LocationGlobalRelative point."""
+        current = self.vehicle.location.global_relative_frame
+        return haversine(current.lat, current.lon, target_location.lat, target_location.lon)
 
-    def goto_wp(self, lat, lon, alt, groundspeed):
+    def _goto(self, target_location, groundspeed):
+        def send():
+            self.vehicle.groundspeed = groundspeed
+            self.vehicle.simple_goto(target_location)
+        self.link.execute(LANE_MISSION, send)
+
+    @metrics.timed("vehicle_command", op="goto_wp")
+    def goto_wp(self, lat, lon, alt, groundspeed, on_progress=None, control=None):
         """
         Smoothly navigate the drone to the given GPS waypoint.
         :param lat: Latitude of the target location
         :param lon: Longitude of the target location
         :param alt: Altitude in meters
         :param groundspeed: Groundspeed in m/s (default 5)
+        :param on_progress: optional callback, called with the remaining distance in meters
+        :param control: optional MissionControl, holds position while paused and aborts on cancel
         :return: True if reached successfully, False otherwise
         """
         try:
             target_location = LocationGlobalRelative(lat, lon, alt)
 
-            print(f"📍 Navigating to waypoint: ({lat}, {lon}, {alt}m)")
+            log.info("📍 Navigating to waypoint: (%s, %s, %sm)", lat, lon, alt)
 
             # Ensure we're in GUIDED mode
             self.set_mode("GUIDED")
 
-            self.vehicle.groundspeed = groundspeed
-            self.vehicle.simple_goto(target_location)
-
-            while True:
-                distance = self._distance_to_wp(target_location)
-                print(f"📡 Distance to waypoint: {distance:.2f} m")
-
-                if distance <= 1.0:  # Threshold for "arrived"
-                    print("✅ Reached waypoint.")
-                    break
-
-                time.sleep(1)
+            self._goto(target_location, groundspeed)
+
+            # arrival is flagged from location callbacks, the loop only wakes up to report progress
+            # and to react to pause / cancel requests
+            with ArrivalDetector(self.vehicle, target_location, config["wp_arrival_radius"],
+                                 config["wp_arrival_lead_time"]) as detector:
+                last_report = 0.0
+                while not detector.wait(0.2):
+                    if control is not None:
+                        if control.is_cancelled():
+                            return False
+                        if control.is_paused():
+                            self._hold_until_resumed(control)
+                            if control.is_cancelled():
+                                return False
+                            if detector.vehicle is not self.vehicle:
+                                # reconnected while paused, fly the leg again on the new vehicle object
+                                return self.goto_wp(lat, lon, alt, groundspeed, on_progress, control)
+                            # continue the leg where it was interrupted
+                            self.set_mode("GUIDED")
+                            self._goto(target_location, groundspeed)
+
+                    now = time.time()
+                    if detector.distance is not None and now - last_report >= 1.0:
+                        last_report = now
+                        loop_log.info("📡 Distance to waypoint: %.2f m", detector.distance)
+                        if on_progress:
+                            on_progress(detector.distance)
+
+            log.info("✅ Reached waypoint.")
+            if on_progress:
+                on_progress(detector.distance or 0.0)
 
             return True
 
         except Exception as e:
-            print(f"❌ Navigation error: {e}")
+            log.error("❌ Navigation error: %s", e)
             return False    
-    
 
+    def _hold_until_resumed(self, control):
+        log.info("⏸️ Mission paused, holding position.")
+        self.stop()
+        control.wait_while_paused()
+        log.info("▶️ Mission resumed.")
+    
     def stop(self):
      try:
         # Determine appropriate hold mode
@@ -170,18 +253,18 @@ class Planner:
         gps_okay = gps_fix >= 3
         hold_mode = "LOITER" if gps_okay else "BRAKE"
 
-        print(f"📡 GPS Fix Type: {gps_fix} - {'Good' if gps_okay else 'Poor'}")
-        print(f"🔄 Switching to Hold Mode: {hold_mode}")
+        log.info("📡 GPS Fix Type: %s - %s", gps_fix, 'Good' if gps_okay else 'Poor')
+        log.info("🔄 Switching to Hold Mode: %s", hold_mode)
 
         if not self.set_mode(hold_mode):
-            print("⚠️ Failed to switch to hold mode.")
+            log.warning("⚠️ Failed to switch to hold mode.")
             return False
 
-        print("🛑 Drone is now holding position.")
+        log.info("🛑 Drone is now holding position.")
         return True
 
      except Exception as e:
-        print(f"❌ Error during hold: {e}")
+        log.error("❌ Error during hold: %s", e)
         return False
 
 
@@ -0,0 +1,122 @@
+# vehicle readiness after a fast connect. dronekit.connect(wait_ready=False) returns on the first heartbeat
+# while the parameter download keeps streaming in the background; this tracks its progress from the
+# PARAM_VALUE messages and lets each operation wait only for the attributes it actually reads, instead of
+# holding the whole connection until every attribute and parameter has arrived.
+
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+PARTIAL = "partial"
+READY = "ready"
+
+# dronekit attribute names an operation needs populated before it may run, operations that write a
+# parameter (arming disables ARMING_CHECK, a mission arms) need the whole parameter download
+REQUIREMENTS = {
+    "mode": ("mode",),
+    "arm": ("mode", "armed", "parameters"),
+    "takeoff": ("mode", "armed", "gps_0", "location.global_relative_frame"),
+    "mission": ("mode", "armed", "gps_0", "location.global_relative_frame", "battery", "parameters"),
+    "manual": ("mode", "armed", "channels"),
+    "parameters": ("parameters",),
+}
+
+
+class VehicleReadiness:
+    def __init__(self, vehicle, fetch_params=True, on_progress=None, interval=0.5):
+        """
+        :param fetch_params: False for vehicles without a parameter download (mock, replay), they are ready at once
+        :param on_progress: called with progress() at most every `interval` seconds and once on completion
+        """
+        self.vehicle = vehicle
+        self.on_progress = on_progress
+        self.interval = interval
+        self.total = None
+        self.indices = set()
+        self.lock = threading.Lock()  # the listener thread and start() both fill indices
+        self.complete = threading.Event()
+        self.started = time.monotonic()
+        self.reported = 0.0
+        if not fetch_params:
+            self.total = 0
+            self.complete.set()
+
+    def start(self):
+        if self.complete.is_set():
+            return
+        # listen first, a parameter arriving while the snapshot is taken is then seen by the listener
+        self.vehicle.add_message_listener('PARAM_VALUE', self._on_param)
+        # dronekit.connect returns once the first PARAM_VALUEs are in, merge in what it already has
+        received = getattr(self.vehicle, "_params_set", None)
+        if received:
+            with self.lock:
+                if self.total is None:
+                    self.total = len(received)
+                if self.total == len(received):
+                    self.indices.update(index for index, msg in enumerate(received) if msg is not None)
+                done = len(self.indices) >= self.total
+            if done:
+                self._completed(time.monotonic())
+
+    def stop(self):
+        try:
+            self.vehicle.remove_message_listener('PARAM_VALUE', self._on_param)
+        except Exception:
+            pass
+
+    def _on_param(self, vehicle, name, msg):
+        with self.lock:
+            if msg.param_count != self.total:
+                if self.total is not None:
+                    self.indices = set()  # a new parameter set, the autopilot rebooted
+                    self.complete.clear()
+                self.total = msg.param_count
+            if msg.param_index < msg.param_count:
+                self.indices.add(msg.param_index)
+            done = len(self.indices) >= self.total
+
+        now = time.monotonic()
+        if done and not self.complete.is_set():
+            self._completed(now)
+        elif now - self.reported >= self.interval:
+            self._report(now)
+
+    def _completed(self, now):
+        with self.lock:
+            if self.complete.is_set():
+                return
+            self.complete.set()
+        log.info("✅ %d parameters downloaded in %.1f s.", self.total, now - self.started)
+        self._report(now)
+
+    def _report(self, now):
+        self.reported = now
+        if self.on_progress:
+            try:
+                self.on_progress(self.progress())
+            except Exception as e:
+                log.error("❌ Parameter progress handler failed: %s", e)
+
+    def progress(self):
+        received = len(self.indices)
+        return {
+            "state": self.state(),
+            "received": received,
+            "total": self.total,
+            "pct": round(100.0 * received / self.total, 1) if self.total else (100.0 if self.complete.is_set() else 0.0),
+        }
+
+    def state(self):
+        return READY if self.complete.is_set() else PARTIAL
+
+    def wait_for(self, operation, timeout):
+        """Blocks until the attributes `operation` reads are populated, False on timeout."""
+        attributes = REQUIREMENTS[operation]
+        if "parameters" in attributes and not self.complete.wait(timeout):
+            return False
+        wait_ready = getattr(self.vehicle, "wait_ready", None)
+        if wait_ready is None:
+            return True
+        return wait_ready(*attributes, timeout=timeout, raise_exception=False) is not False
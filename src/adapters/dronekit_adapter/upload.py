@@ -1,115 +1,103 @@
+import logging
 import time, os
-from dronekit import Command
-from pymavlink import mavutil, mavwp
+from adapters.dronekit_adapter.mission_transfer import MissionTransfer, mission_checksum, wire_item
+from adapters.dronekit_adapter.dispatcher import LANE_MISSION
+from core.config.config import config
+from core.utils.metrics import metrics
+from mission.mission_io import (
+    read_wpl, WplWriter, MAV_CMD_NAV_WAYPOINT, MAV_FRAME_GLOBAL, MAV_FRAME_GLOBAL_RELATIVE_ALT,
+)
+
+log = logging.getLogger(__name__)
 
 class WaypointUploader:
-    def __init__(self, vehicle):
+    def __init__(self, vehicle, link):
         self.vehicle = vehicle
+        self.link = link  # CommandDispatcher owning the vehicle writes
+        self.uploaded_checksum = None  # checksum of what the autopilot requested, acked and reported on the last upload
+        self.uploaded_count = 0
 
     def upload_mission(self, waypoint_file):
      try:
-        print(f"📂 Reading waypoints from {waypoint_file}...")
+        log.info("📂 Reading waypoints from %s...", waypoint_file)
+        mission = read_wpl(waypoint_file)  # raises WplParseError with the line number on bad input
+        return self.upload_items(mission)
 
-        with open(waypoint_file, 'r') as file:
-            lines = file.readlines()
+     except Exception as e:
+        log.error("❌ Mission upload failed: %s", e)
+        return False
 
-        # Ensure correct format (QGC WPL 110)
-        if not lines or "QGC WPL 110" not in lines[0]:
-            print("❌ Invalid waypoint file format!")
+    @metrics.timed("vehicle_command", op="upload_mission")
+    def upload_items(self, items):
+        """Uploads MISSION_ITEM_INT tuples through the mission handshake, see MissionTransfer."""
+        try:
+            started = time.time()
+            transfer = MissionTransfer(self.vehicle, self.link, items, config["mission_item_timeout"], config["mission_max_retries"])
+            self.uploaded_checksum = transfer.run()
+            self.uploaded_count = transfer.count
+            log.info("✅ Mission accepted: %s items in %.2fs (checksum %08x)",
+                     len(items), time.time() - started, self.uploaded_checksum)
+            return True
+        except Exception as e:
+            log.error("❌ Mission upload failed: %s", e)
             return False
 
-        waypoints = lines[1:]  # Skip the header line
-
-        cmds = self.vehicle.commands
-        cmds.clear()
-        time.sleep(1)
-
-        for i, line in enumerate(waypoints):
-            items = line.strip().split('\t')
-            if len(items) < 12:
-                continue  # Skip invalid lines
-
-            lat = float(items[8])
-            lon = float(items[9])
-            alt = float(items[10])
-            command = int(items[3])
-
-            # Convert lat/lon to integer format for MISSION_ITEM_INT
-            lat_int = int(lat * 1e7)
-            lon_int = int(lon * 1e7)
-
-            print(f"📌 Sending MISSION_ITEM_INT: lat={lat}, lon={lon}, alt={alt}, cmd={command}")
-
-            # Send MISSION_ITEM_INT
-            self.vehicle.message_factory.mission_item_int_send(
-                0,  # Target system
-                0,  # Target component
-                i,  # Sequence
-                mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT,
-                command,
-                0,  # Current (0=not current, 1=current)
-                0,  # Autocontinue
-                0, 0, 0, 0,  # Params 1-4
-                lat_int,  # Latitude in 1e7 format
-                lon_int,  # Longitude in 1e7 format
-                alt  # Altitude
-            )
-
-            time.sleep(0.1)  # Small delay for stability
-        
-        self.verify_mission()
-        print("✅ All waypoints sent as MISSION_ITEM_INT!")
-        return True
-
-     except Exception as e:
-        print("❌ Mission upload failed:", e)
-        return False
+    def verify_mission(self, items=None):
+        """
+        Verifies the mission on the autopilot against a local plan using the checksum of the last
+        accepted upload, without downloading the mission again. Without items it only tells whether
+        an upload went through.
+        """
+        if self.uploaded_checksum is None:
+            log.warning("⚠️ No mission has been uploaded yet.")
+            return False
+        if items is None:
+            return True
 
+        matches = mission_checksum([wire_item(item) for item in items]) == self.uploaded_checksum
+        if matches:
+            log.info("✅ Mission verification complete: %s waypoints on the autopilot.", self.uploaded_count)
+        else:
+            log.warning("⚠️ Mission on the autopilot differs from the local plan, re-upload required.")
+        return matches
 
-    def verify_mission(self):
+    def download_and_count(self):
         """
         Verifies the uploaded mission by downloading and counting waypoints.
         """
         try:
-            print("📡 Fetching stored mission for verification...")
-            self.vehicle.commands.download()
-            time.sleep(2)  # Allow time for commands to sync
+            log.info("📡 Fetching stored mission for verification...")
+            self.link.execute(LANE_MISSION, self.vehicle.commands.download)
             self.vehicle.commands.wait_ready()
             
             cmds_list = list(self.vehicle.commands)  # Convert to list to force evaluation
             total_waypoints = len(cmds_list)
 
-            print(f"✅ Mission verification complete: {total_waypoints} waypoints uploaded!")
+            log.info("✅ Mission verification complete: %s waypoints uploaded!", total_waypoints)
 
             if total_waypoints == 0:
-                print("⚠️ Warning: No waypoints found! Try re-uploading or check MAVLink compatibility.")
+                log.warning("⚠️ Warning: No waypoints found! Try re-uploading or check MAVLink compatibility.")
+            return total_waypoints
 
         except Exception as e:
-            print(f"❌ Mission verification failed: {e}")
+            log.error("❌ Mission verification failed: %s", e)
+            return None
 
-    def _generate_wp_content(self, waypoints):
-     try:
-        content = "QGC WPL 110\n"
+    def _write_wp_content(self, file_path, waypoints):
+        with WplWriter(file_path) as writer:
+            # Home location (first WP)
+            home = waypoints[0]
+            writer.write_item(MAV_FRAME_GLOBAL, MAV_CMD_NAV_WAYPOINT, home['lat'], home['lon'], home['alt'], current=1)
 
-        # Home location (first WP)
-        home = waypoints[0]
-        content += f"0\t1\t0\t16\t0\t0\t0\t0\t{home['lat']}\t{home['lon']}\t{home['alt']}\t1\n"
-
-        # Waypoints
-        for index, wp in enumerate(waypoints, start=1):
-            content += f"{index}\t0\t3\t16\t0\t0\t0\t0\t{wp['lat']}\t{wp['lon']}\t{wp['alt']}\t1\n"
-
-        return content
-
-     except Exception as e:
-        print(f"❌ Error while generating waypoint content: {e}")
-        return None
+            # Waypoints
+            for wp in waypoints:
+                writer.write_item(MAV_FRAME_GLOBAL_RELATIVE_ALT, MAV_CMD_NAV_WAYPOINT, wp['lat'], wp['lon'], wp['alt'])
 
 
     def save_wp_file(self, waypoints, filename="mission.waypoints"):
      try:
-        content = self._generate_wp_content(waypoints)
-        if content is None:
+        if not waypoints:
+            log.error("❌ Error while generating waypoint content: no waypoints given")
             return False
 
         # Find root directory (where main script resides)
@@ -122,15 +110,12 @@ class WaypointUploader:
         # Complete path to the file
         file_path = os.path.join(dir_path, filename)
 
-        # Write content to file
-        with open(file_path, "w") as f:
-            f.write(content)
+        # Stream items straight to the file
+        self._write_wp_content(file_path, waypoints)
 
-        print(f"✅ Waypoint file saved at: {file_path}")
+        log.info("✅ Waypoint file saved at: %s", file_path)
         return True
 
      except Exception as e:
-        print(f"❌ Failed to save .waypoints file: {e}")
+        log.error("❌ Failed to save .waypoints file: %s", e)
         return False
-
-
@@ -0,0 +1,236 @@
+# deterministic simulated vehicle for tests and benchmarks. A fixed step loop integrates simple
+# kinematics (climb / descend rates, straight line travel at the commanded groundspeed, a linear battery
+# drain) and applies mode switches and arming after a configurable number of ticks, so a run behaves
+# the same every time and handler latencies can be compared between builds.
+
+import logging
+import math
+import threading
+import time
+from types import SimpleNamespace
+
+from dronekit import VehicleMode
+
+from adapters.virtual_adapter.vehicle import VirtualVehicle
+from core.utils.geo import EARTH_RADIUS, haversine
+
+log = logging.getLogger(__name__)
+
+ARMABLE_MODES = ("STABILIZE", "ALT_HOLD", "LOITER", "GUIDED")
+HOLD_MODES = ("STABILIZE", "ALT_HOLD", "LOITER", "BRAKE", "POSHOLD")
+
+DEFAULT_MOCK = {
+    "home": (28.5104, 77.37),    # lat, lon
+    "rate_hz": 20,               # simulation steps per second
+    "mode_delay": 0.2,           # s until a mode switch shows up in the heartbeat
+    "arm_delay": 0.5,            # s until the motors are armed
+    "max_speed": 10.0,           # m/s horizontal
+    "climb_rate": 2.5,           # m/s
+    "land_rate": 1.0,            # m/s
+    "rtl_altitude": 15.0,        # m
+    "battery_full": 16.8,        # V
+    "battery_empty": 14.0,       # V
+    "flight_minutes": 20.0,      # armed time from full to empty
+}
+
+
+class MockVehicle(VirtualVehicle):
+    def __init__(self, settings=None):
+        super().__init__()
+        self.settings = dict(DEFAULT_MOCK, **(settings or {}))
+        self.dt = 1.0 / self.settings["rate_hz"]
+        self.home = tuple(self.settings["home"])
+
+        lat, lon = self.home
+        self.location.global_frame.lat = self.location.global_relative_frame.lat = lat
+        self.location.global_frame.lon = self.location.global_relative_frame.lon = lon
+        self.location.global_frame.alt = 0.0
+        self.location.global_relative_frame.alt = 0.0
+        self.gps_0.fix_type = 3
+        self.gps_0.satellites_visible = 12
+        self.ekf_ok = True
+        self.battery.voltage = self.settings["battery_full"]
+        self.battery.current = 0.0
+        self.battery.level = 100
+        self.system_status.state = "STANDBY"
+
+        self.speed_command = 5.0  # groundspeed setpoint, dronekit's groundspeed setter
+        self.target = None        # (lat, lon, alt) while flying in GUIDED / RTL
+        self.pending = []         # [(tick due, attribute, value)]
+        self.ticks = 0
+        self.charge = 1.0
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="mock-vehicle", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.running = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(1.0)
+
+    # commands
+
+    def _delay_ticks(self, seconds):
+        return self.ticks + max(1, int(round(seconds / self.dt)))
+
+    def command(self, name, value):
+        changed = ()
+        with self.lock:
+            if name == "mode":
+                self.pending.append((self._delay_ticks(self.settings["mode_delay"]), "mode", value))
+            elif name == "armed" and value:
+                if self._mode.name not in ARMABLE_MODES:
+                    log.warning("⚠️ Mock vehicle refuses to arm in %s.", self._mode.name)
+                    return
+                self.pending.append((self._delay_ticks(self.settings["arm_delay"]), "armed", True))
+            elif name == "armed":
+                changed = self._apply("armed", False)  # disarm takes effect right away
+            elif name == "groundspeed":
+                self.speed_command = float(value)
+            else:
+                setattr(self, "_" + name, value)
+        for attr_name in changed:
+            self.notify(attr_name)
+
+    def simple_takeoff(self, altitude):
+        with self.lock:
+            if not self._armed or self._mode.name != "GUIDED":
+                return
+            here = self.location.global_relative_frame
+            self.target = (here.lat, here.lon, float(altitude))
+
+    def simple_goto(self, location, airspeed=None, groundspeed=None):
+        with self.lock:
+            if not self._armed or self._mode.name != "GUIDED":
+                return
+            if groundspeed:
+                self.speed_command = float(groundspeed)
+            self.target = (location.lat, location.lon, location.alt)
+
+    # simulation
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while self.running:
+            self.step()
+            next_tick += self.dt
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
+
+    def step(self):
+        """Advances the simulation by one fixed tick, callable directly for lock-step tests."""
+        changed = set()
+        with self.lock:
+            self.ticks += 1
+            due = [p for p in self.pending if p[0] <= self.ticks]
+            self.pending = [p for p in self.pending if p[0] > self.ticks]
+            for _, name, value in due:
+                changed.update(self._apply(name, value))
+            changed.update(self._move())
+            changed.update(self._drain())
+        for attr_name in changed:
+            self.notify(attr_name)
+        self.notify_message("RAW_IMU", self._imu())
+        self.beat()
+
+    def _imu(self):
+        # the autopilot streams the IMU continuously, a deterministic vibration keeps the values moving
+        phase = self.ticks * 0.7
+        vibration = 0.05 if self._armed else 0.002
+        return SimpleNamespace(
+            xacc=vibration * math.sin(phase), yacc=vibration * math.cos(phase), zacc=-9.81 + vibration * math.sin(2 * phase),
+            xgyro=vibration * math.cos(phase), ygyro=vibration * math.sin(phase), zgyro=0.0,
+            xmag=0.22, ymag=0.01, zmag=-0.42,
+        )
+
+    def _apply(self, name, value):
+        if name == "mode":
+            self._mode = value if isinstance(value, VehicleMode) else VehicleMode(str(value))
+            if self._mode.name in HOLD_MODES:
+                self.target = None
+            elif self._mode.name == "RTL":
+                self.target = (self.home[0], self.home[1], max(self.settings["rtl_altitude"], self._altitude()))
+            return ("mode",)
+        if name == "armed":
+            self._armed = bool(value)
+            self.system_status.state = "ACTIVE" if self._armed else "STANDBY"
+            if not self._armed:
+                self.target = None
+            return ("armed",)
+        return ()
+
+    def _altitude(self):
+        return self.location.global_relative_frame.alt or 0.0
+
+    def _move(self):
+        here = self.location.global_relative_frame
+        vx = vy = vz = 0.0
+        mode = self._mode.name
+
+        if self._armed and mode == "LAND":
+            vz = -self.settings["land_rate"]
+        elif self._armed and self.target is not None and mode in ("GUIDED", "RTL"):
+            lat, lon, alt = self.target
+            distance = haversine(here.lat, here.lon, lat, lon)
+            speed = min(self.speed_command, self.settings["max_speed"])
+            if distance > 0.05:
+                step = min(speed * self.dt, distance)
+                bearing = math.atan2(
+                    math.radians(lon - here.lon) * math.cos(math.radians(here.lat)), math.radians(lat - here.lat))
+                vx, vy = step / self.dt * math.sin(bearing), step / self.dt * math.cos(bearing)
+                self.attitude.yaw = bearing
+            climb = self.settings["climb_rate"]
+            vz = max(-climb, min(climb, (alt - self._altitude()) / self.dt))
+            if mode == "RTL" and distance <= 0.05:
+                self._mode = VehicleMode("LAND")
+                return ("mode",)
+
+        if not (vx or vy or vz):
+            if self._groundspeed or self.velocity[2]:
+                self._groundspeed = 0.0
+                self.velocity = [0.0, 0.0, 0.0]
+                return ("groundspeed", "velocity")
+            return ()
+
+        # flat earth step, fine for the few hundred meters a test flight covers
+        lat = here.lat + math.degrees(vy * self.dt / EARTH_RADIUS)
+        lon = here.lon + math.degrees(vx * self.dt / (EARTH_RADIUS * math.cos(math.radians(here.lat))))
+        alt = max(0.0, self._altitude() + vz * self.dt)
+        for frame in (self.location.global_frame, self.location.global_relative_frame):
+            frame.lat, frame.lon = lat, lon
+        self.location.global_relative_frame.alt = alt
+        self.location.global_frame.alt = alt
+        self._groundspeed = math.hypot(vx, vy)
+        self.velocity = [vy, vx, -vz]  # NED
+
+        changed = ["location.global_frame", "location.global_relative_frame", "groundspeed", "velocity", "attitude"]
+        if alt <= 0.0 and mode == "LAND" and self._armed:
+            self._armed = False  # landed, autopilot disarms
+            self.system_status.state = "STANDBY"
+            changed.append("armed")
+        return changed
+
+    def _drain(self):
+        s = self.settings
+        if not self._armed:
+            if self.battery.current:
+                self.battery.current = 0.0
+                return ("battery",)
+            return ()
+        self.charge = max(0.0, self.charge - self.dt / (s["flight_minutes"] * 60.0))
+        level = int(round(self.charge * 100))
+        voltage = round(s["battery_empty"] + (s["battery_full"] - s["battery_empty"]) * self.charge, 2)
+        if level == self.battery.level and voltage == self.battery.voltage and self.battery.current:
+            return ()
+        self.battery.level, self.battery.voltage, self.battery.current = level, voltage, 15.0
+        return ("battery",)
@@ -0,0 +1,170 @@
+# plays recorded flight logs back as a vehicle. Every recorded telemetry row is applied to the virtual
+# vehicle's attributes and the matching dronekit listeners fire, so the telemetry store, streamers and
+# socket.io fan-out see the same updates they would see from the autopilot. Commands are ignored.
+
+import glob
+import logging
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from dronekit import VehicleMode
+
+from adapters.virtual_adapter.vehicle import VirtualVehicle
+from flightlog.log_format import LOG_SUFFIX
+from flightlog.log_reader import LogReader
+
+log = logging.getLogger(__name__)
+
+# recorded column -> (attribute listener to fire, setter)
+COLUMN_TARGETS = {
+    "nav.latitude": ("location.global_frame", lambda v, x: (setattr(v.location.global_frame, "lat", x),
+                                                            setattr(v.location.global_relative_frame, "lat", x))),
+    "nav.longitude": ("location.global_frame", lambda v, x: (setattr(v.location.global_frame, "lon", x),
+                                                             setattr(v.location.global_relative_frame, "lon", x))),
+    "nav.altitude": ("location.global_relative_frame", lambda v, x: setattr(v.location.global_relative_frame, "alt", x)),
+    "nav.groundspeed": ("groundspeed", lambda v, x: setattr(v, "_groundspeed", x)),
+    "nav.airspeed": ("airspeed", lambda v, x: setattr(v, "_airspeed", x)),
+    "nav.climbrate": ("velocity", lambda v, x: v.velocity.__setitem__(2, x)),
+    "attitude.yaw": ("attitude", lambda v, x: setattr(v.attitude, "yaw", x)),
+    "attitude.pitch": ("attitude", lambda v, x: setattr(v.attitude, "pitch", x)),
+    "attitude.roll": ("attitude", lambda v, x: setattr(v.attitude, "roll", x)),
+    "gps.fixtype": ("gps_0", lambda v, x: setattr(v.gps_0, "fix_type", None if x is None else int(x))),
+    "gps.satellites": ("gps_0", lambda v, x: setattr(v.gps_0, "satellites_visible", None if x is None else int(x))),
+    "gps.gpsaltitude": ("location.global_frame", lambda v, x: setattr(v.location.global_frame, "alt", x)),
+    "system.flight_mode": ("mode", lambda v, x: setattr(v, "_mode", VehicleMode(x or "UNKNOWN"))),
+    "system.armed": ("armed", lambda v, x: setattr(v, "_armed", bool(x))),
+    "system.ekfstatus": ("ekf_ok", lambda v, x: setattr(v, "ekf_ok", bool(x))),
+    "battery.voltage": ("battery", lambda v, x: setattr(v.battery, "voltage", x)),
+    "battery.current": ("battery", lambda v, x: setattr(v.battery, "current", x)),
+    "battery.level": ("battery", lambda v, x: setattr(v.battery, "level", None if x is None else int(x))),
+}
+
+# imu columns -> (vehicle attribute, axis, RAW_IMU field), replayed as messages like the autopilot sends them
+IMU_COLUMNS = {
+    f"imu.{group}.{axis}": (attribute, axis, axis + prefix)
+    for group, attribute, prefix in (("acceleration", "acceleration", "acc"), ("gyroscope", "gyro", "gyro"),
+                                     ("magnetometer", "mag_field", "mag"))
+    for axis in "xyz"
+}
+
+
+def find_logs(path):
+    """A .vlog file, or every .vlog of a directory / glob pattern, in recording order."""
+    if os.path.isdir(path):
+        paths = glob.glob(os.path.join(path, f"*{LOG_SUFFIX}"))
+    else:
+        paths = glob.glob(path)
+    if not paths:
+        raise FileNotFoundError(f"No flight logs found at {path}.")
+    return sorted(paths)
+
+
+class ReplayVehicle(VirtualVehicle):
+    def __init__(self, path, speed=1.0, loop=False):
+        """
+        :param path: log file, directory or glob of recorded flights
+        :param speed: playback rate, 1 = real time, N = N times faster, 0 = as fast as possible
+        :param loop: start over at the end of the recording
+        """
+        super().__init__()
+        self.paths = find_logs(path)
+        self.speed = float(speed)
+        self.loop = loop
+        self.rows_played = 0
+        self.position = None  # recorded timestamp of the last row played
+        self.finished = threading.Event()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="replay-vehicle", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.running = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(2.0)
+
+    def set_speed(self, speed):
+        speed = float(speed)
+        if speed < 0:
+            raise ValueError("Replay speed must be >= 0.")
+        self.speed = speed  # picked up on the next row, the playback clock is re-anchored there
+        return speed
+
+    def command(self, name, value):
+        log.warning("⚠️ Replay vehicle ignores '%s' commands.", name)
+
+    def status(self):
+        return {"files": len(self.paths), "speed": self.speed, "rows_played": self.rows_played,
+                "position": self.position, "finished": self.finished.is_set()}
+
+    # playback
+
+    def _rows(self):
+        for path in self.paths:
+            with LogReader(path) as reader:
+                names = reader.columns("telemetry")
+                for chunk in reader.stream_chunks("telemetry"):
+                    columns = reader.read_chunk(chunk)
+                    # NaN (missing) -> None, so unchanged gaps compare equal between rows
+                    lists = [(np.where(np.isnan(values), None, values) if values.dtype.kind == "f" else values).tolist()
+                             for values in (columns[name] for name in names)]
+                    for row in zip(*lists):
+                        yield dict(zip(names, row))
+                    del columns, lists  # release the views before the mapping is closed
+
+    def _run(self):
+        while self.running:
+            self._play()
+            if not self.loop:
+                break
+        self.finished.set()
+
+    def _play(self):
+        previous = {}
+        anchor = None  # (recorded time, wall clock time, speed) the schedule is computed from
+        for row in self._rows():
+            if not self.running:
+                return
+
+            timestamp = row["timestamp"]
+            speed = self.speed
+            if speed > 0:
+                if anchor is None or anchor[2] != speed:
+                    anchor = (timestamp, time.monotonic(), speed)
+                delay = anchor[1] + (timestamp - anchor[0]) / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                anchor = None
+
+            self._apply(row, previous)
+            previous = row
+            self.position = timestamp
+            self.rows_played += 1
+            self.beat()
+
+    def _apply(self, row, previous):
+        changed = set()
+        for column, (attr_name, setter) in COLUMN_TARGETS.items():
+            if column not in row or row[column] == previous.get(column):
+                continue
+            setter(self, row[column])
+            changed.add(attr_name)
+
+        for attr_name in changed:
+            self.notify(attr_name)
+
+        if any(row.get(column) != previous.get(column) for column in IMU_COLUMNS):
+            msg = {}
+            for column, (attribute, axis, field) in IMU_COLUMNS.items():
+                setattr(getattr(self, attribute), axis, row.get(column))
+                msg[field] = row.get(column)
+            self.notify_message("RAW_IMU", SimpleNamespace(**msg))
@@ -0,0 +1,181 @@
+# in-process stand-in for a dronekit Vehicle. Exposes the attributes TelemetryModel, HeartbeatModel and
+# the adapters read, and fires dronekit style attribute / message listeners, so the services above it
+# (telemetry store, streamers, missions) run unchanged without hardware. Subclasses decide where the
+# state comes from (a recorded flight, a simulation) and what commands do.
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+from dronekit import VehicleMode
+
+log = logging.getLogger(__name__)
+
+
+class VirtualChannels(dict):
+    """vehicle.channels, current RC input plus the override dict written by MotorController / ManualControl."""
+
+    def __init__(self):
+        super().__init__({str(ch): 1500 for ch in range(1, 9)})
+        self._overrides = {}
+
+    @property
+    def overrides(self):
+        return self._overrides
+
+    @overrides.setter
+    def overrides(self, values):
+        self._overrides = dict(values)
+
+
+class VirtualCommands(list):
+    """vehicle.commands, mission download is instant and returns whatever was stored."""
+
+    def download(self):
+        return None
+
+    def wait_ready(self, **kwargs):
+        return True
+
+
+class VirtualVehicle:
+    def __init__(self):
+        self._attribute_listeners = defaultdict(list)
+        self._message_listeners = defaultdict(list)
+        self._listener_lock = threading.Lock()
+
+        self.location = SimpleNamespace(
+            global_frame=SimpleNamespace(lat=None, lon=None, alt=None),
+            global_relative_frame=SimpleNamespace(lat=None, lon=None, alt=None),
+        )
+        self.velocity = [0.0, 0.0, 0.0]
+        self.attitude = SimpleNamespace(yaw=0.0, pitch=0.0, roll=0.0)
+        self.gps_0 = SimpleNamespace(fix_type=0, satellites_visible=0)
+        self.ekf_ok = False
+        self.battery = SimpleNamespace(voltage=None, current=None, level=None)
+        self.acceleration = SimpleNamespace(x=0.0, y=0.0, z=0.0)
+        self.gyro = SimpleNamespace(x=0.0, y=0.0, z=0.0)
+        self.mag_field = SimpleNamespace(x=0.0, y=0.0, z=0.0)
+        self.system_status = SimpleNamespace(state="STANDBY")
+        self.channels = VirtualChannels()
+        self.parameters = {}
+        self.commands = VirtualCommands()
+        self.message_factory = None  # no raw mavlink link, mission uploads are not supported
+        self._master = None
+
+        self._mode = VehicleMode("STABILIZE")
+        self._armed = False
+        self._groundspeed = 0.0
+        self._airspeed = 0.0
+        self._last_beat = time.monotonic()
+        self._last_heartbeat_msg = None
+
+    # attributes written by commands, subclasses decide what a command does through command()
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @mode.setter
+    def mode(self, value):
+        self.command("mode", value)
+
+    @property
+    def armed(self):
+        return self._armed
+
+    @armed.setter
+    def armed(self, value):
+        self.command("armed", bool(value))
+
+    @property
+    def groundspeed(self):
+        return self._groundspeed
+
+    @groundspeed.setter
+    def groundspeed(self, value):
+        self.command("groundspeed", value)
+
+    @property
+    def airspeed(self):
+        return self._airspeed
+
+    @airspeed.setter
+    def airspeed(self, value):
+        self.command("airspeed", value)
+
+    def command(self, name, value):
+        setattr(self, "_" + name, value)
+        self.notify(name)
+
+    def simple_goto(self, location, airspeed=None, groundspeed=None):
+        pass
+
+    def simple_takeoff(self, altitude):
+        pass
+
+    # heartbeat, HeartbeatModel reads the seconds since the last one, listeners get a HEARTBEAT at 1 Hz
+
+    @property
+    def last_heartbeat(self):
+        return time.monotonic() - self._last_beat
+
+    def beat(self):
+        now = self._last_beat = time.monotonic()
+        if self._last_heartbeat_msg is None or now - self._last_heartbeat_msg >= 1.0:
+            self._last_heartbeat_msg = now
+            self.notify_message("HEARTBEAT", SimpleNamespace(type=2, autopilot=3, system_status=self.system_status.state))
+
+    # dronekit listener api
+
+    def add_attribute_listener(self, attr_name, fn):
+        with self._listener_lock:
+            self._attribute_listeners[attr_name].append(fn)
+
+    def remove_attribute_listener(self, attr_name, fn):
+        with self._listener_lock:
+            listeners = self._attribute_listeners.get(attr_name, [])
+            if fn in listeners:
+                listeners.remove(fn)
+
+    def add_message_listener(self, name, fn):
+        with self._listener_lock:
+            self._message_listeners[name].append(fn)
+
+    def remove_message_listener(self, name, fn):
+        with self._listener_lock:
+            listeners = self._message_listeners.get(name, [])
+            if fn in listeners:
+                listeners.remove(fn)
+
+    def _value(self, attr_name):
+        value = self
+        for key in attr_name.split("."):
+            value = getattr(value, key)
+        return value
+
+    def notify(self, attr_name):
+        with self._listener_lock:
+            listeners = list(self._attribute_listeners.get(attr_name, ()))
+        if not listeners:
+            return
+        value = self._value(attr_name)
+        for fn in listeners:
+            try:
+                fn(self, attr_name, value)
+            except Exception as e:
+                log.error("❌ Listener for %s failed: %s", attr_name, e)
+
+    def notify_message(self, name, msg):
+        with self._listener_lock:
+            listeners = list(self._message_listeners.get(name, ())) + list(self._message_listeners.get('*', ()))
+        for fn in listeners:
+            try:
+                fn(self, name, msg)
+            except Exception as e:
+                log.error("❌ Listener for %s failed: %s", name, e)
+
+    def close(self):
+        pass
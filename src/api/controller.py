@@ -1,33 +1,132 @@
-import threading, time
-from services.drone_services import DroneService
+import json
+import logging
+import threading
+from flask import request
+from services.fleet_manager import FleetManager
+from services.broadcaster import Broadcaster
+from models import telemetry_codec
+from core.config.config import config
+from core.utils.metrics import metrics
+from core.utils.socket_json import PreEncoded
+
+log = logging.getLogger(__name__)
+
+TELEMETRY_FORMATS = ('json', 'binary')
+# ground link strength -> share of telemetry_rate_hz, frames are thinned out on a weak link
+TELEMETRY_RATE_STEPS = ((80, 1.0), (50, 0.5), (0, 0.0))
 
 class Controller:
 
     def __init__(self,socketio):
-        self.service = DroneService()
         self.socketio = socketio
+        self.fleet = FleetManager(socketio)  # one DroneService / job pool / streamer per vehicle id
+        self.formats = {}  # sid -> negotiated telemetry encoding
+        self.broadcaster = Broadcaster(socketio)
+        self.telemetry_rate = config["telemetry_rate_hz"]
+        self._register_streams()
+        self._register_metrics()
 
       # heartbeat - ack mechanism , WS-client triggers connect and server starts sending heartbeats, client responds on 'ack' event of server 
     def connect(self, data=None):
-        print("client connected")
-        threading.Thread(target=self._heartbeat_thread).start()
-
-    def _heartbeat_thread(self):
-        while True:
-          self._handle_event(self.service.send_heartbeat, 'heartbeat')
-          time.sleep(2)
+        log.info("client connected")
+        self.broadcaster.join(request.sid, 'heartbeat')
+
+    def _register_streams(self):
+        self.broadcaster.add_stream(
+            'heartbeat', lambda: (None, self._heartbeat()), config["heartbeat_interval"], 'heartbeat',
+            {'json': lambda hb, version: {'message': hb}},
+        )
+        # one telemetry stream per vehicle, frames carry the vehicle id so a client can watch several airframes
+        for slot in self.fleet.slots():
+            self.broadcaster.add_stream(
+                self._telemetry_stream(slot.vehicle_id), self._telemetry_producer(slot.service),
+                1.0 / config["telemetry_rate_hz"], 'telemetry_response',
+                {
+                    'json': self._telemetry_json(slot),
+                    'binary': lambda telemetry, version, vid=slot.vehicle_id: telemetry_codec.encode(
+                        telemetry, version, vehicle_id=vid),
+                },
+            )
+
+    def _heartbeat(self):
+        heartbeat = self.fleet.send_heartbeat()
+        self._adapt_telemetry_rate(heartbeat["strength"])
+        return heartbeat
+
+    def _adapt_telemetry_rate(self, strength):
+        share = 1.0 if strength is None else next(share for floor, share in TELEMETRY_RATE_STEPS if strength >= floor)
+        rate = max(config["telemetry_min_rate_hz"], config["telemetry_rate_hz"] * share)
+        if rate == self.telemetry_rate:
+            return
+        log.info("📶 Ground link strength %s, telemetry at %s Hz.", strength, rate)
+        self.telemetry_rate = rate
+        for slot in self.fleet.slots():
+            self.broadcaster.set_interval(self._telemetry_stream(slot.vehicle_id), 1.0 / rate)
+
+    def _register_metrics(self):
+        metrics.instrument_emits(self.socketio)
+        per_vehicle = lambda value: lambda: {(("vehicle_id", slot.vehicle_id),): value(slot) for slot in self.fleet.slots()}
+        metrics.gauge("job_queue_depth", per_vehicle(lambda slot: slot.jobs.pending()),
+                      "Queued and running background jobs.")
+        metrics.gauge("dispatcher_queue_depth", per_vehicle(lambda slot: slot.service.link.pending() if slot.service.link else 0),
+                      "Commands waiting on the vehicle link.")
+        metrics.gauge("recorder_pending_rows", per_vehicle(
+            lambda slot: slot.service.recorder.pending if slot.service.recorder else 0), "Rows not yet flushed to the flight log.")
+        metrics.gauge("stream_subscribers", lambda: {(("stream", name),): self.broadcaster.subscribers(name)
+                                                     for name in list(self.broadcaster.streams)},
+                      "Clients joined per stream.")
+
+    @staticmethod
+    def _telemetry_stream(vehicle_id):
+        return f"telemetry:{vehicle_id}"
+
+    # json frames splice in the store's serialized snapshot, so it is encoded once per version and
+    # socket.io neither re-encodes nor walks the nested dict looking for binary data
+    @staticmethod
+    def _telemetry_json(slot):
+        suffix = ',"vehicle_id":%s}' % json.dumps(slot.vehicle_id)
+
+        def encode(telemetry, version):
+            serialized_version, text = slot.service.telemetry.serialized()
+            if serialized_version != version:
+                text = json.dumps(telemetry)  # the store moved on since the producer took its snapshot
+            return PreEncoded('{"message":' + text + suffix)
+        return encode
+
+    # (version, snapshot) for the broadcaster, frames are skipped while the store version is unchanged
+    @staticmethod
+    def _telemetry_producer(service):
+        def frame():
+            telemetry = service.send_telemetry()
+            if not telemetry:
+                return None
+            return service.telemetry_version(), telemetry
+        return frame
+
+    # every vehicle addressed event may carry "vehicle_id", without it the default vehicle is used
+    def _slot(self, data):
+        vehicle_id = data.get('vehicle_id') if isinstance(data, dict) else None
+        return self.fleet.get(vehicle_id)
 
     def ack(self,ack=None):
         # print(ack['message'])
         try:
-            response = self.service.acknowledge(ack['message'])
+            response = self.fleet.acknowledge(ack['message'])
             # print(response)  
         except Exception as e:
-            print(e)  
+            log.error("Ack handling failed: %s", e)
 
+    # other clients may only be watching, the failsafe is for the vehicles this client was commanding.
+    # Losing the operator altogether is covered by the ground link monitor.
     def disconnect(self, data=None):
-        self.service.trigger_failsafe()
-        print("disconnected, triggering failsafe") 
+        for slot in self.fleet.slots():
+            slot.streamer.unsubscribe(request.sid)
+            if slot.controller == request.sid:
+                slot.controller = None
+                log.info("controlling client of %s disconnected, triggering failsafe", slot.vehicle_id)
+                self.fleet.trigger_failsafe(slot.vehicle_id)
+        self.formats.pop(request.sid, None)
+        self.broadcaster.leave_all(request.sid)
 
 
     # def input_data(self,data=None):
@@ -42,71 +141,196 @@ class Controller:
 
 
     def connection_route(self, data=None):
-        self._handle_event(self.service.start_connection, 'connection_response')    
+        self._submit_job(data, 'start_connection', 'connection_response')    
 
     def disconnection_route(self, data=None):
-        self._handle_event(self.service.stop_connection, 'disconnection_response')
+        self._handle_event(data, 'stop_connection', 'disconnection_response')
 
 
     def monitoring_route(self, data=None):  
-        threading.Thread(target=self._monitoring_thread).start()
+        threading.Thread(target=self._monitoring_thread, args=(data,)).start()
 
-    def _monitoring_thread(self):
-        self._handle_event(self.service.monitor_vehicle, 'monitoring_response')   
+    def _monitoring_thread(self, data=None):
+        self._handle_event(data, 'monitor_vehicle', 'monitoring_response', control=False)   
           
 
     def arming_route(self, data=None):
-        self._handle_event(self.service.start_to_arm, 'arm_response')
+        self._submit_job(data, 'start_to_arm', 'arm_response')
 
     def disarming_route(self, data=None):
-        self._handle_event(self.service.start_to_disarm, 'disarm_response')
+        self._submit_job(data, 'start_to_disarm', 'disarm_response')
 
     def throttle_up_route(self, data=None):
-        self._handle_event(self.service.start_motors, 'throttleup_response')
+        self._handle_event(data, 'start_motors', 'throttleup_response')
 
     def throttle_down_route(self, data=None):
-        self._handle_event(self.service.stop_motors, 'throttledown_response')
+        self._handle_event(data, 'stop_motors', 'throttledown_response')
 
     def roll_right_route(self, data=None):
-        self._handle_event(self.service.start_roll, 'rollright_response')
+        self._handle_event(data, 'start_roll', 'rollright_response')
 
     def roll_left_route(self, data=None):
-        self._handle_event(self.service.stop_roll, 'rollleft_response')
+        self._handle_event(data, 'stop_roll', 'rollleft_response')
 
     def pitch_forward_route(self, data=None):
-        self._handle_event(self.service.start_pitch, 'pitchforward_response')
+        self._handle_event(data, 'start_pitch', 'pitchforward_response')
 
     def pitch_backward_route(self, data=None):
-        self._handle_event(self.service.stop_pitch, 'pitchbackward_response')
+        self._handle_event(data, 'stop_pitch', 'pitchbackward_response')
 
     def yaw_clockwise_route(self, data=None):
-        self._handle_event(self.service.start_yaw, 'yawclock_response')
+        self._handle_event(data, 'start_yaw', 'yawclock_response')
 
     def yaw_anticlockwise_route(self, data=None):
-        self._handle_event(self.service.stop_yaw, 'yawanticlock_response')
+        self._handle_event(data, 'stop_yaw', 'yawanticlock_response')
+
+    # manual flight, the client streams data = {"roll", "pitch", "yaw", "throttle"} in -1..1 after manual_start,
+    # axes are not acknowledged to keep the stream one way, errors still come back
+    def manual_start_route(self, data=None):
+        self._handle_event(data, 'start_manual', 'manual_start_response')
+
+    def manual_axes_route(self, data=None):
+        try:
+            axes = {key: value for key, value in data.items() if key != 'vehicle_id'}
+            slot = self._slot(data)
+            slot.service.manual_axes(axes)
+            slot.controller = request.sid
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
+
+    def manual_stop_route(self, data=None):
+        self._handle_event(data, 'stop_manual', 'manual_stop_response')
 
     def land_route(self, data=None):
-        self._handle_event(self.service.return_to_land, 'land_response') 
+        self._submit_job(data, 'return_to_land', 'land_response') 
+
+    # data = {"speed": 1 | N | 0}, only for vehicles configured with "replay"
+    def replay_speed_route(self, data=None):
+        try:
+            slot = self._slot(data)
+            response = slot.service.replay_speed(data["speed"])
+            self.socketio.emit('replay_speed_response', {'message': response, 'vehicle_id': slot.vehicle_id}, to=request.sid)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
+
+    # every registered vehicle with its connection / arming / mission state
+    def fleet_route(self, data=None):
+        self.socketio.emit('fleet_response', {'message': self.fleet.status()}, to=request.sid)
 
     # def camera_route(self, data=None):
     #     self._handle_event(self.service.handle_camera, 'camera_response')
 
 
     def telemetry_route(self, data=None):
-        threading.Thread(target=self._telemetry_thread).start()   
+        try:
+            slot = self._slot(data)
+            self.broadcaster.join(request.sid, self._telemetry_stream(slot.vehicle_id), self.formats.get(request.sid, 'json'))
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
+
+    def telemetry_stop_route(self, data=None):
+        try:
+            slot = self._slot(data)
+            self.broadcaster.leave(request.sid, self._telemetry_stream(slot.vehicle_id))
+            self.socketio.emit('telemetry_stop_response', {'message': True, 'vehicle_id': slot.vehicle_id}, to=request.sid)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
+
+    # recorded flights, data = {"vehicle_id"} optional
+    def flight_logs_route(self, data=None):
+        try:
+            vehicle_id = data.get('vehicle_id') if isinstance(data, dict) else None
+            self.socketio.emit('flight_logs_response', {'message': self.fleet.flight_logs(vehicle_id)}, to=request.sid)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
+
+    # downsampled time series from the flight logs, e.g.
+    # data = {"fields": ["battery.voltage"], "last": 1800, "max_points": 300, "method": "minmax"}
+    def flight_log_query_route(self, data=None):
+        try:
+            response = self.fleet.query_flight_log(data)
+            self.socketio.emit('flight_log_query_response', {'message': response}, to=request.sid)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
 
-    def _telemetry_thread(self):
-        while True:
-            if not self.service.send_telemetry():
-               break
-            self._handle_event(self.service.send_telemetry, 'telemetry_response')
-            time.sleep(1)
+    # telemetry encoding negotiation, data = {"format": "json" | "binary"}
+    def telemetry_format_route(self, data=None):
+        try:
+            fmt = data["format"]
+            if fmt not in TELEMETRY_FORMATS:
+               raise ValueError(f"Unsupported telemetry format '{fmt}'. Expected one of {TELEMETRY_FORMATS}.")
+            self.formats[request.sid] = fmt
+            # move an active telemetry subscriber to the room of its new format, for every vehicle it watches
+            for slot in self.fleet.slots():
+               name = self._telemetry_stream(slot.vehicle_id)
+               if request.sid in self.broadcaster.streams[name].members:
+                  self.broadcaster.join(request.sid, name, fmt)
+            response = {"format": fmt}
+            if fmt == 'binary':
+               response["schema"] = telemetry_codec.describe_schema()
+            self.socketio.emit('telemetry_format_response', {'message': response}, to=request.sid)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
 
+    # per-client streaming, data = {"groups": {"attitude": 20, "battery": 0.5}}
+    def telemetry_subscribe_route(self, data=None):
+        try:
+            slot = self._slot(data)
+            rates = slot.streamer.subscribe(request.sid, data["groups"])
+            self.socketio.emit('telemetry_subscribe_response', {'message': rates, 'vehicle_id': slot.vehicle_id}, to=request.sid)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
+
+    def telemetry_unsubscribe_route(self, data=None):
+        try:
+            slot = self._slot(data)
+            slot.streamer.unsubscribe(request.sid)
+            self.socketio.emit('telemetry_unsubscribe_response', {'message': True, 'vehicle_id': slot.vehicle_id}, to=request.sid)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
 
-    def _handle_event(self, function, response_event):
+    # client detected a gap in frame seq numbers, next frame will be a keyframe
+    def telemetry_resync_route(self, data=None):
         try:
-            response = function()
-            self.socketio.emit(response_event, {'message': response})  
+            slot = self._slot(data)
+            response = slot.streamer.resync(request.sid)
+            self.socketio.emit('telemetry_resync_response', {'message': response, 'vehicle_id': slot.vehicle_id}, to=request.sid)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
+
+    # long vehicle operations run on the vehicle's own bounded job executor, the handler returns right away
+    # with a job id and the result is pushed as response_event once the job finishes
+    def _submit_job(self, data, method, response_event, *args):
+        try:
+            slot = self._slot(data)
+            job_id = slot.jobs.submit(response_event, getattr(slot.service, method),
+                                      lambda job: self._job_done(slot.vehicle_id, job), *args)
+            slot.controller = request.sid
+            self.socketio.emit('job_accepted', {'job_id': job_id, 'event': response_event, 'vehicle_id': slot.vehicle_id}, to=request.sid)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
+
+    def _job_done(self, vehicle_id, job):
+        if job["status"] == "failed":
+            self.socketio.emit('error', {'error': job["error"], 'job_id': job["job_id"], 'vehicle_id': vehicle_id})
+        else:
+            self.socketio.emit(job["name"], {'message': job["result"], 'job_id': job["job_id"], 'vehicle_id': vehicle_id})
+
+    def job_status_route(self, data=None):
+        try:
+            response = self._slot(data).jobs.status(data["job_id"])
+            self.socketio.emit('job_status_response', {'message': response}, to=request.sid)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
+
+    # control=False for read only events, and for calls made outside the client's request context
+    def _handle_event(self, data, method, response_event, control=True):
+        try:
+            slot = self._slot(data)
+            if control:
+               slot.controller = request.sid
+            response = getattr(slot.service, method)()
+            self.socketio.emit(response_event, {'message': response, 'vehicle_id': slot.vehicle_id})  
         except Exception as e:
             self.socketio.emit('error', {'error': str(e)})  
     
@@ -115,8 +339,7 @@ class Controller:
     def hold_alt_route(self, data=None):
         try:
             alt = data['height']
-            response = self.service.hold_alt(alt)
-            self.socketio.emit('setalt_response', {'message': response})  
+            self._submit_job(data, 'hold_alt', 'setalt_response', alt)
         except Exception as e:
             self.socketio.emit('error', {'error': str(e)})
 
@@ -132,25 +355,69 @@ class Controller:
         # print(data)
         waypoints = data["waypoints"]
         speed = data["speed"]
-        print(waypoints)
+        log.debug("Waypoints: %s", waypoints)
         try:
             # Validate the input data format
             if not isinstance(waypoints, list) or not all(isinstance(wp, list) and len(wp) == 3 for wp in waypoints):
                raise ValueError("Invalid data format. Expected a list of [lat, lon, alt] lists.")
 
-            # # If valid, proceed to scan
-            response = self.service.scan(waypoints, speed)
-            self.socketio.emit("start_scan_response", {'message': response})
+            # # If valid, proceed to scan, "optimize": true or {"fixed_end", "time_budget"} reorders the points first
+            self._submit_job(data, 'scan', 'start_scan_response', waypoints, speed, data.get("optimize"))
 
         except Exception as e:
            self.socketio.emit('error', {'error': str(e)})
    
 
+    # dry run of a scan, data = {"waypoints": [[lat, lon, alt], ...], "speed": m/s}
+    def preflight_route(self, data=None):
+        try:
+            response = self._slot(data).service.preflight(data["waypoints"], data["speed"])
+            self.socketio.emit('preflight_response', {'message': response}, to=request.sid)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
+
+    # preview of the optimized order, data = {"waypoints": [[lat, lon, alt], ...], "fixed_end", "time_budget"}
+    def optimize_route_route(self, data=None):
+        try:
+            response = self._slot(data).service.optimize_route(data["waypoints"], data)
+            self.socketio.emit('optimize_route_response', {'message': response}, to=request.sid)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
+
+    # data = {"polygon": [[lat, lon], ...], "altitude", "footprint", "overlap", "heading", "start": [lat, lon]}
+    def plan_survey_route(self, data=None):
+        try:
+            response = self._slot(data).service.plan_survey(data)
+            self.socketio.emit('plan_survey_response', {'message': response}, to=request.sid)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)}, to=request.sid)
+
+    # same as plan_survey plus "speed", plans the coverage path and flies it as a scan mission
+    def start_survey_route(self, data=None):
+        try:
+            if not isinstance(data, dict) or "polygon" not in data or "speed" not in data:
+               raise ValueError("Expected polygon, altitude, footprint and speed.")
+            self._submit_job(data, 'survey', 'start_survey_response', data)
+        except Exception as e:
+            self.socketio.emit('error', {'error': str(e)})
+
+    # mission control while a mission runs in the background, progress arrives as 'mission_progress' events
+    def mission_pause_route(self, data=None):
+        self._handle_event(data, 'pause_mission', 'mission_pause_response')
+
+    def mission_resume_route(self, data=None):
+        self._handle_event(data, 'resume_mission', 'mission_resume_response')
+
+    def mission_cancel_route(self, data=None):
+        self._handle_event(data, 'cancel_mission', 'mission_cancel_response')
+
+    def mission_status_route(self, data=None):
+        self._handle_event(data, 'mission_status', 'mission_status_response', control=False)
+
     def mode_switch_route(self, data=None):
-        print(data["mode"])
+        log.debug("Mode switch to %s", data["mode"])
         try:
-            response = self.service.mode_switch(data["mode"]) 
-            self.socketio.emit("mode_switch_response", {'message': response})  
+            self._submit_job(data, 'mode_switch', 'mode_switch_response', data["mode"])
         except Exception as e:
             self.socketio.emit('error', {'error': str(e)})
 
@@ -1,4 +1,5 @@
 from api.controller import Controller
+from core.utils.metrics import metrics
 
 class DroneControlRoute():
     def __init__(self, socketio):
@@ -8,34 +9,59 @@ class DroneControlRoute():
 
          
 
+    # registers a handler, timed per event when metrics are enabled
+    def _on(self, event, handler):
+        self.socketio.on_event(event, metrics.instrument_handler(event, handler))
+
     def register_routes(self):  
 
-        self.socketio.on_event('connect', self.controller.connect)
-        self.socketio.on_event('disconnect', self.controller.disconnect)
-        self.socketio.on_event('ack', self.controller.ack)
-        # self.socketio.on_event('data', self.controller.input_data)
-
-        self.socketio.on_event('connection', self.controller.connection_route)
-        self.socketio.on_event('disconnection', self.controller.disconnection_route)
-        self.socketio.on_event('monitoring', self.controller.monitoring_route)
-        self.socketio.on_event('arm', self.controller.arming_route)
-        self.socketio.on_event('disarm', self.controller.disarming_route)
-        self.socketio.on_event('throttleup', self.controller.throttle_up_route)
-        self.socketio.on_event('throttledown', self.controller.throttle_down_route)
-        self.socketio.on_event('rollright', self.controller.roll_right_route)
-        self.socketio.on_event('rollleft', self.controller.roll_left_route)
-        self.socketio.on_event('pitchforward', self.controller.pitch_forward_route)
-        self.socketio.on_event('pitchbackward', self.controller.pitch_backward_route)
-        self.socketio.on_event('yawclock', self.controller.yaw_clockwise_route)
-        self.socketio.on_event('yawanticlock', self.controller.yaw_anticlockwise_route)
-        self.socketio.on_event('setalt', self.controller.hold_alt_route)
-        self.socketio.on_event('land', self.controller.land_route)
-        # self.socketio.on_event('camera', self.controller.camera_route)
-        self.socketio.on_event('telemetry', self.controller.telemetry_route)
-        self.socketio.on_event('mode_switch', self.controller.mode_switch_route)
+        self._on('connect', self.controller.connect)
+        self._on('disconnect', self.controller.disconnect)
+        self._on('ack', self.controller.ack)
+        # self._on('data', self.controller.input_data)
+
+        self._on('connection', self.controller.connection_route)
+        self._on('disconnection', self.controller.disconnection_route)
+        self._on('monitoring', self.controller.monitoring_route)
+        self._on('arm', self.controller.arming_route)
+        self._on('disarm', self.controller.disarming_route)
+        self._on('throttleup', self.controller.throttle_up_route)
+        self._on('throttledown', self.controller.throttle_down_route)
+        self._on('rollright', self.controller.roll_right_route)
+        self._on('rollleft', self.controller.roll_left_route)
+        self._on('pitchforward', self.controller.pitch_forward_route)
+        self._on('pitchbackward', self.controller.pitch_backward_route)
+        self._on('yawclock', self.controller.yaw_clockwise_route)
+        self._on('yawanticlock', self.controller.yaw_anticlockwise_route)
+        self._on('setalt', self.controller.hold_alt_route)
+        self._on('manual_start', self.controller.manual_start_route)
+        self._on('manual_axes', self.controller.manual_axes_route)
+        self._on('manual_stop', self.controller.manual_stop_route)
+        self._on('land', self.controller.land_route)
+        # self._on('camera', self.controller.camera_route)
+        self._on('telemetry', self.controller.telemetry_route)
+        self._on('telemetry_stop', self.controller.telemetry_stop_route)
+        self._on('telemetry_format', self.controller.telemetry_format_route)
+        self._on('telemetry_subscribe', self.controller.telemetry_subscribe_route)
+        self._on('telemetry_unsubscribe', self.controller.telemetry_unsubscribe_route)
+        self._on('telemetry_resync', self.controller.telemetry_resync_route)
+        self._on('mode_switch', self.controller.mode_switch_route)
+        self._on('job_status', self.controller.job_status_route)
 
         # upload .wp file route
         # get waypoints and generate .wp file route
 
-        self.socketio.on_event('start_scan', self.controller.start_scan_route)
+        self._on('start_scan', self.controller.start_scan_route)
+        self._on('preflight', self.controller.preflight_route)
+        self._on('optimize_route', self.controller.optimize_route_route)
+        self._on('plan_survey', self.controller.plan_survey_route)
+        self._on('start_survey', self.controller.start_survey_route)
+        self._on('mission_pause', self.controller.mission_pause_route)
+        self._on('mission_resume', self.controller.mission_resume_route)
+        self._on('mission_cancel', self.controller.mission_cancel_route)
+        self._on('mission_status', self.controller.mission_status_route)
+        self._on('fleet', self.controller.fleet_route)
+        self._on('replay_speed', self.controller.replay_speed_route)
+        self._on('flight_logs', self.controller.flight_logs_route)
+        self._on('flight_log_query', self.controller.flight_log_query_route)
  
\ No newline at end of file
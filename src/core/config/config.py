@@ -6,6 +6,73 @@ config = {
     "baud" : "115200", #57600
     "server_port" : "5000",
     "host" : "0.0.0.0",
-    "wp_files": "wp_files"
+    "wp_files": "wp_files",
+    "server_mode" : "development",  # "production" runs the socket.io server on eventlet workers without debug
+    "wp_arrival_radius" : 1.0,  # meters, waypoint counts as reached inside this radius
+    "wp_arrival_lead_time" : 0.5,  # seconds, also reached when groundspeed brings the vehicle into the radius within this time
+    "route_time_budget" : 0.5,  # seconds the route optimizer may spend improving a scan route
+    "preflight_enforce" : True,  # reject scans whose estimated energy use cuts into the battery reserve
+    "energy_model" : {},  # overrides for mission.preflight.DEFAULT_ENERGY_MODEL (hover_power, battery_wh, reserve_pct, ...)
+    "mission_item_timeout" : 1.0,  # seconds without MISSION_REQUEST/ACK before retransmitting during upload
+    "mission_max_retries" : 5,  # consecutive retransmissions before a mission upload is aborted
+    "job_workers" : 4,  # worker threads for long vehicle operations (arm, mode switch, missions)
+    "job_queue_limit" : 16,  # pending operations accepted before new ones are rejected
+    "fast_connect" : True,  # connect on the first heartbeat and download parameters in the background
+    "param_progress_interval" : 0.5,  # seconds between parameter download progress events
+    "ready_timeout" : 10.0,  # seconds an operation waits for the vehicle attributes it needs after a fast connect
+    "link_timeout" : 0.5,  # seconds without any MAVLink message before the vehicle link counts as degraded
+    "heartbeat_timeout" : 3.0,  # seconds without an autopilot HEARTBEAT before the vehicle link counts as lost
+    "link_lost_timeout" : 5.0,  # seconds a lost link is given to come back before the connection is closed
+    "reconnect_enabled" : True,  # reopen an expired vehicle link in the background instead of staying disconnected
+    "reconnect_base_delay" : 0.5,  # seconds before the second attempt, doubled after every failure
+    "reconnect_max_delay" : 10.0,  # backoff cap in seconds
+    "reconnect_max_attempts" : 0,  # 0 retries until the operator disconnects
+    "reconnect_jitter" : 0.5,  # up to this share of each delay is randomized
+    "heartbeat_interval" : 2,  # seconds between server heartbeats broadcast to connected clients
+    "ground_window" : 20,  # heartbeats in the sliding window ground link loss / RTT are computed over
+    "ground_ack_timeout" : 3.0,  # seconds an ack may take before its heartbeat counts as lost
+    "ground_good_rtt" : 0.5,  # seconds, heartbeat round trips above this degrade the ground link
+    "ground_lost_rtt" : 2.0,  # seconds, average round trip at which the ground link counts as lost
+    "ground_degraded_loss_pct" : 20,  # unanswered heartbeats in the window that degrade the ground link
+    "ground_lost_loss_pct" : 50,  # ... and that count as lost
+    "ground_lost_timeout" : 6.0,  # seconds without any ack before the ground link counts as lost
+    "ground_failsafe" : True,  # land armed vehicles when the ground link is lost
+    "telemetry_rate_hz" : 10,  # telemetry push rate, frames come from the event driven telemetry store
+    "telemetry_min_rate_hz" : 2,  # floor for the push rate while the ground link is weak
+    "telemetry_max_rate_hz" : 20,  # upper bound for per-client group rates on the delta stream
+    "manual_rate_hz" : 30,  # RC override rate while in manual control, 25-50 Hz
+    "manual_timeout" : 0.5,  # seconds without stick input before manual control centres the sticks
+    "manual_ramp" : 4.0,  # max stick travel per second in full deflections, smooths jumps in client input
+    "log_level" : "INFO",  # root level, records go through a queue and a background writer thread
+    "log_levels" : {"werkzeug" : "WARNING"},  # per module overrides, e.g. "adapters.dronekit_adapter.planner" : "DEBUG"
+    "log_format" : "text",  # "json" writes one structured object per line
+    "log_file" : None,  # optional rotating log file next to the console output
+    "log_file_max_mb" : 16,
+    "log_queue_size" : 10000,  # records buffered for the writer thread, further records are dropped
+    "log_rate_limit" : 1.0,  # seconds between repeats of the same message from a control loop
+    "metrics_enabled" : True,  # latency histograms / counters served in Prometheus format on /metrics
+    "vehicle_backend" : "dronekit",  # "mock" runs every vehicle on the in-process simulator (tests, benchmarks)
+    "recorder_enabled" : True,  # write telemetry and heartbeats to append-only flight logs
+    "recorder_dir" : "logs",  # flight log directory, one .vlog file per vehicle and rotation
+    "recorder_flush_interval" : 1.0,  # seconds between background flushes of buffered rows
+    "recorder_max_file_mb" : 64,  # a log rotates to a new file beyond this size
+    "recorder_chunk_rows" : 512,  # rows per chunk and stream
 }
 
+# vehicles served by this process, routed by the "vehicle_id" field of socket.io events.
+# Events without a vehicle_id go to the default vehicle, which uses the connection settings above.
+config["default_vehicle"] = "default"
+config["vehicles"] = {
+    config["default_vehicle"]: {
+        "serial_port": config["serial_port"],
+        "tcp_conn_string": config["tcp_conn_string"],
+        "baud": config["baud"],
+        "sitl": False,  # True connects through tcp_conn_string instead of the serial port
+        # "replay": "logs",  # plays recorded flight logs (file, directory or glob) instead of connecting
+        # "replay_speed": 1.0,  # 1 = real time, N = N times faster, 0 = as fast as possible
+        # "replay_loop": False,
+        # "backend": "mock",  # per vehicle override of vehicle_backend
+        # "mock": {"arm_delay": 0.5, "mode_delay": 0.2},  # overrides for virtual_adapter.mock_vehicle.DEFAULT_MOCK
+    },
+    # "drone2": {"serial_port": "/dev/ttyACM1", "tcp_conn_string": "tcp:127.0.0.1:5770", "baud": "115200", "sitl": False},
+}
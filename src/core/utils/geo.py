@@ -0,0 +1,20 @@
+# small geodesy helpers shared by the planner and mission code
+
+import math
+
+EARTH_RADIUS = 6371008.8  # mean earth radius in meters
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Great circle distance in meters between two lat/lon points given in degrees."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def path_length(points):
+    """Total ground length in meters of a [[lat, lon, ...], ...] path."""
+    return sum(haversine(a[0], a[1], b[0], b[1]) for a, b in zip(points, points[1:]))
@@ -0,0 +1,83 @@
+# bounded worker pool for long running vehicle operations (arming, mode switches, missions).
+# Socket.IO handlers submit work here and return immediately with a job id, the result is pushed
+# back as an event once the job is finished.
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobExecutor:
+    def __init__(self, max_workers, max_pending):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vehicle-job")
+        self.slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, name, function, on_done, *args):
+        """
+        Queues function(*args) and returns the job id.
+        on_done(job) is called from the worker thread with the finished job record.
+        """
+        if not self.slots.acquire(blocking=False):
+            raise JobQueueFull(f"Too many pending vehicle operations, '{name}' rejected.")
+
+        job_id = uuid.uuid4().hex[:12]
+        job = {"job_id": job_id, "name": name, "status": "queued", "submitted": time.time(),
+               "result": None, "error": None}
+        with self.lock:
+            self.jobs[job_id] = job
+
+        try:
+            self.pool.submit(self._run, job, function, on_done, args)
+        except Exception:
+            self.slots.release()
+            raise
+        return job_id
+
+    def _run(self, job, function, on_done, args):
+        job["status"] = "running"
+        job["started"] = time.time()
+        try:
+            job["result"] = function(*args)
+            job["status"] = "done"
+        except Exception as e:
+            job["error"] = str(e)
+            job["status"] = "failed"
+        finally:
+            job["finished"] = time.time()
+            self.slots.release()
+            self._prune()
+
+        if on_done:
+            try:
+                on_done(job)
+            except Exception as e:
+                log.error("❌ Job callback failed for %s: %s", job['name'], e)
+
+    def status(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def pending(self):
+        with self.lock:
+            return sum(1 for job in self.jobs.values() if job["status"] in ("queued", "running"))
+
+    def _prune(self, keep=200):
+        # keep a short history of finished jobs for job_status queries
+        with self.lock:
+            finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("done", "failed")]
+            for job_id in finished[:-keep]:
+                del self.jobs[job_id]
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
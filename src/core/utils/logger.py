@@ -0,0 +1,141 @@
+# logging setup. Modules log through logging.getLogger(__name__), records are put on an in-memory queue
+# by a QueueHandler and a single listener thread formats them and does the (possibly slow) console /
+# file writes, so a control loop that logs never blocks on stdout, a serial console or journald.
+# Levels are set per module from config["log_levels"], throttled() rate-limits messages of hot loops.
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+from core.config.config import config
+
+# LogRecord attributes, everything else on a record came in through extra={...}
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener = None
+_handler = None
+
+
+def _extra(record):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_FIELDS}
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s.%(msecs)03d %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = _extra(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One json object per line, extra={...} fields become top level keys."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        entry.update(_extra(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the listener falls behind."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging():
+    """Installs the queue handler on the root logger and starts the listener, safe to call twice."""
+    global _listener, _handler
+    if _listener is not None:
+        return _handler
+
+    formatter = JsonFormatter() if config["log_format"] == "json" else TextFormatter()
+    outputs = [logging.StreamHandler(sys.stdout)]
+    if config["log_file"]:
+        outputs.append(logging.handlers.RotatingFileHandler(
+            config["log_file"], maxBytes=config["log_file_max_mb"] * 1024 * 1024, backupCount=3, encoding="utf-8"))
+    for output in outputs:
+        output.setFormatter(formatter)
+
+    _handler = DroppingQueueHandler(queue.Queue(config["log_queue_size"]))
+    root = logging.getLogger()
+    root.handlers[:] = [_handler]
+    root.setLevel(config["log_level"])
+    for name, level in config["log_levels"].items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(_handler.queue, *outputs, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)  # drains what is still queued
+    return _handler
+
+
+def dropped():
+    return _handler.dropped if _handler else 0
+
+
+class ThrottledLogger:
+    """
+    Lets each message template through at most once per interval and counts the repeats it swallowed,
+    the next record that goes out carries them as suppressed=N. A dropped call costs a level check,
+    a dict lookup and a clock read, the message is never formatted.
+    """
+
+    def __init__(self, logger, interval):
+        self.logger = logger
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.last = {}  # message template -> (monotonic time sent, suppressed since)
+
+    def log(self, level, msg, *args, **kwargs):
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        with self.lock:
+            sent, suppressed = self.last.get(msg, (None, 0))
+            if sent is not None and now - sent < self.interval:
+                self.last[msg] = (sent, suppressed + 1)
+                return
+            self.last[msg] = (now, 0)
+        if suppressed:
+            kwargs["extra"] = dict(kwargs.get("extra") or {}, suppressed=suppressed)
+        self.logger.log(level, msg, *args, stacklevel=3, **kwargs)
+
+    def debug(self, msg, *args, **kwargs):
+        self.log(logging.DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        self.log(logging.INFO, msg, *args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        self.log(logging.WARNING, msg, *args, **kwargs)
+
+
+def throttled(name, interval=None):
+    """Rate-limited view of logging.getLogger(name) for messages logged from inside loops."""
+    return ThrottledLogger(logging.getLogger(name), config["log_rate_limit"] if interval is None else interval)
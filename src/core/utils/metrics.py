@@ -0,0 +1,196 @@
+# in-process metrics (counters, gauges, latency histograms) rendered in the Prometheus text format.
+# With config["metrics_enabled"] off, timed() / instrument() hand back the undecorated function and
+# inc() / observe() return on the first check, so the hot paths pay nothing measurable.
+
+import bisect
+import functools
+import threading
+import time
+
+from core.config.config import config
+
+# seconds, tuned for handler / vehicle command latencies
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{name}="{str(value)}"'.replace("\n", " ") for name, value in pairs)
+    return "{" + body + "}"
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    def __init__(self, enabled=True, prefix="drone"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.counters = {}    # name -> {label key: value}
+        self.histograms = {}  # name -> {label key: Histogram}
+        self.gauges = {}      # name -> fn() returning a number or {label key: number}
+        self.help = {}
+
+    # recording
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self.lock:
+            family = self.counters.setdefault(name, {})
+            family[key] = family.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self.lock:
+            family = self.histograms.setdefault(name, {})
+            histogram = family.get(key)
+            if histogram is None:
+                histogram = family[key] = Histogram(DEFAULT_BUCKETS)
+            histogram.observe(seconds)
+
+    def gauge(self, name, fn, help_text=None):
+        """fn() is evaluated at scrape time, it returns a number or {tuple(label pairs): number}."""
+        self.gauges[name] = fn
+        if help_text:
+            self.help[name] = help_text
+
+    def describe(self, name, help_text):
+        self.help[name] = help_text
+
+    # instrumentation helpers
+
+    def timed(self, name, **labels):
+        """Decorator recording the call duration, plus an error counter when the call raises."""
+        def decorator(fn):
+            if not self.enabled:
+                return fn
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                except Exception:
+                    self.inc(f"{name}_errors_total", **labels)
+                    raise
+                finally:
+                    self.observe(f"{name}_seconds", time.perf_counter() - started, **labels)
+            return wrapper
+        return decorator
+
+    def timer(self, name, **labels):
+        return _Timer(self, name, labels)
+
+    def instrument_handler(self, event, handler):
+        """Socket.IO handler wrapper, one histogram family labelled by event."""
+        if not self.enabled:
+            return handler
+        return self.timed("socketio_handler", event=event)(handler)
+
+    def instrument_emits(self, socketio):
+        """Counts every socketio.emit by event name, errors included."""
+        if not self.enabled or getattr(socketio, "_metrics_wrapped", False):
+            return
+        emit = socketio.emit
+
+        @functools.wraps(emit)
+        def counted(event, *args, **kwargs):
+            self.inc("socketio_emits_total", event=event)
+            return emit(event, *args, **kwargs)
+
+        socketio.emit = counted
+        socketio._metrics_wrapped = True
+
+    # exposition
+
+    def render(self):
+        lines = []
+        with self.lock:
+            counters = {name: dict(family) for name, family in self.counters.items()}
+            histograms = {name: {key: (list(h.counts), h.total, h.count) for key, h in family.items()}
+                          for name, family in self.histograms.items()}
+
+        for name, family in sorted(counters.items()):
+            full = f"{self.prefix}_{name}"
+            self._header(lines, full, name, "counter")
+            for key, value in family.items():
+                lines.append(f"{full}{_format_labels(key)} {value}")
+
+        for name, family in sorted(histograms.items()):
+            full = f"{self.prefix}_{name}"
+            self._header(lines, full, name, "histogram")
+            for key, (counts, total, count) in family.items():
+                cumulative = 0
+                for bound, bucket in zip(DEFAULT_BUCKETS, counts):
+                    cumulative += bucket
+                    lines.append(f"{full}_bucket{_format_labels(key, (('le', bound),))} {cumulative}")
+                lines.append(f"{full}_bucket{_format_labels(key, (('le', '+Inf'),))} {count}")
+                lines.append(f"{full}_sum{_format_labels(key)} {total}")
+                lines.append(f"{full}_count{_format_labels(key)} {count}")
+
+        for name, fn in sorted(self.gauges.items()):
+            full = f"{self.prefix}_{name}"
+            try:
+                value = fn()
+            except Exception as e:
+                lines.append(f"# gauge {full} failed: {e}")
+                continue
+            self._header(lines, full, name, "gauge")
+            if isinstance(value, dict):
+                for key, number in value.items():
+                    lines.append(f"{full}{_format_labels(key)} {number}")
+            else:
+                lines.append(f"{full} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines, full, name, kind):
+        if name in self.help:
+            lines.append(f"# HELP {full} {self.help[name]}")
+        lines.append(f"# TYPE {full} {kind}")
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "started")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter() if self.metrics.enabled else None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.started is None:
+            return False
+        if exc_type is not None:
+            self.metrics.inc(f"{self.name}_errors_total", **self.labels)
+        self.metrics.observe(f"{self.name}_seconds", time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+metrics = Metrics(config["metrics_enabled"])
+metrics.gauge("threads", threading.active_count, "Live Python threads.")
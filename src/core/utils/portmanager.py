@@ -1,9 +1,12 @@
+import logging
 import os
 import signal
 import platform
 import subprocess
 import re
 
+log = logging.getLogger(__name__)
+
 class PortManager:
     @staticmethod
     def free_port(port):
@@ -18,7 +21,7 @@ class PortManager:
                         pid = parts[-1]  # PID is the last column
                         if pid.isdigit():
                             os.system(f"taskkill /F /PID {pid}")
-                            print(f"✅ Process {pid} using port {port} has been killed.")
+                            log.info("✅ Process %s using port %s has been killed.", pid, port)
 
             else:  # Linux / macOS
                 result = subprocess.run(["lsof", "-i", f":{port}"], capture_output=True, text=True)
@@ -26,13 +29,13 @@ class PortManager:
                     parts = line.split()
                     pid = parts[1]  # PID is in the second column
                     os.kill(int(pid), signal.SIGKILL)
-                    print(f"✅ Process {pid} using port {port} has been killed.")
+                    log.info("✅ Process %s using port %s has been killed.", pid, port)
 
-            print(f"Port is now free.")
+            log.info("Port is now free.")
             return True
         
         except Exception as e:
-            print(f"❌ Error freeing port {port}: {e}")
+            log.error("❌ Error freeing port %s: %s", port, e)
             return False
 
     @staticmethod
@@ -47,20 +50,20 @@ class PortManager:
                 )
                 ports = re.findall(r'(COM\d+)', result.stdout)
                 if ports:
-                    print(f"✅ USB device detected on port: {ports[0]}")
+                    log.info("✅ USB device detected on port: %s", ports[0])
                     return ports[0]
                 else:
-                    print("❌ No USB device found.")
+                    log.error("❌ No USB device found.")
 
             elif system in ["Linux", "Darwin"]:  # Linux/macOS
                 result = subprocess.run(["ls", "/dev/"], capture_output=True, text=True)
                 ports = re.findall(r'(ttyUSB\d+|ttyACM\d+)', result.stdout)
                 if ports:
-                    print(f"✅ USB device detected on port: /dev/{ports[0]}")
+                    log.info("✅ USB device detected on port: /dev/%s", ports[0])
                     return f"/dev/{ports[0]}"
                 else:
-                    print("❌ No USB device found.")
+                    log.error("❌ No USB device found.")
 
         except Exception as e:
-            print(f"❌ Error detecting USB port: {e}")
+            log.error("❌ Error detecting USB port: %s", e)
             return None
@@ -0,0 +1,21 @@
+# json module handed to Socket.IO for packet encoding. Event arguments wrapped in PreEncoded are
+# already json text and are spliced into the packet as they are, so a payload that many clients or
+# several rooms receive (the telemetry snapshot) is serialized once per version instead of per emit.
+
+import json
+
+
+class PreEncoded(str):
+    """json text that goes into the packet verbatim."""
+
+
+def dumps(obj, *args, **kwargs):
+    # socket.io encodes an event as [name, *args]
+    if isinstance(obj, list) and any(isinstance(item, PreEncoded) for item in obj):
+        return "[" + ",".join(
+            item if isinstance(item, PreEncoded) else json.dumps(item, *args, **kwargs) for item in obj
+        ) + "]"
+    return json.dumps(obj, *args, **kwargs)
+
+
+loads = json.loads
@@ -0,0 +1,50 @@
+# on-disk layout of the flight recorder (.vlog).
+#
+#   file header   FILE_HEADER (magic, version, schema crc, meta length) + meta json
+#                 (vehicle id, creation time, column layout of every stream)
+#   chunk *       CHUNK_HEADER (magic, stream id, rows, payload size, first / last timestamp) + payload
+#
+# A chunk payload is columnar: every column of the stream as one contiguous little endian array of
+# `rows` values, in stream order, followed by the chunk's string table (json list) that string columns
+# index into with uint16. Files are only ever appended to, a torn last chunk (power loss) is ignored
+# by the reader.
+
+import json
+import struct
+import zlib
+
+from models.telemetry_codec import TELEMETRY_SCHEMA
+
+FILE_MAGIC = b"VFLG"
+CHUNK_MAGIC = b"CHNK"
+LOG_VERSION = 1
+LOG_SUFFIX = ".vlog"
+
+FILE_HEADER = struct.Struct("<4sBII")     # magic, version, schema crc, meta length
+CHUNK_HEADER = struct.Struct("<4sBIIdd")  # magic, stream id, rows, payload size, t_start, t_end
+
+# column type -> array format, "s" columns hold indexes into the chunk string table
+COLUMN_FORMATS = {"d": "<f8", "f": "<f4", "s": "<u2"}
+
+
+def _column_type(fmt):
+    if fmt == "d":
+        return "d"
+    if fmt.endswith("s"):
+        return "s"
+    return "f"  # floats, small ints and bools, missing values are NaN
+
+
+# stream name -> [(column, type)], the timestamp column always comes first
+STREAMS = {
+    "telemetry": [("timestamp", "d")] + [(f"{group}.{field}", _column_type(fmt)) for group, field, fmt in TELEMETRY_SCHEMA],
+    "heartbeat": [("timestamp", "d"), ("ack_timestamp", "d"), ("strength", "f"), ("ack", "f"), ("status", "s")],
+}
+STREAM_IDS = {name: index for index, name in enumerate(STREAMS)}
+
+LAYOUT_CRC = zlib.crc32(json.dumps(STREAMS, sort_keys=True).encode())
+
+
+def file_header(vehicle_id, created):
+    meta = json.dumps({"vehicle_id": vehicle_id, "created": created, "streams": STREAMS}).encode()
+    return FILE_HEADER.pack(FILE_MAGIC, LOG_VERSION, LAYOUT_CRC, len(meta)) + meta
@@ -0,0 +1,257 @@
+# time range queries over recorded flight logs. The chunk headers of every log form a sparse time index
+# (first / last timestamp per chunk), so a query only maps the chunks that overlap the range, cuts
+# them with a binary search on the timestamp column and downsamples on the server before anything
+# goes over the socket.
+
+import glob
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from flightlog.log_format import LOG_SUFFIX, STREAMS
+from flightlog.log_reader import LogReader, LogFormatError
+
+log = logging.getLogger(__name__)
+
+DOWNSAMPLE_METHODS = ("raw", "minmax", "mean", "lttb")
+
+
+class StreamIndex:
+    """Chunk time ranges of one stream in one log, sorted by start time."""
+
+    def __init__(self, reader, stream):
+        self.chunks = sorted(reader.stream_chunks(stream), key=lambda c: c.t_start)
+        self.t_start = np.array([c.t_start for c in self.chunks])
+        self.t_end = np.maximum.accumulate(np.array([c.t_end for c in self.chunks])) if self.chunks else np.empty(0)
+
+    def overlapping(self, start, end):
+        # first chunk whose (running) end reaches start, last chunk that begins before end
+        first = int(np.searchsorted(self.t_end, start, side="left"))
+        last = int(np.searchsorted(self.t_start, end, side="right"))
+        return self.chunks[first:last]
+
+
+class LogCatalog:
+    """
+    Open readers for every log of a directory, re-mapped when a log has grown since the last query.
+    Queries hold the readers they use through snapshot(), a reader replaced meanwhile is only closed
+    once the last query using it is done.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.readers = {}  # path -> (size, reader, {stream: StreamIndex})
+        self.users = {}    # reader -> number of queries holding it
+        self.retired = set()  # replaced readers waiting for their last query
+        self.lock = threading.RLock()  # snapshot() refreshes while holding it
+
+    def refresh(self):
+        paths = set(glob.glob(os.path.join(self.directory, f"*{LOG_SUFFIX}")))
+        with self.lock:
+            for path in list(self.readers):
+                if path not in paths:
+                    self._retire(self.readers.pop(path)[1])
+            for path in paths:
+                size = os.path.getsize(path)
+                cached = self.readers.get(path)
+                if cached is not None and cached[0] == size:
+                    continue
+                if cached is not None:
+                    self._retire(cached[1])
+                try:
+                    self.readers[path] = (size, LogReader(path), {})
+                except (LogFormatError, OSError) as e:
+                    self.readers.pop(path, None)
+                    log.warning("⚠️ Skipping flight log %s: %s", path, e)
+            return list(self.readers.values())
+
+    @contextmanager
+    def snapshot(self):
+        """Refreshed catalog entries, their readers stay open until the block exits."""
+        with self.lock:
+            entries = self.refresh()
+            for _, reader, _ in entries:
+                self.users[reader] = self.users.get(reader, 0) + 1
+        try:
+            yield entries
+        finally:
+            with self.lock:
+                for _, reader, _ in entries:
+                    self.users[reader] -= 1
+                    if not self.users[reader]:
+                        del self.users[reader]
+                        if reader in self.retired:
+                            self.retired.discard(reader)
+                            reader.close()
+
+    def _retire(self, reader):
+        if self.users.get(reader):
+            self.retired.add(reader)
+        else:
+            reader.close()
+
+    def logs(self, vehicle_id=None):
+        result = []
+        with self.snapshot() as entries:
+            for size, reader, _ in entries:
+                if vehicle_id and reader.vehicle_id != vehicle_id:
+                    continue
+                start, end = reader.time_range()
+                result.append({"file": os.path.basename(reader.path), "vehicle_id": reader.vehicle_id,
+                               "created": reader.created, "size": size, "start": start, "end": end,
+                               "rows": {stream: reader.rows(stream) for stream in reader.streams}})
+        return sorted(result, key=lambda log: log["created"])
+
+    def select(self, vehicle_id, stream, fields, start, end):
+        """Concatenated columns of every row in [start, end], oldest first."""
+        with self.snapshot() as entries:
+            return self._select(entries, vehicle_id, stream, fields, start, end)
+
+    def _select(self, entries, vehicle_id, stream, fields, start, end):
+        parts = []
+        for _, reader, indexes in sorted(entries, key=lambda entry: entry[1].created):
+            if vehicle_id and reader.vehicle_id != vehicle_id:
+                continue
+            if stream not in reader.streams:
+                continue
+            unknown = [field for field in fields if field not in reader.columns(stream)]
+            if unknown:
+                raise ValueError(f"Unknown {stream} fields {unknown}.")
+
+            index = indexes.get(stream)
+            if index is None:
+                index = indexes[stream] = StreamIndex(reader, stream)
+            for chunk in index.overlapping(start, end):
+                columns = reader.read_chunk(chunk, ["timestamp"] + fields)
+                t = columns["timestamp"]
+                lo = int(np.searchsorted(t, start, side="left"))
+                hi = int(np.searchsorted(t, end, side="right"))
+                if hi > lo:
+                    parts.append({name: values[lo:hi] for name, values in columns.items()})
+
+        if not parts:
+            return {name: np.empty(0) for name in ["timestamp"] + fields}
+        columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        order = np.argsort(columns["timestamp"], kind="stable")  # rotated files / chunks may interleave
+        return {name: values[order] for name, values in columns.items()}
+
+
+def _to_list(values):
+    if values.dtype == object:
+        return values.tolist()
+    return [None if math.isnan(v) else v for v in values.tolist()]
+
+
+def _bucket_edges(n, buckets):
+    return np.unique(np.linspace(0, n, buckets + 1).astype(int))[:-1]
+
+
+def _buckets(t, values, buckets, method):
+    edges = _bucket_edges(len(t), buckets)
+    series_t = t[edges] + (t[np.append(edges[1:], len(t)) - 1] - t[edges]) / 2  # bucket midpoints
+
+    series = {}
+    for name, column in values.items():
+        if column.dtype == object:
+            series[name] = _to_list(column[edges])  # strings (flight mode): first value of the bucket
+            continue
+        column = column.astype(float)
+        missing = np.isnan(column)
+        valid = np.add.reduceat(~missing, edges)
+        total = np.add.reduceat(np.where(missing, 0.0, column), edges)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(valid > 0, total / np.maximum(valid, 1), np.nan)
+        if method == "mean":
+            series[name] = _to_list(mean)
+        else:
+            series[name] = {
+                "min": _to_list(np.fmin.reduceat(column, edges)),
+                "max": _to_list(np.fmax.reduceat(column, edges)),
+                "mean": _to_list(mean),
+            }
+    return _to_list(series_t), series
+
+
+def lttb(t, v, threshold):
+    """Largest triangle three buckets, returns the indexes of the points to keep."""
+    n = len(t)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        nxt_lo, nxt_hi = hi, min(int((i + 2) * every) + 1, n)
+        if nxt_lo >= nxt_hi:
+            nxt_lo, nxt_hi = n - 1, n
+        nxt = v[nxt_lo:nxt_hi]
+        avg_t = t[nxt_lo:nxt_hi].mean()
+        avg_v = np.nanmean(nxt) if np.isfinite(nxt).any() else v[a]
+
+        # triangle between the last kept point, each candidate and the average of the next bucket
+        area = np.abs((t[a] - avg_t) * (v[lo:hi] - v[a]) - (t[a] - t[lo:hi]) * (avg_v - v[a]))
+        area = np.where(np.isnan(area), -1.0, area)
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def query(catalog, vehicle_id, stream, fields, start=None, end=None, last=None, max_points=500, method="minmax"):
+    """
+    :param fields: columns of the stream, e.g. ["battery.voltage", "nav.altitude"]
+    :param start / end: unix timestamps, or last = seconds back from now
+    :param max_points: upper bound of points per field in the response
+    :param method: "raw" (plain decimation), "minmax" / "mean" buckets, or "lttb" per field
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unsupported downsampling '{method}'. Expected one of {DOWNSAMPLE_METHODS}.")
+    if stream not in STREAMS:
+        raise ValueError(f"Unknown stream '{stream}'. Expected one of {tuple(STREAMS)}.")
+    if not fields:
+        raise ValueError("At least one field is required.")
+    unknown = [field for field in fields if field not in dict(STREAMS[stream])]
+    if unknown:
+        raise ValueError(f"Unknown {stream} fields {unknown}.")
+    max_points = max(int(max_points), 3)
+
+    started = time.perf_counter()
+    now = time.time()
+    if last is not None:
+        start, end = now - float(last), now
+    start = -np.inf if start is None else float(start)
+    end = np.inf if end is None else float(end)
+
+    columns = catalog.select(vehicle_id, stream, list(fields), start, end)
+    t = columns.pop("timestamp")
+    rows = len(t)
+    response = {"stream": stream, "vehicle_id": vehicle_id, "rows": rows, "method": method}
+
+    if rows <= max_points:
+        response.update(method="raw", t=_to_list(t), series={name: _to_list(values) for name, values in columns.items()})
+    elif method == "raw":
+        keep = np.linspace(0, rows - 1, max_points).astype(int)
+        response.update(t=_to_list(t[keep]), series={name: _to_list(values[keep]) for name, values in columns.items()})
+    elif method == "lttb":
+        # every field keeps its own points, so the response carries one time axis per field
+        series = {}
+        for name, values in columns.items():
+            if values.dtype == object:
+                keep = np.linspace(0, rows - 1, max_points).astype(int)
+            else:
+                keep = lttb(t, values.astype(float), max_points)
+            series[name] = {"t": _to_list(t[keep]), "v": _to_list(values[keep])}
+        response.update(series=series)
+    else:
+        series_t, series = _buckets(t, columns, max_points, method)
+        response.update(t=series_t, series=series)
+
+    response["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return response
@@ -0,0 +1,136 @@
+# memory mapped reader for .vlog flight logs. Opening a log only walks the chunk headers, column data is
+# handed out as numpy views on the mapping, nothing is copied until the caller asks for it.
+
+import json
+import mmap
+
+import numpy as np
+
+from flightlog.log_format import (
+    FILE_HEADER, FILE_MAGIC, CHUNK_HEADER, CHUNK_MAGIC, LOG_VERSION, COLUMN_FORMATS,
+)
+
+
+class LogFormatError(Exception):
+    pass
+
+
+class Chunk:
+    __slots__ = ("stream", "offset", "rows", "size", "t_start", "t_end")
+
+    def __init__(self, stream, offset, rows, size, t_start, t_end):
+        self.stream = stream
+        self.offset = offset  # start of the payload
+        self.rows = rows
+        self.size = size
+        self.t_start = t_start
+        self.t_end = t_end
+
+
+class LogReader:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise LogFormatError(f"{path}: empty log file.")
+
+        magic, version, crc, meta_len = FILE_HEADER.unpack_from(self.data, 0)
+        if magic != FILE_MAGIC:
+            self.close()
+            raise LogFormatError(f"{path}: not a flight log.")
+        if version != LOG_VERSION:
+            self.close()
+            raise LogFormatError(f"{path}: unsupported log version {version}.")
+
+        meta = json.loads(self.data[FILE_HEADER.size:FILE_HEADER.size + meta_len])
+        self.vehicle_id = meta["vehicle_id"]
+        self.created = meta["created"]
+        # layout comes from the file itself, older logs stay readable when the schema grows
+        self.streams = {name: [tuple(column) for column in columns] for name, columns in meta["streams"].items()}
+        self.stream_names = list(self.streams)
+        self.chunks = self._index(FILE_HEADER.size + meta_len)
+
+    def _index(self, offset):
+        chunks = []
+        end = len(self.data)
+        while offset + CHUNK_HEADER.size <= end:
+            magic, stream_id, rows, size, t_start, t_end = CHUNK_HEADER.unpack_from(self.data, offset)
+            payload = offset + CHUNK_HEADER.size
+            if magic != CHUNK_MAGIC or payload + size > end:
+                break  # torn write at the end of the file
+            chunks.append(Chunk(self.stream_names[stream_id], payload, rows, size, t_start, t_end))
+            offset = payload + size
+        return chunks
+
+    def close(self):
+        if getattr(self, "data", None) is not None:
+            try:
+                self.data.close()
+            except BufferError:
+                pass  # numpy views handed out by read_chunk are still alive, the mapping goes with them
+            self.data = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def columns(self, stream):
+        return [name for name, _ in self.streams[stream]]
+
+    def stream_chunks(self, stream):
+        return [chunk for chunk in self.chunks if chunk.stream == stream]
+
+    def read_chunk(self, chunk, fields=None):
+        """
+        Column arrays of one chunk, {column: ndarray}. Numeric columns are read-only views on the file,
+        string columns are decoded through the chunk string table.
+        """
+        wanted = None if fields is None else set(fields)
+        layout = self.streams[chunk.stream]
+        offset = chunk.offset
+        result = {}
+        strings = None
+        for name, kind in layout:
+            dtype = np.dtype(COLUMN_FORMATS[kind])
+            size = dtype.itemsize * chunk.rows
+            if wanted is None or name in wanted:
+                values = np.frombuffer(self.data, dtype=dtype, count=chunk.rows, offset=offset)
+                if kind == "s":
+                    if strings is None:
+                        strings = self._string_table(chunk)
+                    values = np.asarray(strings, dtype=object)[values] if strings else np.full(chunk.rows, "", dtype=object)
+                result[name] = values
+            offset += size
+        return result
+
+    def _string_table(self, chunk):
+        columns_size = sum(np.dtype(COLUMN_FORMATS[kind]).itemsize for _, kind in self.streams[chunk.stream]) * chunk.rows
+        start = chunk.offset + columns_size
+        return json.loads(self.data[start:chunk.offset + chunk.size])
+
+    def scan(self, stream, fields=None):
+        """Yields the column arrays chunk by chunk, in recording order."""
+        for chunk in self.stream_chunks(stream):
+            yield self.read_chunk(chunk, fields)
+
+    def read(self, stream, fields=None):
+        """Whole stream as {column: ndarray} (copies)."""
+        parts = list(self.scan(stream, fields))
+        names = fields or self.columns(stream)
+        if not parts:
+            return {name: np.empty(0) for name in names}
+        return {name: np.concatenate([part[name] for part in parts]) for name in names if name in parts[0]}
+
+    def rows(self, stream):
+        return sum(chunk.rows for chunk in self.stream_chunks(stream))
+
+    def time_range(self):
+        if not self.chunks:
+            return None, None
+        return min(c.t_start for c in self.chunks), max(c.t_end for c in self.chunks)
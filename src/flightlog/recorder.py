@@ -0,0 +1,199 @@
+# background flight recorder. append() only copies a few numbers into in-memory column buffers, a
+# writer thread turns them into chunks and writes them out every flush_interval, so the control loop
+# and the telemetry callbacks never wait on SD-card I/O.
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from array import array
+
+from flightlog.log_format import STREAMS, STREAM_IDS, CHUNK_HEADER, CHUNK_MAGIC, LOG_SUFFIX, file_header
+from models.telemetry_codec import lookup
+
+log = logging.getLogger(__name__)
+
+
+class ColumnBuffer:
+    """Rows of one stream collected between two flushes."""
+
+    def __init__(self, stream):
+        self.columns = STREAMS[stream]
+        self.values = [array("d") for _ in self.columns]
+        self.strings = {}  # chunk string table, value -> index
+
+    def __len__(self):
+        return len(self.values[0])
+
+    def add(self, row):
+        for (_, kind), column, value in zip(self.columns, self.values, row):
+            if kind == "s":
+                text = "" if value is None else str(value)
+                value = self.strings.setdefault(text, len(self.strings))
+            elif value is None or isinstance(value, (str, dict)):
+                value = math.nan
+            column.append(float(value))
+
+    def pack(self, stream_id):
+        rows = len(self)
+        parts = []
+        for (_, kind), column in zip(self.columns, self.values):
+            if kind == "d":
+                parts.append(column.tobytes())
+            elif kind == "f":
+                parts.append(array("f", column).tobytes())
+            else:
+                parts.append(array("H", (int(v) for v in column)).tobytes())
+        table = sorted(self.strings, key=self.strings.get)
+        parts.append(json.dumps(table).encode())
+        payload = b"".join(parts)
+        timestamps = self.values[0]
+        return CHUNK_HEADER.pack(CHUNK_MAGIC, stream_id, rows, len(payload), timestamps[0], timestamps[-1]) + payload
+
+
+class FlightRecorder:
+    def __init__(self, directory, vehicle_id, flush_interval=1.0, max_file_bytes=64 * 1024 * 1024,
+                 chunk_rows=512, max_pending_rows=50000):
+        """
+        :param flush_interval: seconds between writer wake ups
+        :param max_file_bytes: the log rotates to a new file once it would grow past this size
+        :param chunk_rows: a stream is cut into chunks of at most this many rows
+        :param max_pending_rows: rows kept in memory if the disk falls behind, newer rows are dropped beyond it
+        """
+        self.directory = directory
+        self.vehicle_id = vehicle_id
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.chunk_rows = chunk_rows
+        self.max_pending_rows = max_pending_rows
+
+        self.lock = threading.Lock()
+        self.buffers = {name: [ColumnBuffer(name)] for name in STREAMS}
+        self.pending = 0
+        self.dropped = 0
+        self.rows_written = 0
+        self.files = []  # paths written by this recorder, oldest first
+
+        self.file = None
+        self.file_size = 0
+        self.wake = threading.Event()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=f"recorder-{self.vehicle_id}", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        if not self.running:
+            return
+        self.running = False
+        self.wake.set()
+        self.thread.join(5.0)
+
+    # producers
+
+    def append(self, stream, row):
+        """row = values in STREAMS[stream] column order, timestamp first."""
+        with self.lock:
+            if self.pending >= self.max_pending_rows:
+                self.dropped += 1
+                return
+            buffers = self.buffers[stream]
+            if len(buffers[-1]) >= self.chunk_rows:
+                buffers.append(ColumnBuffer(stream))
+            buffers[-1].add(row)
+            self.pending += 1
+
+    def record_telemetry(self, snapshot, timestamp=None):
+        columns = STREAMS["telemetry"]
+        row = [timestamp or time.time()]
+        for name, _ in columns[1:]:
+            group, field = name.split(".", 1)
+            row.append(lookup(snapshot, group, field))
+        self.append("telemetry", row)
+
+    def record_heartbeat(self, heartbeat):
+        self.append("heartbeat", [
+            heartbeat.get("hb_timestamp") or time.time(),
+            heartbeat.get("ack_timestamp"),
+            heartbeat.get("strength"),
+            heartbeat.get("ack"),
+            heartbeat.get("status"),
+        ])
+
+    # writer
+
+    def _run(self):
+        while self.running:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self._flush()
+        self._flush()
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def _take(self):
+        with self.lock:
+            taken = {}
+            for name, buffers in self.buffers.items():
+                if len(buffers[-1]):
+                    taken[name] = buffers
+                    self.buffers[name] = [ColumnBuffer(name)]
+            self.pending = 0
+            return taken
+
+    def _flush(self):
+        taken = self._take()
+        if not taken:
+            return
+        try:
+            for name, buffers in taken.items():
+                for buffer in buffers:
+                    if len(buffer):
+                        self._write(buffer.pack(STREAM_IDS[name]))
+                        self.rows_written += len(buffer)
+            self.file.flush()
+        except Exception as e:
+            log.error("❌ Flight recorder write failed: %s", e)
+
+    def _write(self, chunk):
+        if self.file is None or self.file_size + len(chunk) > self.max_file_bytes:
+            self._rotate()
+        self.file.write(chunk)
+        self.file_size += len(chunk)
+
+    def _rotate(self):
+        if self.file:
+            self.file.close()
+        created = time.time()
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(created))
+        index = len(self.files)
+        while True:
+            path = os.path.join(self.directory, f"{self.vehicle_id}_{stamp}_{index:03d}{LOG_SUFFIX}")
+            if not os.path.exists(path):
+                break
+            index += 1
+        self.file = open(path, "xb")
+        header = file_header(self.vehicle_id, created)
+        self.file.write(header)
+        self.file_size = len(header)
+        self.files.append(path)
+        log.info("📝 Recording flight log to %s", path)
+
+    def status(self):
+        return {
+            "recording": self.running,
+            "file": self.files[-1] if self.files else None,
+            "files": len(self.files),
+            "rows_written": self.rows_written,
+            "pending": self.pending,
+            "dropped": self.dropped,
+        }
@@ -1,14 +1,42 @@
-from flask import Flask
+from core.config.config import config
+
+# production mode serves socket.io from eventlet green threads, patching has to happen before flask is imported
+if config["server_mode"] == "production":
+    import eventlet
+    eventlet.monkey_patch()
+
+# after patching, the log queue and its writer thread have to use the patched threading primitives
+from core.utils.logger import setup_logging
+
+setup_logging()  # before anything logs, records then go through the background writer
+
+from flask import Flask, Response, abort
 from flask_socketio import SocketIO
 from api.ws_routes import DroneControlRoute
-from core.config.config import config
+from core.utils.metrics import metrics
+from core.utils import socket_json
 
 # Create Flask instance
 app = Flask(__name__)
-socketio = SocketIO(app, cors_allowed_origins="*", ping_interval=5, ping_timeout=10)
+socketio = SocketIO(
+    app,
+    cors_allowed_origins="*",
+    ping_interval=5,
+    ping_timeout=10,
+    async_mode="eventlet" if config["server_mode"] == "production" else "threading",
+    json=socket_json,  # lets pre-serialized payloads (telemetry) through without re-encoding
+)
 
 # Initialize WebSocket routes BEFORE running the app
 drone_socket = DroneControlRoute(socketio)
 
+
+# Prometheus scrape endpoint
+@app.route("/metrics")
+def metrics_route():
+    if not metrics.enabled:
+        abort(404)
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
-    socketio.run(app, host=config["host"], port=config["server_port"], debug=True)
+    socketio.run(app, host=config["host"], port=int(config["server_port"]), debug=config["server_mode"] != "production")
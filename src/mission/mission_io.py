@@ -0,0 +1,168 @@
+# QGC WPL 110 mission files: streaming parser / writer and a compact array backed mission container.
+# Large survey missions (tens of thousands of items) are read line by line into typed arrays instead of
+# lists of strings, and written through a buffered writer instead of string concatenation.
+
+from array import array
+
+WPL_HEADER = "QGC WPL 110"
+WPL_COLUMNS = (11, 12)  # autocontinue is optional
+
+# file frame -> MISSION_ITEM_INT frame (lat/lon sent as degrees * 1e7)
+INT_FRAMES = {
+    0: 5,    # MAV_FRAME_GLOBAL -> MAV_FRAME_GLOBAL_INT
+    3: 6,    # MAV_FRAME_GLOBAL_RELATIVE_ALT -> MAV_FRAME_GLOBAL_RELATIVE_ALT_INT
+    10: 11,  # MAV_FRAME_GLOBAL_TERRAIN_ALT -> MAV_FRAME_GLOBAL_TERRAIN_ALT_INT
+}
+
+MAV_CMD_NAV_WAYPOINT = 16
+MAV_FRAME_GLOBAL = 0
+MAV_FRAME_GLOBAL_RELATIVE_ALT = 3
+
+
+class WplParseError(ValueError):
+    def __init__(self, path, line_no, message):
+        super().__init__(f"{path}:{line_no}: {message}")
+        self.path = path
+        self.line_no = line_no
+
+
+class Mission:
+    """Column oriented list of mission items, one typed array per field."""
+
+    def __init__(self):
+        self.current = array("B")
+        self.frame = array("B")
+        self.command = array("H")
+        self.params = array("f")   # 4 values per item
+        self.lat = array("i")      # degrees * 1e7
+        self.lon = array("i")      # degrees * 1e7
+        self.alt = array("f")
+        self.autocontinue = array("B")
+
+    def __len__(self):
+        return len(self.command)
+
+    def append(self, frame, command, lat, lon, alt, params=(0, 0, 0, 0), current=0, autocontinue=1):
+        self.current.append(current)
+        self.frame.append(frame)
+        self.command.append(command)
+        self.params.extend(params)
+        self.lat.append(int(round(lat * 1e7)))
+        self.lon.append(int(round(lon * 1e7)))
+        self.alt.append(alt)
+        self.autocontinue.append(autocontinue)
+
+    def __getitem__(self, seq):
+        """MISSION_ITEM_INT field tuple for seq (frame, command, current, autocontinue, p1-4, x, y, z)."""
+        p = seq * 4
+        return (
+            INT_FRAMES.get(self.frame[seq], self.frame[seq]),
+            self.command[seq],
+            self.current[seq],
+            self.autocontinue[seq],
+            self.params[p], self.params[p + 1], self.params[p + 2], self.params[p + 3],
+            self.lat[seq],
+            self.lon[seq],
+            self.alt[seq],
+        )
+
+    def __iter__(self):
+        for seq in range(len(self)):
+            yield self[seq]
+
+    def waypoint(self, seq):
+        """(lat, lon, alt) in degrees / meters."""
+        return self.lat[seq] / 1e7, self.lon[seq] / 1e7, self.alt[seq]
+
+    @classmethod
+    def from_waypoints(cls, waypoints, home=None):
+        """Builds a mission from [lat, lon, alt] points, item 0 is home (first point unless given)."""
+        mission = cls()
+        home = home or waypoints[0]
+        mission.append(MAV_FRAME_GLOBAL, MAV_CMD_NAV_WAYPOINT, home[0], home[1], home[2], current=1)
+        for lat, lon, alt in waypoints:
+            mission.append(MAV_FRAME_GLOBAL_RELATIVE_ALT, MAV_CMD_NAV_WAYPOINT, lat, lon, alt)
+        return mission
+
+
+def iter_wpl(path):
+    """
+    Lazily parses a QGC WPL 110 file, yields (seq, current, frame, command, (p1, p2, p3, p4), lat, lon, alt,
+    autocontinue) per line. Raises WplParseError with the offending line number.
+    """
+    with open(path, "r") as file:
+        header = file.readline()
+        if header.strip() != WPL_HEADER:
+            raise WplParseError(path, 1, f"expected '{WPL_HEADER}' header")
+
+        for line_no, line in enumerate(file, start=2):
+            line = line.strip()
+            if not line:
+                continue
+
+            fields = line.split("\t")
+            if len(fields) not in WPL_COLUMNS:
+                raise WplParseError(path, line_no, f"expected 11 or 12 tab separated columns, got {len(fields)}")
+
+            try:
+                yield (
+                    int(fields[0]),
+                    int(fields[1]),
+                    int(fields[2]),
+                    int(fields[3]),
+                    (float(fields[4]), float(fields[5]), float(fields[6]), float(fields[7])),
+                    float(fields[8]),
+                    float(fields[9]),
+                    float(fields[10]),
+                    int(float(fields[11])) if len(fields) == 12 else 1,  # older exports omit autocontinue
+                )
+            except ValueError as e:
+                raise WplParseError(path, line_no, f"invalid number ({e})") from None
+
+
+def read_wpl(path):
+    """Reads a QGC WPL 110 file into a Mission."""
+    mission = Mission()
+    for seq, current, frame, command, params, lat, lon, alt, autocontinue in iter_wpl(path):
+        mission.append(frame, command, lat, lon, alt, params, current, autocontinue)
+    return mission
+
+
+class WplWriter:
+    """Buffered QGC WPL 110 writer, items are written out as they are produced."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.seq = 0
+
+    def __enter__(self):
+        self.file = open(self.path, "w", buffering=1 << 16)
+        self.file.write(WPL_HEADER + "\n")
+        return self
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+    def write_item(self, frame, command, lat, lon, alt, params=(0, 0, 0, 0), current=0, autocontinue=1):
+        p1, p2, p3, p4 = params
+        self.file.write(
+            f"{self.seq}\t{current}\t{frame}\t{command}\t{p1:g}\t{p2:g}\t{p3:g}\t{p4:g}"
+            f"\t{lat:.7f}\t{lon:.7f}\t{alt:g}\t{autocontinue}\n"
+        )
+        self.seq += 1
+
+    def write_mission(self, mission):
+        for seq in range(len(mission)):
+            p = seq * 4
+            lat, lon, alt = mission.waypoint(seq)
+            self.write_item(
+                mission.frame[seq], mission.command[seq], lat, lon, alt,
+                tuple(mission.params[p:p + 4]), mission.current[seq], mission.autocontinue[seq],
+            )
+
+
+def write_wpl(path, mission):
+    with WplWriter(path) as writer:
+        writer.write_mission(mission)
+    return path
@@ -0,0 +1,149 @@
+# background mission engine: runs one mission at a time off the socket.io handlers, reports progress
+# and accepts pause / resume / cancel while the vehicle is flying.
+# A mission is any object with run(control, report) -> bool, see Scan for the reference implementation.
+
+import logging
+import threading
+import time
+import uuid
+
+log = logging.getLogger(__name__)
+
+
+class MissionCancelled(Exception):
+    pass
+
+
+class MissionControl:
+    """Shared flags between the runner and a running mission."""
+
+    def __init__(self):
+        self._resume = threading.Event()
+        self._resume.set()
+        self._cancel = threading.Event()
+
+    def pause(self):
+        self._resume.clear()
+
+    def resume(self):
+        self._resume.set()
+
+    def cancel(self):
+        self._cancel.set()
+        self._resume.set()  # wake up a paused mission so it can unwind
+
+    def is_paused(self):
+        return not self._resume.is_set()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def wait_while_paused(self):
+        self._resume.wait()
+
+    def checkpoint(self):
+        """Blocks while paused, raises MissionCancelled once cancel was requested."""
+        self._resume.wait()
+        if self._cancel.is_set():
+            raise MissionCancelled()
+
+    def sleep(self, seconds):
+        """Interruptible sleep, returns early on cancel."""
+        return not self._cancel.wait(seconds)
+
+
+class MissionRunner:
+    def __init__(self, emit=None):
+        self.emit = emit or (lambda event, payload: None)
+        self.lock = threading.Lock()
+        self.thread = None
+        self.control = None
+        self.mission_id = None
+        self.name = None
+        self.state = "idle"
+        self.progress = None
+        self.started = None
+
+    def is_active(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, name, mission, on_finish=None):
+        with self.lock:
+            if self.is_active():
+                raise RuntimeError(f"Mission '{self.name}' ({self.mission_id}) is still running.")
+
+            self.mission_id = uuid.uuid4().hex[:12]
+            self.name = name
+            self.control = MissionControl()
+            self.progress = None
+            self.started = time.time()
+            self._set_state("running")
+            self.thread = threading.Thread(
+                target=self._run, args=(mission, self.control, self.mission_id, on_finish), daemon=True
+            )
+            self.thread.start()
+            return self.mission_id
+
+    def _run(self, mission, control, mission_id, on_finish):
+        try:
+            success = mission.run(control, lambda progress: self._report(mission_id, progress))
+            state = "completed" if success else "failed"
+        except MissionCancelled:
+            state = "cancelled"
+        except Exception as e:
+            log.error("❌ Mission %s crashed: %s", mission_id, e)
+            state = "failed"
+
+        if control.is_cancelled():
+            state = "cancelled"
+        with self.lock:
+            if self.mission_id == mission_id:
+                self._set_state(state)
+
+        if on_finish:
+            try:
+                on_finish(state)
+            except Exception as e:
+                log.error("❌ Mission %s cleanup failed: %s", mission_id, e)
+
+    def _report(self, mission_id, progress):
+        progress = dict(progress, mission_id=mission_id)
+        self.progress = progress
+        self.emit("mission_progress", progress)
+
+    def _set_state(self, state):
+        self.state = state
+        self.emit("mission_status", self.status())
+
+    def pause(self):
+        with self.lock:
+            if not self.is_active() or self.state != "running":
+                return False
+            self.control.pause()
+            self._set_state("paused")
+            return True
+
+    def resume(self):
+        with self.lock:
+            if not self.is_active() or self.state != "paused":
+                return False
+            self.control.resume()
+            self._set_state("running")
+            return True
+
+    def cancel(self):
+        with self.lock:
+            if not self.is_active():
+                return False
+            self.control.cancel()
+            self._set_state("cancelling")
+            return True
+
+    def status(self):
+        return {
+            "mission_id": self.mission_id,
+            "name": self.name,
+            "state": self.state,
+            "progress": self.progress,
+            "started": self.started,
+        }
@@ -0,0 +1,122 @@
+# mission dry run: estimates flight time, energy and telemetry link usage of a scan before arming.
+# Mirrors what Scan / Planner actually do (GUIDED switch and climb in takeoff_and_hold, a mode switch
+# plus an accelerate / cruise / brake leg per goto_wp, retries, RTL at the end) with closed form
+# kinematics on numpy arrays, so a plan evaluates in microseconds and planning sweeps can try
+# thousands of candidates per second.
+
+import numpy as np
+
+from core.utils.geo import EARTH_RADIUS
+
+DEFAULT_ENERGY_MODEL = {
+    "hover_power": 180.0,        # W, level hover
+    "speed_power": 4.0,          # W per m/s of horizontal speed
+    "drag_power": 0.02,          # W per (m/s)^3, parasitic drag
+    "climb_power": 60.0,         # W per m/s of climb rate
+    "battery_wh": 100.0,         # usable pack energy at 100 %
+    "reserve_pct": 25.0,         # energy that has to be left on landing
+    "max_accel": 2.0,            # m/s^2 horizontal
+    "climb_rate": 2.5,           # m/s, takeoff and altitude changes
+    "descent_rate": 1.0,         # m/s, final landing
+    "rtl_speed": 5.0,            # m/s, return to launch
+    "mode_switch_time": 2.0,     # s, Planner.set_mode waits this long on every switch
+    "retry_probability": 0.0,    # expected share of waypoints that need a retry
+    "retry_time": 5.0,           # s lost per retry (stop, wait, switch back)
+    "telemetry_rate_hz": 10.0,   # link usage estimate
+    "telemetry_frame_bytes": 132,
+}
+
+
+def _legs(lat, lon):
+    lat_r, lon_r = np.radians(lat), np.radians(lon)
+    dlat, dlon = np.diff(lat_r), np.diff(lon_r)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat_r[:-1]) * np.cos(lat_r[1:]) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _move(distance, speed, accel):
+    """Trapezoidal (or triangular) velocity profile, returns (time, cruise time, peak speed) per leg."""
+    ramp = speed * speed / accel
+    full = distance >= ramp
+    t_full = distance / speed + speed / accel
+    t_short = 2 * np.sqrt(distance / accel)
+    peak = np.where(full, speed, np.sqrt(distance * accel))
+    cruise = np.where(full, distance / speed - speed / accel, 0.0)
+    return np.where(full, t_full, t_short), cruise, peak
+
+
+def simulate(waypoints, groundspeed, model=None, battery_level=None):
+    """
+    :param waypoints: [[lat, lon, alt], ...] as sent to start_scan
+    :param groundspeed: commanded groundspeed in m/s
+    :param model: energy model overrides, see DEFAULT_ENERGY_MODEL
+    :param battery_level: current battery level in % (None assumes a full pack)
+    :return: report dict with time, energy, link usage and the feasible flag
+    """
+    m = dict(DEFAULT_ENERGY_MODEL, **(model or {}))
+    wps = np.asarray(waypoints, dtype=float)
+    if wps.ndim != 2 or wps.shape[0] == 0 or wps.shape[1] != 3:
+        raise ValueError("Expected a list of [lat, lon, alt] lists.")
+    speed = float(groundspeed)
+    if speed <= 0:
+        raise ValueError("Groundspeed must be positive.")
+
+    hover = m["hover_power"]
+    climb_rate = m["climb_rate"]
+    switch = m["mode_switch_time"]
+
+    def cruise_power(v):
+        return m["speed_power"] * v + m["drag_power"] * v ** 3
+
+    # takeoff_and_hold: GUIDED switch, climb to 95 % of the first altitude, switch to LOITER
+    takeoff_alt = max(float(wps[0, 2]), 0.0)
+    t_takeoff = 2 * switch + 0.95 * takeoff_alt / climb_rate
+    e_takeoff = hover * t_takeoff + m["climb_power"] * climb_rate * (0.95 * takeoff_alt / climb_rate)
+
+    # goto_wp legs: first leg starts from the takeoff point (first waypoint), every leg begins with a mode switch
+    lat = np.concatenate(([wps[0, 0]], wps[:, 0]))
+    lon = np.concatenate(([wps[0, 1]], wps[:, 1]))
+    alt = np.concatenate(([takeoff_alt * 0.95], wps[:, 2]))
+    horizontal = _legs(lat, lon)
+    vertical = np.abs(np.diff(alt))
+    t_move, t_cruise, peak = _move(horizontal, speed, m["max_accel"])
+    t_vertical = vertical / climb_rate
+    t_legs = switch + np.maximum(t_move, t_vertical)
+    climbing = np.clip(np.diff(alt), 0.0, None)
+    e_legs = (hover * t_legs
+              + cruise_power(speed) * t_cruise
+              + cruise_power(peak / 2) * (t_move - t_cruise)
+              + m["climb_power"] * climbing)
+
+    n_retries = float(m["retry_probability"] * len(wps))
+    t_retry = n_retries * m["retry_time"]
+    e_retry = hover * t_retry
+
+    # emergency_land at the end: RTL back to the launch point, then descend
+    rtl_distance = _legs(np.array([wps[-1, 0], wps[0, 0]]), np.array([wps[-1, 1], wps[0, 1]]))
+    t_rtl_move, t_rtl_cruise, rtl_peak = _move(rtl_distance, m["rtl_speed"], m["max_accel"])
+    t_land = float(wps[-1, 2]) / m["descent_rate"]
+    t_rtl = switch + float(t_rtl_move[0]) + t_land
+    e_rtl = (hover * t_rtl + cruise_power(m["rtl_speed"]) * float(t_rtl_cruise[0])
+             + cruise_power(float(rtl_peak[0]) / 2) * float(t_rtl_move[0] - t_rtl_cruise[0]))
+
+    flight_time = t_takeoff + float(t_legs.sum()) + t_retry + t_rtl
+    energy_wh = (e_takeoff + float(e_legs.sum()) + e_retry + e_rtl) / 3600.0
+
+    level = 100.0 if battery_level is None else float(battery_level)
+    available_wh = m["battery_wh"] * level / 100.0
+    usable_wh = available_wh - m["battery_wh"] * m["reserve_pct"] / 100.0
+    feasible = energy_wh <= usable_wh
+
+    return {
+        "feasible": bool(feasible),
+        "flight_time": round(flight_time, 1),
+        "distance": round(float(horizontal.sum() + rtl_distance[0]), 1),
+        "energy_wh": round(energy_wh, 2),
+        "usable_wh": round(usable_wh, 2),
+        "remaining_pct": round(100.0 * (available_wh - energy_wh) / m["battery_wh"], 1),
+        "expected_retries": round(n_retries, 2),
+        "link_bytes": int(flight_time * m["telemetry_rate_hz"] * m["telemetry_frame_bytes"]),
+        "reason": None if feasible else
+        f"needs {energy_wh:.1f} Wh but only {max(usable_wh, 0.0):.1f} Wh are usable above the {m['reserve_pct']:.0f}% reserve",
+    }
@@ -0,0 +1,144 @@
+# waypoint ordering for inspection missions (open travelling salesman path).
+# Nearest neighbour construction, then 2-opt and Or-opt improvement over a precomputed distance matrix
+# until no move helps or the time budget runs out. The first waypoint always stays first, the last one
+# optionally stays last.
+
+import time
+
+import numpy as np
+
+from core.utils.geo import EARTH_RADIUS
+
+
+def distance_matrix(points):
+    """Pairwise haversine distances in meters for [[lat, lon, ...], ...]."""
+    pts = np.radians(np.asarray(points, dtype=float)[:, :2])
+    lat, lon = pts[:, 0], pts[:, 1]
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def route_length(dist, route):
+    route = np.asarray(route)
+    return float(dist[route[:-1], route[1:]].sum())
+
+
+def nearest_neighbour(dist, fixed_end):
+    n = len(dist)
+    last = n - 1 if fixed_end else None
+    visited = np.zeros(n, dtype=bool)
+    visited[0] = True
+    if last is not None:
+        visited[last] = True
+
+    route = [0]
+    for _ in range(n - 1 - (last is not None)):
+        row = np.where(visited, np.inf, dist[route[-1]])
+        nxt = int(np.argmin(row))
+        visited[nxt] = True
+        route.append(nxt)
+    if last is not None:
+        route.append(last)
+    return route
+
+
+def _two_opt_pass(dist, route, fixed_end, deadline):
+    """One sweep of 2-opt moves (segment reversals), returns True if the route improved."""
+    n = len(route)
+    improved = False
+    end = n - 1 if fixed_end else n  # reversal may not touch a fixed last node
+
+    for i in range(1, end - 1):
+        if time.perf_counter() > deadline:
+            break
+        a, b = route[i - 1], route[i]
+        js = np.arange(i + 1, end)
+        c = route[js]
+        nxt = js + 1
+        # open path: reversing up to the last node only changes the edge at its start
+        e = route[np.minimum(nxt, n - 1)]
+        tail_old = np.where(nxt < n, dist[c, e], 0.0)
+        tail_new = np.where(nxt < n, dist[b, e], 0.0)
+        delta = dist[a, c] + tail_new - dist[a, b] - tail_old
+
+        k = int(np.argmin(delta))
+        if delta[k] < -1e-6:
+            j = js[k]
+            route[i:j + 1] = route[i:j + 1][::-1].copy()
+            improved = True
+    return improved
+
+
+def _or_opt_pass(dist, route, fixed_end, deadline, max_segment=3):
+    """Moves chains of 1..max_segment waypoints to a better position, returns True if the route improved."""
+    improved = False
+    for length in range(1, max_segment + 1):
+        i = 1
+        while i + length <= len(route) - (1 if fixed_end else 0):
+            if time.perf_counter() > deadline:
+                return improved
+            n = len(route)
+            seg = route[i:i + length]
+            prev, first, last = route[i - 1], seg[0], seg[-1]
+            after = route[i + length] if i + length < n else None
+
+            removed_gain = dist[prev, first] + (dist[last, after] - dist[prev, after] if after is not None else 0.0)
+
+            rest = np.concatenate((route[:i], route[i + length:]))
+            # insert between rest[p] and rest[p + 1], or at the open end
+            p = np.arange(len(rest))
+            q = np.minimum(p + 1, len(rest) - 1)
+            has_next = p + 1 < len(rest)
+            forward = dist[rest[p], first] + np.where(has_next, dist[last, rest[q]] - dist[rest[p], rest[q]], 0.0)
+            backward = dist[rest[p], last] + np.where(has_next, dist[first, rest[q]] - dist[rest[p], rest[q]], 0.0)
+            cost = np.minimum(forward, backward)
+            if fixed_end:
+                cost[-1] = np.inf  # nothing goes after the fixed end
+            cost[i - 1] = np.inf  # same place
+
+            k = int(np.argmin(cost))
+            if cost[k] < removed_gain - 1e-6:
+                moved = seg if forward[k] <= backward[k] else seg[::-1]
+                route[:] = np.concatenate((rest[:k + 1], moved, rest[k + 1:]))
+                improved = True
+            else:
+                i += 1
+    return improved
+
+
+def optimize_route(waypoints, fixed_end=False, time_budget=0.5):
+    """
+    Reorders [[lat, lon, alt], ...] to shorten the flight path.
+    :return: {"waypoints", "order", "original_length", "optimized_length", "saved", "saved_pct"}
+    """
+    n = len(waypoints)
+    if n < 3 + (1 if fixed_end else 0):
+        length = route_length(distance_matrix(waypoints), np.arange(n)) if n > 1 else 0.0
+        return {"waypoints": list(waypoints), "order": list(range(n)), "original_length": round(length, 1),
+                "optimized_length": round(length, 1), "saved": 0.0, "saved_pct": 0.0}
+
+    deadline = time.perf_counter() + time_budget
+    dist = distance_matrix(waypoints)
+    original = route_length(dist, np.arange(n))
+
+    route = np.array(nearest_neighbour(dist, fixed_end))
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = _two_opt_pass(dist, route, fixed_end, deadline)
+        improved = _or_opt_pass(dist, route, fixed_end, deadline) or improved
+
+    optimized = route_length(dist, route)
+    if optimized >= original:
+        route, optimized = np.arange(n), original  # never hand back something worse than the input
+
+    saved = original - optimized
+    return {
+        "waypoints": [list(waypoints[i]) for i in route],
+        "order": route.tolist(),
+        "original_length": round(original, 1),
+        "optimized_length": round(optimized, 1),
+        "saved": round(saved, 1),
+        "saved_pct": round(100.0 * saved / original, 1) if original else 0.0,
+    }
@@ -1,6 +1,10 @@
 # customized scan mission, called in drone_services with params as waypoints and planner object
 
-import time
+import logging
+from core.utils.geo import haversine
+from mission.mission_runner import MissionCancelled, MissionControl
+
+log = logging.getLogger(__name__)
 
 class Scan:
     def __init__(self, planner, waypoints, g_speed):
@@ -9,57 +13,95 @@ class Scan:
         self.ground_speed = g_speed
         # self.start_mission(waypoints)
 
+    # blocking run without pause/cancel support
     def start_mission(self):
+        return self.run(MissionControl(), lambda progress: None)
+
+    def _remaining_distances(self):
+        """remaining[i] is the length in meters of the legs after waypoint i."""
+        remaining = [0.0] * len(self.waypoints)
+        for i in range(len(self.waypoints) - 2, -1, -1):
+            a, b = self.waypoints[i], self.waypoints[i + 1]
+            remaining[i] = remaining[i + 1] + haversine(a[0], a[1], b[0], b[1])
+        return remaining
+
+    def run(self, control, report):
      max_retries = 3
-     print("🚀 Starting scan mission with waypoints...")
+     log.info("🚀 Starting scan mission with waypoints...")
 
      try:
         if not self.waypoints or len(self.waypoints[0]) != 3:
-            print("❌ Invalid waypoints data. Aborting mission.")
+            log.error("❌ Invalid waypoints data. Aborting mission.")
             return False
 
         # Fetch altitude from the first waypoint
         _, _, initial_alt = self.waypoints[0]
 
+        control.checkpoint()
+
         # Perform Takeoff and Hold at initial altitude
-        print(f"🛫 Taking off and holding at {initial_alt}m before starting mission...")
+        log.info("🛫 Taking off and holding at %sm before starting mission...", initial_alt)
         takeoff_success = self.planner.takeoff_and_hold(initial_alt)
 
         if not takeoff_success:
-            print("❌ Takeoff failed. Aborting mission.")
+            log.error("❌ Takeoff failed. Aborting mission.")
             return False
 
+        total = len(self.waypoints)
+        speed = float(self.ground_speed) or 1.0
+        remaining_after = self._remaining_distances()
+
         # Start navigating through waypoints
         for index, wp in enumerate(self.waypoints):
             lat, lon, alt = wp
-            print(f"📍 Navigating to Waypoint {index + 1}/{len(self.waypoints)}: ({lat}, {lon}, {alt}m)")
+            log.info("📍 Navigating to Waypoint %s/%s: (%s, %s, %sm)", index + 1, total, lat, lon, alt)
+            control.checkpoint()
+
+            remaining = remaining_after[index]
+
+            def on_progress(distance, index=index, remaining=remaining):
+                report({
+                    "index": index + 1,
+                    "total": total,
+                    "distance": round(distance, 2),
+                    "eta": round(distance / speed, 1),
+                    "mission_eta": round((distance + remaining) / speed, 1),
+                })
 
             attempt = 0
             success = False
 
             while attempt < max_retries:
-                success = self.planner.goto_wp(lat, lon, alt, self.ground_speed)
+                success = self.planner.goto_wp(lat, lon, alt, self.ground_speed, on_progress=on_progress, control=control)
 
                 if success:
-                    print(f"✅ Reached Waypoint {index + 1}")
+                    log.info("✅ Reached Waypoint %s", index + 1)
                     break  # Go to next waypoint
 
+                if control.is_cancelled():
+                    raise MissionCancelled()
+
                 attempt += 1
-                print(f"⚠️ Failed attempt {attempt}/{max_retries} for Waypoint {index + 1}. Retrying...")
+                log.warning("⚠️ Failed attempt %s/%s for Waypoint %s. Retrying...", attempt, max_retries, index + 1)
                 self.planner.stop()  # Stop and reset before retrying
-                time.sleep(1)
+                control.sleep(1)
 
             if not success:
-                print(f"❌ Failed to reach Waypoint {index + 1} after {max_retries} retries. Returning home...")
+                log.error("❌ Failed to reach Waypoint %s after %s retries. Returning home...", index + 1, max_retries)
                 self.planner.emergency_land()
                 return False
 
-        print("✅ Scan mission complete. Returning to launch...")
+        log.info("✅ Scan mission complete. Returning to launch...")
         self.planner.emergency_land()
         return True
 
+     except MissionCancelled:
+        log.info("🛑 Scan mission cancelled. Returning home...")
+        self.planner.emergency_land()
+        raise
+
      except Exception as e:
-        print(f"❌ Unexpected Error during mission: {e}")
-        print("⚠️ Triggering emergency landing!")
+        log.error("❌ Unexpected Error during mission: %s", e)
+        log.warning("⚠️ Triggering emergency landing!")
         self.planner.emergency_land()
         return False
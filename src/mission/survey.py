@@ -0,0 +1,131 @@
+# coverage path (lawnmower / boustrophedon) generator feeding the Scan mission.
+# The polygon is projected to a local east-north plane around its centroid, sweep lines are intersected
+# with every polygon edge at once with numpy and the resulting legs are projected back to lat/lon.
+
+import numpy as np
+
+from core.utils.geo import EARTH_RADIUS
+
+
+def to_enu(lat, lon, lat0, lon0):
+    """Equirectangular local tangent plane projection, meters east / north of (lat0, lon0)."""
+    x = np.radians(lon - lon0) * EARTH_RADIUS * np.cos(np.radians(lat0))
+    y = np.radians(lat - lat0) * EARTH_RADIUS
+    return x, y
+
+
+def from_enu(x, y, lat0, lon0):
+    lat = lat0 + np.degrees(y / EARTH_RADIUS)
+    lon = lon0 + np.degrees(x / (EARTH_RADIUS * np.cos(np.radians(lat0))))
+    return lat, lon
+
+
+def polygon_area(x, y):
+    """Shoelace area in square meters."""
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def _sweep_segments(u, v, spacing):
+    """
+    Intersects sweep lines v = const (spaced by spacing) with the polygon edges.
+    Returns a list per sweep line of (u_start, u_end, v) segments inside the polygon.
+    """
+    v_min, v_max = v.min(), v.max()
+    n_lines = max(1, int(np.ceil((v_max - v_min) / spacing)))
+    # center the lines, the outer passes end up at most half a spacing inside the outline
+    offset = (v_max - v_min - (n_lines - 1) * spacing) / 2
+    lines = v_min + offset + spacing * np.arange(n_lines)
+
+    u1, v1 = u, v
+    u2, v2 = np.roll(u, -1), np.roll(v, -1)
+
+    # (lines x edges) crossing test and intersection along track, half open to not count vertices twice
+    lv = lines[:, None]
+    crosses = ((v1 <= lv) & (lv < v2)) | ((v2 <= lv) & (lv < v1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (lv - v1) / (v2 - v1)
+    hits = np.where(crosses, u1 + t * (u2 - u1), np.nan)
+    hits.sort(axis=1)  # nan sorts last
+    counts = crosses.sum(axis=1)
+
+    segments = []
+    for row, line_v, count in zip(hits, lines, counts):
+        pairs = row[:count - count % 2].reshape(-1, 2)
+        segments.append([(a, b, line_v) for a, b in pairs if b > a])
+    return segments
+
+
+def plan_survey(polygon, altitude, footprint, overlap=0.2, heading=0.0, start=None):
+    """
+    Boustrophedon coverage of a polygon.
+    :param polygon: [[lat, lon], ...] outline, at least 3 points
+    :param altitude: flight altitude in meters (relative)
+    :param footprint: sensor ground footprint width in meters, across track
+    :param overlap: side overlap between neighbouring passes, 0 <= overlap < 1
+    :param heading: direction of the passes in degrees clockwise from north
+    :param start: optional [lat, lon], the pattern starts at the corner closest to it
+    :return: {"waypoints": [[lat, lon, alt], ...], "passes": n, "length": m, "area": m2, "spacing": m}
+    """
+    pts = np.asarray(polygon, dtype=float)
+    if pts.ndim != 2 or pts.shape[0] < 3 or pts.shape[1] < 2:
+        raise ValueError("Polygon needs at least 3 [lat, lon] points.")
+    if footprint <= 0:
+        raise ValueError("Footprint must be positive.")
+    if not 0 <= overlap < 1:
+        raise ValueError("Overlap must be in [0, 1).")
+
+    lat0, lon0 = pts[:, 0].mean(), pts[:, 1].mean()
+    x, y = to_enu(pts[:, 0], pts[:, 1], lat0, lon0)
+
+    # rotate so the passes run along +u
+    h = np.radians(heading)
+    sin_h, cos_h = np.sin(h), np.cos(h)
+    u = x * sin_h + y * cos_h
+    v = -x * cos_h + y * sin_h
+
+    spacing = footprint * (1 - overlap)
+    passes = [segs for segs in _sweep_segments(u, v, spacing) if segs]
+    if not passes:
+        raise ValueError("Polygon is too small for the given footprint.")
+
+    # leg endpoints, alternating direction on every pass
+    legs = []
+    for i, segs in enumerate(passes):
+        ordered = segs if i % 2 == 0 else [(b, a, line_v) for a, b, line_v in reversed(segs)]
+        for a, b, line_v in ordered:
+            legs.append((a, line_v))
+            legs.append((b, line_v))
+    path = np.array(legs)
+
+    if start is not None:
+        path = _closest_start(path, start, lat0, lon0, sin_h, cos_h)
+
+    # back to east/north and lat/lon
+    pu, pv = path[:, 0], path[:, 1]
+    px = pu * sin_h - pv * cos_h
+    py = pu * cos_h + pv * sin_h
+    lat, lon = from_enu(px, py, lat0, lon0)
+
+    length = float(np.hypot(np.diff(px), np.diff(py)).sum())
+    waypoints = np.column_stack((lat, lon, np.full(lat.shape, float(altitude)))).tolist()
+
+    return {
+        "waypoints": waypoints,
+        "passes": len(passes),
+        "length": round(length, 1),
+        "area": round(float(polygon_area(x, y)), 1),
+        "spacing": spacing,
+    }
+
+
+def _closest_start(path, start, lat0, lon0, sin_h, cos_h):
+    """Picks the variant of the pattern (reversed / mirrored pass order) that begins closest to start."""
+    sx, sy = to_enu(start[0], start[1], lat0, lon0)
+    su, sv = sx * sin_h + sy * cos_h, -sx * cos_h + sy * sin_h
+
+    reversed_path = path[::-1]
+    # mirroring the leg direction of every pass keeps the pattern valid and swaps the starting side
+    pairs = path.reshape(-1, 2, 2)[:, ::-1, :].reshape(-1, 2)
+    candidates = (path, reversed_path, pairs, pairs[::-1])
+    distances = [np.hypot(c[0, 0] - su, c[0, 1] - sv) for c in candidates]
+    return candidates[int(np.argmin(distances))]
@@ -0,0 +1,138 @@
+# compact binary encoding of a telemetry snapshot (fixed struct layout), negotiated per client as an
+# alternative to the json 'telemetry_response'. The ground station decodes it with decode() or with the
+# layout returned by describe_schema().
+
+import math
+import struct
+import time
+import zlib
+
+SCHEMA_VERSION = 2
+MAGIC = b"VT"
+
+# (group, field, struct format) in wire order, mirrors the TelemetryModel getters
+TELEMETRY_SCHEMA = (
+    ("nav", "latitude", "d"),
+    ("nav", "longitude", "d"),
+    ("nav", "altitude", "f"),
+    ("nav", "groundspeed", "f"),
+    ("nav", "airspeed", "f"),
+    ("nav", "climbrate", "f"),
+    ("attitude", "yaw", "f"),
+    ("attitude", "pitch", "f"),
+    ("attitude", "roll", "f"),
+    ("attitude", "tilt", "f"),
+    ("gps", "fixtype", "b"),
+    ("gps", "satellites", "b"),
+    ("gps", "gpsaltitude", "f"),
+    ("system", "flight_mode", "12s"),
+    ("system", "armed", "b"),
+    ("system", "ekfstatus", "b"),
+    ("battery", "voltage", "f"),
+    ("battery", "current", "f"),
+    ("battery", "level", "b"),
+    ("imu", "acceleration.x", "f"),
+    ("imu", "acceleration.y", "f"),
+    ("imu", "acceleration.z", "f"),
+    ("imu", "gyroscope.x", "f"),
+    ("imu", "gyroscope.y", "f"),
+    ("imu", "gyroscope.z", "f"),
+    ("imu", "magnetometer.x", "f"),
+    ("imu", "magnetometer.y", "f"),
+    ("imu", "magnetometer.z", "f"),
+)
+
+# magic, schema version, schema crc, sequence number, timestamp, vehicle id (nul padded ascii)
+HEADER_FORMAT = "<2sBIId16s"
+BODY_FORMAT = "<" + "".join(fmt for _, _, fmt in TELEMETRY_SCHEMA)
+
+# crc of the layout itself, lets a client detect that it decodes with a stale schema
+SCHEMA_CRC = zlib.crc32(";".join(f"{g}.{f}:{fmt}" for g, f, fmt in TELEMETRY_SCHEMA).encode())
+
+HEADER = struct.Struct(HEADER_FORMAT)
+BODY = struct.Struct(BODY_FORMAT)
+FRAME_SIZE = HEADER.size + BODY.size
+
+MISSING_INT = -1  # missing value marker for integer fields, floats use NaN
+BOOL_FIELDS = ("armed", "ekfstatus")  # packed as int8, decoded back to bool
+
+
+def lookup(snapshot, group, field):
+    """Value of a schema field ("imu", "acceleration.x") in a nested snapshot, None when missing."""
+    value = snapshot.get(group)
+    for key in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _pack_value(value, fmt):
+    if fmt.endswith("s"):
+        return str(value or "").encode("ascii", "replace")
+    if fmt == "b":
+        if value is None or isinstance(value, str):
+            return MISSING_INT
+        return max(-1, min(127, int(value)))
+    if value is None or isinstance(value, (str, dict)):
+        return math.nan
+    return float(value)
+
+
+def _unpack_value(field, value, fmt):
+    if fmt.endswith("s"):
+        return value.rstrip(b"\x00").decode("ascii")
+    if fmt == "b":
+        if value == MISSING_INT:
+            return None
+        return bool(value) if field in BOOL_FIELDS else value
+    return None if math.isnan(value) else value
+
+
+def encode(snapshot, seq=0, timestamp=None, vehicle_id=""):
+    """Packs a telemetry snapshot (as returned by the telemetry store) into a fixed size frame."""
+    values = [_pack_value(lookup(snapshot, group, field), fmt) for group, field, fmt in TELEMETRY_SCHEMA]
+    header = HEADER.pack(MAGIC, SCHEMA_VERSION, SCHEMA_CRC, seq & 0xFFFFFFFF, timestamp or time.time(),
+                         _pack_value(vehicle_id, "16s"))
+    return header + BODY.pack(*values)
+
+
+def decode(frame):
+    """Unpacks a binary frame back into the nested telemetry dict."""
+    magic, version, crc, seq, timestamp, vehicle_id = HEADER.unpack_from(frame, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a telemetry frame.")
+    if version != SCHEMA_VERSION or crc != SCHEMA_CRC:
+        raise ValueError(f"Telemetry schema mismatch (frame v{version}, decoder v{SCHEMA_VERSION}).")
+
+    telemetry = {}
+    for (group, field, fmt), value in zip(TELEMETRY_SCHEMA, BODY.unpack_from(frame, HEADER.size)):
+        target = telemetry.setdefault(group, {})
+        *parents, leaf = field.split(".")
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = _unpack_value(field, value, fmt)
+
+    return {"seq": seq, "timestamp": timestamp, "vehicle_id": _unpack_value("vehicle_id", vehicle_id, "16s"),
+            "telemetry": telemetry}
+
+
+def describe_schema():
+    """Layout description sent to the ground station so it can decode frames on its own."""
+    fields = []
+    offset = HEADER.size
+    for group, field, fmt in TELEMETRY_SCHEMA:
+        size = struct.calcsize("<" + fmt)
+        fields.append({"group": group, "field": field, "format": fmt, "offset": offset, "size": size})
+        offset += size
+
+    return {
+        "version": SCHEMA_VERSION,
+        "crc": SCHEMA_CRC,
+        "byte_order": "little",
+        "header_format": HEADER_FORMAT,
+        "header": ["magic", "version", "crc", "seq", "timestamp", "vehicle_id"],
+        "frame_size": FRAME_SIZE,
+        "missing": {"float": "NaN", "int": MISSING_INT},
+        "fields": fields,
+    }
@@ -66,6 +66,15 @@ class TelemetryModel:
             },
         }
 
+    # IMU block built from a RAW_IMU / SCALED_IMU2 mavlink message (used by the telemetry store)
+    @staticmethod
+    def imu_from_message(msg):
+        return {
+            "acceleration": {"x": msg.xacc, "y": msg.yacc, "z": msg.zacc},
+            "gyroscope": {"x": msg.xgyro, "y": msg.ygyro, "z": msg.zgyro},
+            "magnetometer": {"x": msg.xmag, "y": msg.ymag, "z": msg.zmag},
+        }
+
     # 7️⃣ RC (Radio Controller) Input Data
     def get_rc_input(self):
         return {
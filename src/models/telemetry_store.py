@@ -0,0 +1,141 @@
+# event driven telemetry cache, fed by dronekit attribute/message listeners instead of polling the vehicle on every frame
+
+import json
+import logging
+import threading
+import time
+
+from models.telemetry_model import TelemetryModel
+
+log = logging.getLogger(__name__)
+
+# dronekit attribute name -> telemetry groups that have to be rebuilt when it changes
+ATTRIBUTE_GROUPS = {
+    "location.global_frame": ("nav", "gps"),
+    "location.global_relative_frame": ("nav",),
+    "groundspeed": ("nav",),
+    "airspeed": ("nav",),
+    "velocity": ("nav",),
+    "attitude": ("attitude",),
+    "gps_0": ("gps",),
+    "mode": ("system",),
+    "armed": ("system",),
+    "ekf_ok": ("system",),
+    "battery": ("battery",),
+}
+
+# raw mavlink messages carrying the IMU block (not exposed as dronekit attributes)
+IMU_MESSAGES = ("RAW_IMU", "SCALED_IMU2")
+
+
+class TelemetryStore:
+    """
+    Keeps a versioned telemetry snapshot that is updated from vehicle callbacks.
+    Readers get the current snapshot reference without touching the vehicle.
+    """
+
+    def __init__(self, vehicle):
+        self._bind(vehicle)
+        self.lock = threading.Lock()
+        self.version = 0
+        self.updated_at = None
+        self._snapshot = {}
+        self._serialized = None  # (version, json string) cache
+        self.listeners = []  # fn(snapshot, timestamp) after every update, e.g. the flight recorder
+        self.attached = False
+
+    def _bind(self, vehicle):
+        self.vehicle = vehicle
+        self.model = TelemetryModel(vehicle)
+        self.builders = {
+            "nav": self.model.get_navigation_data,
+            "attitude": self.model.get_attitude_data,
+            "gps": self.model.get_gps_data,
+            "system": self.model.get_system_status,
+            "battery": self.model.get_battery_status,
+            "imu": self.model.get_imu_data,
+        }
+
+    def rebind(self, vehicle):
+        """Follows a new vehicle object after a reconnect, versions keep counting up so readers see the change."""
+        self.detach()
+        self._bind(vehicle)
+        return self.attach()
+
+    def attach(self):
+        """Build the initial snapshot and subscribe to vehicle updates."""
+        if self.attached or not self.vehicle:
+            return self.attached
+
+        for group in self.builders:
+            self._rebuild((group,))
+
+        for attr_name in ATTRIBUTE_GROUPS:
+            self.vehicle.add_attribute_listener(attr_name, self._on_attribute)
+        for msg_name in IMU_MESSAGES:
+            self.vehicle.add_message_listener(msg_name, self._on_imu_message)
+
+        self.attached = True
+        return True
+
+    def detach(self):
+        if not self.attached or not self.vehicle:
+            return
+        for attr_name in ATTRIBUTE_GROUPS:
+            try:
+                self.vehicle.remove_attribute_listener(attr_name, self._on_attribute)
+            except Exception:
+                pass
+        for msg_name in IMU_MESSAGES:
+            try:
+                self.vehicle.remove_message_listener(msg_name, self._on_imu_message)
+            except Exception:
+                pass
+        self.attached = False
+
+    def _on_attribute(self, vehicle, attr_name, value):
+        self._rebuild(ATTRIBUTE_GROUPS.get(attr_name, ()))
+
+    def _on_imu_message(self, vehicle, name, msg):
+        self._publish({"imu": TelemetryModel.imu_from_message(msg)})
+
+    def _rebuild(self, groups):
+        updates = {}
+        for group in groups:
+            try:
+                updates[group] = self.builders[group]()
+            except Exception as e:
+                updates[group] = f"⚠️ Error: {str(e)}"
+        if updates:
+            self._publish(updates)
+
+    def _publish(self, updates):
+        # copy-on-write: the published dict is never mutated, so readers can share it
+        with self.lock:
+            snapshot = dict(self._snapshot)
+            snapshot.update(updates)
+            self._snapshot = snapshot
+            self.version += 1
+            self.updated_at = time.time()
+            updated_at = self.updated_at
+
+        for listener in self.listeners:
+            try:
+                listener(snapshot, updated_at)
+            except Exception as e:
+                log.error("❌ Telemetry listener failed: %s", e)
+
+    def snapshot(self):
+        """Returns (version, snapshot). The snapshot must be treated as read-only."""
+        with self.lock:
+            return self.version, self._snapshot
+
+    def serialized(self):
+        """Returns (version, json string) of the current snapshot, encoded at most once per version."""
+        version, snapshot = self.snapshot()
+        cached = self._serialized
+        if cached is not None and cached[0] == version:
+            return cached
+        cached = (version, json.dumps(snapshot))
+        self._serialized = cached
+        return cached
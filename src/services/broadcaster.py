@@ -0,0 +1,101 @@
+# fan-out of periodic data streams (heartbeat, telemetry) to socket.io rooms.
+# One poller per stream no matter how many clients are connected, clients only join and leave rooms.
+
+import threading
+import time
+
+from core.utils.metrics import metrics
+
+
+class Stream:
+    def __init__(self, name, producer, interval, event, encoders):
+        self.name = name
+        self.producer = producer      # returns (version, payload) or None when there is nothing to send
+        self.interval = interval
+        self.event = event
+        self.encoders = encoders      # format -> fn(payload, version) producing the emitted data
+        self.members = {}             # sid -> format
+        self.running = False
+        self.last_version = None
+
+    def room(self, fmt):
+        return f"{self.name}:{fmt}"
+
+
+class Broadcaster:
+    def __init__(self, socketio):
+        self.socketio = socketio
+        self.streams = {}
+        self.lock = threading.Lock()
+
+    def add_stream(self, name, producer, interval, event, encoders):
+        self.streams[name] = Stream(name, producer, interval, event, encoders)
+
+    def join(self, sid, name, fmt="json"):
+        stream = self.streams[name]
+        if fmt not in stream.encoders:
+            raise ValueError(f"Stream '{name}' does not support format '{fmt}'.")
+
+        with self.lock:
+            previous = stream.members.get(sid)
+            if previous is not None and previous != fmt:
+                self.socketio.server.leave_room(sid, stream.room(previous), namespace="/")
+            stream.members[sid] = fmt
+            self.socketio.server.enter_room(sid, stream.room(fmt), namespace="/")
+
+            start = not stream.running
+            stream.running = True
+            # the newcomer needs the current payload even if the version has not moved since the last frame
+            stream.last_version = None
+
+        if start:
+            self.socketio.start_background_task(self._run_stream, stream)
+        return True
+
+    def leave(self, sid, name):
+        stream = self.streams[name]
+        with self.lock:
+            fmt = stream.members.pop(sid, None)
+        if fmt is not None:
+            self.socketio.server.leave_room(sid, stream.room(fmt), namespace="/")
+
+    def leave_all(self, sid):
+        # socket.io drops the rooms of a disconnected client by itself, only the bookkeeping is needed here
+        with self.lock:
+            for stream in self.streams.values():
+                stream.members.pop(sid, None)
+
+    def set_interval(self, name, interval):
+        self.streams[name].interval = interval
+
+    def subscribers(self, name):
+        return len(self.streams[name].members)
+
+    def _run_stream(self, stream):
+        expected = None
+        while True:
+            now = time.perf_counter()
+            if expected is not None:
+                metrics.observe("stream_tick_lag_seconds", max(0.0, now - expected), stream=stream.name)
+            expected = now + stream.interval
+            with self.lock:
+                if not stream.members:
+                    stream.running = False
+                    break
+                formats = set(stream.members.values())
+
+            try:
+                produced = stream.producer()
+                if produced is not None:
+                    version, payload = produced
+                    if version is None or version != stream.last_version:
+                        stream.last_version = version
+                        # encode once per format, not once per client
+                        for fmt in formats:
+                            data = stream.encoders[fmt](payload, version)
+                            self.socketio.emit(stream.event, data, to=stream.room(fmt))
+            except Exception as e:
+                for fmt in formats:
+                    self.socketio.emit('error', {'error': str(e)}, to=stream.room(fmt))
+
+            self.socketio.sleep(stream.interval)
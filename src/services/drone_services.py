@@ -1,49 +1,147 @@
 # high level drone services module
 
+import logging
 from adapters.dronekit_adapter.connection import ConnectionHandler
 from adapters.dronekit_adapter.flight_control import FlightController
 from adapters.dronekit_adapter.motors import MotorController
 from adapters.dronekit_adapter.network import Network
 from adapters.dronekit_adapter.planner import Planner
 from adapters.dronekit_adapter.upload import WaypointUploader
+from adapters.dronekit_adapter.dispatcher import CommandDispatcher, LANE_FAILSAFE
+from adapters.dronekit_adapter.manual_control import ManualControl
 
-from models.telemetry_model import TelemetryModel
+from models.telemetry_store import TelemetryStore
+from flightlog.recorder import FlightRecorder
+from services.reconnect import ReconnectSupervisor
 
 from core.utils.portmanager import PortManager
 from core.config.config import config
+from core.utils.metrics import metrics
 
 from mission.scan_mission import Scan
+from mission.mission_runner import MissionRunner
+from mission.survey import plan_survey
+from mission.route_optimizer import optimize_route
+from mission.preflight import simulate
 
 import os, time
 
+log = logging.getLogger(__name__)
+
 class DroneService:
     
-    def __init__(self):
-        self.conn = ConnectionHandler()
-        self.network = Network()
+    def __init__(self, vehicle_id=None, settings=None, network=None, emit=None):
+        self.vehicle_id = vehicle_id or config["default_vehicle"]
+        self.settings = settings or config["vehicles"][self.vehicle_id]  # serial_port / tcp_conn_string / baud / sitl
+        self.emit = emit or (lambda event, payload: None)  # pushes server side events to the clients
+        self.missions = MissionRunner(self.emit)
+        self.conn = ConnectionHandler(self.settings.get("backend", config["vehicle_backend"]), self.settings.get("mock"))
+        self.conn.on_link_change = self._link_changed
+        self.conn.on_ready_progress = lambda progress: self.emit("connection_progress", progress)
+        self.reconnect = ReconnectSupervisor(self.vehicle_id, self._connect, self._reconnected,
+                                             lambda status: self.emit("reconnect_status", status))
+        self._resume_after_reconnect = False  # mission paused by the reconnect supervisor, resumed once the link is back
+        if config["reconnect_enabled"] and not self.settings.get("replay"):
+           self.conn.on_link_expired = self._link_expired
+        self.network = network or Network()  # ground link, shared by every vehicle of a fleet
         self.manager = PortManager()
+        self.link = None  # command dispatcher, the only writer to the vehicle
         self.control = None
         self.motors = None
+        self.manual = None
         self.plan = None
         self.upload = None
         self.telemetry = None
+        self.recorder = None
 
     def start_connection(self):
-        self.manager.free_port(config["serial_port"])
-        message = self.conn.connect(config["serial_port"],config["baud"])
-      #   message = self.conn.connect_sitl(config["tcp_conn_string"],config["baud"])
-
+        message = self._connect()
         if message == True:
-           self.control = FlightController(self.conn.vehicle,self.conn.is_connected)
-           self.upload = WaypointUploader(self.conn.vehicle)  # initiallizing waypointuploader class with drone conn instance
-           self.telemetry = TelemetryModel(self.conn.vehicle) # initallizing telemetry
+           self._bind_vehicle()
            self.is_connected = True
         else:
-           print("vehicle not connected")    
+           log.info("vehicle not connected")
+        return message
+
+    def _connect(self):
+        if self.settings.get("replay"):
+           message = self.conn.connect_replay(self.settings["replay"],self.settings.get("replay_speed", 1.0),
+                                              self.settings.get("replay_loop", False))
+        elif self.settings.get("sitl"):
+           message = self.conn.connect_sitl(self.settings["tcp_conn_string"],self.settings["baud"])
+        else:
+           if self.conn.backend != "mock":
+              self.manager.free_port(self.settings["serial_port"])
+           message = self.conn.connect(self.settings["serial_port"],self.settings["baud"])
         return message
 
+    def _bind_vehicle(self):
+        """(Re)creates the adapters around the connected vehicle, the ones a running mission holds are re-pointed."""
+        vehicle = self.conn.vehicle
+        self.link = CommandDispatcher(vehicle, name=f"mavlink-{self.vehicle_id}")
+        self.link.start()
+        self.control = FlightController(vehicle,self.conn.is_connected,self.link)
+        self.upload = WaypointUploader(vehicle,self.link)  # initiallizing waypointuploader class with drone conn instance
+        if self.telemetry:
+           self.telemetry.rebind(vehicle)  # same store, streams and recorder keep their subscription
+        else:
+           self.telemetry = TelemetryStore(vehicle) # initallizing event driven telemetry cache
+           self.telemetry.attach()
+        for adapter in (self.plan, self.motors, self.manual):
+           if adapter:
+              adapter.vehicle = vehicle
+              adapter.link = self.link
+        if self.recorder is None:
+           self._start_recorder()
+
+    # link loss, the watchdog gave up on the vehicle: drop the dead adapters and reconnect in the background
+    def _link_expired(self):
+        self._resume_after_reconnect = self.missions.pause()
+        self.reconnect.start(teardown=self._release_vehicle)
+
+    def _release_vehicle(self):
+        self.stop_manual()
+        if self.link:
+           self.link.stop()  # fails whatever was queued for the dead vehicle
+        if self.telemetry:
+           self.telemetry.detach()
+        self.conn.disconnect()
+
+    def _reconnected(self, attempt, elapsed):
+        self._bind_vehicle()
+        if self.conn.vehicle.armed:
+           # still flying, the rebuilt controller has to know or failsafe / disarm refuse to act
+           self.control.is_arm = True
+           if self.plan is None:
+              self.plan = Planner(self.conn.vehicle, self.link)
+           if self._resume_after_reconnect:
+              self.missions.resume()
+        self._resume_after_reconnect = False
+        self.emit("reconnect_status", {"state": "reconnected", "attempt": attempt, "elapsed": round(elapsed, 2)})
+
+    def _start_recorder(self):
+        if not config["recorder_enabled"] or self.settings.get("replay"):
+           return  # a replayed flight is already on disk
+        self.recorder = FlightRecorder(
+            config["recorder_dir"], self.vehicle_id, config["recorder_flush_interval"],
+            config["recorder_max_file_mb"] * 1024 * 1024, config["recorder_chunk_rows"],
+        )
+        self.recorder.start()
+        self.telemetry.listeners.append(self.recorder.record_telemetry)
+
     def stop_connection(self):
       #   if self.conn.is_connected == True:       commented out for testing
+           self.reconnect.cancel()
+           if self.telemetry:
+              self.telemetry.detach()
+           if self.recorder:
+              if self.recorder.record_telemetry in self.telemetry.listeners:
+                 self.telemetry.listeners.remove(self.recorder.record_telemetry)
+              self.recorder.close()
+              self.recorder = None
+           self.stop_manual()
+           if self.link:
+              self.link.stop()
            message = self.conn.disconnect()
            return message
         
@@ -62,21 +160,37 @@ class DroneService:
          return self.network.heartbeat()
 
     def acknowledge(self,ack):
-           self.network.ack = ack
-           return True 
+           return self.network.acknowledge(ack)
 
     def trigger_failsafe(self):
-        if self.control.is_arm and self.plan:
-            self.plan.set_mode('LAND')
+        self.stop_manual()
+        if self.control and self.control.is_arm and self.plan:
+            self.plan.set_mode('LAND', LANE_FAILSAFE)
                      
 
+    def _link_changed(self, state, status):
+        # stick input can't reach a vehicle that stopped talking, the autopilot's own failsafe takes over
+        if state != "ok":
+            self.stop_manual()
+        self.emit("link_status", dict(status, state=state))
+
+    # after a fast connect an operation only waits for the vehicle attributes it reads
+    def _ready(self, operation):
+        if self.conn.wait_ready(operation, config["ready_timeout"]):
+           return True
+        log.warning("⚠️ Vehicle not ready for %s, attributes still missing after %s s.",
+                    operation, config['ready_timeout'])
+        return False
+
     def start_to_arm(self):
         if self.conn.is_connected == True:
+           if not self._ready("arm"):
+              return False
            message = self.control.arm_vehicle()
-           self.motors = MotorController(self.conn.vehicle)
+           self.motors = MotorController(self.conn.vehicle, self.link)
            if message == True:
             #   self.control.is_arm = True
-              self.plan = Planner(self.conn.vehicle)   
+              self.plan = Planner(self.conn.vehicle, self.link)   
            return message
 
     def start_to_disarm(self):
@@ -136,10 +250,32 @@ class DroneService:
               message = self.motors.yaw_anticlockwise()
            return message               
 
+    # streamed stick input, replaces the per-click pulses of the motor controls above
+    def start_manual(self):
+        if self.conn.is_connected == True:
+           if self.control.is_arm == True and self._ready("manual"):
+              if self.manual is None:
+                 self.manual = ManualControl(self.conn.vehicle, self.link, config["manual_rate_hz"],
+                                             config["manual_timeout"], config["manual_ramp"])
+              return self.manual.start()
+        return False
+
+    def manual_axes(self, axes):
+        if not self.manual or not self.manual.running:
+           raise RuntimeError("Manual control is not active.")
+        return self.manual.set_axes(axes)
+
+    def stop_manual(self):
+        if self.manual:
+           return self.manual.stop()
+        return True
+
     def hold_alt(self,alt):
       #  print(float(self.data["height"]),2)
        if self.conn.is_connected == True:
            if self.control.is_arm == True:
+              if not self._ready("takeoff"):
+                 return False
               message = self.plan.takeoff_and_hold(alt)
             #   self.data = {}  #empty the dict for reuse
            return message
@@ -151,34 +287,26 @@ class DroneService:
            return message
 
     def mode_switch(self,mode):
+        if not self._ready("mode"):
+           return False
         message = self.plan.set_mode(mode)
         return message
               
 
-    def _safe_call(self, method_name, method, telemetry):
-        """Calls a method safely and handles exceptions."""
-        try:
-            telemetry[method_name] = method()
-        except Exception as e:
-            telemetry[method_name] = f"⚠️ Error: {str(e)}"
-
+    # returns the cached snapshot kept up to date by vehicle listeners, no vehicle access here
+    @metrics.timed("telemetry_snapshot")
     def send_telemetry(self):
-        if not self.conn.is_connected:
+        if not self.conn.is_connected or not self.telemetry:
          #   print("error : ❌ Drone is not connected.")
            return False
-    
-        # tm = TelemetryModel(self.conn.vehicle)
-
-        telemetry = {}
-        # Call each method safely
-        self._safe_call("nav", self.telemetry.get_navigation_data, telemetry)
-        self._safe_call("attitude", self.telemetry.get_attitude_data, telemetry)
-        self._safe_call("gps", self.telemetry.get_gps_data, telemetry)
-        self._safe_call("system", self.telemetry.get_system_status, telemetry)
-        self._safe_call("battery", self.telemetry.get_battery_status, telemetry)
-        self._safe_call("imu", self.telemetry.get_imu_data, telemetry)
 
+        _, telemetry = self.telemetry.snapshot()
         return telemetry
+
+    def telemetry_version(self):
+        if not self.telemetry:
+           return None
+        return self.telemetry.version
     
    #  def handle_file_upload(self, data):
     
@@ -230,17 +358,106 @@ class DroneService:
    #      print(f"❌ Failed to upload waypoints: {e}")
 
    
-    def scan(self, waypoints, g_speed):
+    # reorders scattered inspection points to shorten the flight, first waypoint stays first
+    def optimize_route(self, waypoints, options=None):
+        options = options if isinstance(options, dict) else {}
+        return optimize_route(
+            waypoints,
+            fixed_end=bool(options.get("fixed_end", False)),
+            time_budget=float(options.get("time_budget", config["route_time_budget"])),
+        )
+
+    # estimated time / energy / link usage of a scan, uses the live battery level when telemetry is available
+    def preflight(self, waypoints, g_speed):
+        battery_level = None
+        telemetry = self.send_telemetry()
+        if telemetry and isinstance(telemetry.get("battery"), dict):
+           battery_level = telemetry["battery"].get("level")
+        return simulate(waypoints, g_speed, config["energy_model"], battery_level)
+
+    # arms the vehicle and hands the scan over to the mission runner, returns once the mission is started
+    def scan(self, waypoints, g_speed, optimize=None):
          try:
+            if self.missions.is_active():
+               raise RuntimeError("Another mission is already running.")
+
+            route = None
+            if optimize:
+               route = self.optimize_route(waypoints, optimize)
+               waypoints = route.pop("waypoints")
+               log.info("🧭 Route optimized, %s m (%s%%) shorter.", route['saved'], route['saved_pct'])
+
+            if not self._ready("mission"):
+               raise RuntimeError("Vehicle is not ready for a mission yet.")
+
+            # dry run before arming, missions that would eat into the battery reserve are rejected
+            preflight = self.preflight(waypoints, g_speed)
+            if not preflight["feasible"] and config["preflight_enforce"]:
+               log.error("❌ Mission rejected by preflight: %s", preflight['reason'])
+               return {"rejected": True, "preflight": preflight, "route": route}
+
             response = self.start_to_arm()
-            print(response)
+            log.debug("Arm response: %s", response)
             if response:
                scan = Scan(self.plan, waypoints, g_speed)
-               response = scan.start_mission()
-               if response == False:
-                  self.start_to_disarm() 
+               mission_id = self.missions.start("scan", scan, on_finish=self._mission_finished)
+               return {"mission_id": mission_id, "route": route, "preflight": preflight}
             else:
-                print("failed to arm")
+                log.info("failed to arm")
+                return False
          except Exception as e:
-            print(f"❌ Error occured, failed to start the mission: {e}")
-                  
\ No newline at end of file
+            log.error("❌ Error occured, failed to start the mission: %s", e)
+            return False
+
+    # lawnmower coverage of a polygon, computed on the companion computer
+    def plan_survey(self, params):
+        return plan_survey(
+            params["polygon"],
+            float(params["altitude"]),
+            float(params["footprint"]),
+            float(params.get("overlap", 0.2)),
+            float(params.get("heading", 0.0)),
+            params.get("start"),
+        )
+
+    def survey(self, params):
+        plan = self.plan_survey(params)
+        response = self.scan(plan["waypoints"], params["speed"])
+        if response:
+           response["plan"] = {key: value for key, value in plan.items() if key != "waypoints"}
+        return response
+
+    def _mission_finished(self, state):
+        if state == "failed":
+           self.start_to_disarm()
+
+    def pause_mission(self):
+        return self.missions.pause()
+
+    def resume_mission(self):
+        return self.missions.resume()
+
+    def cancel_mission(self):
+        return self.missions.cancel()
+
+    def mission_status(self):
+        return self.missions.status()
+
+    # playback rate of a replay vehicle, 1 = real time, N = N times faster, 0 = as fast as possible
+    def replay_speed(self, speed):
+        vehicle = self.conn.vehicle
+        if not self.conn.is_connected or not hasattr(vehicle, "set_speed"):
+           raise RuntimeError("Vehicle is not a replay.")
+        vehicle.set_speed(speed)
+        return vehicle.status()
+
+    def vehicle_status(self):
+        return {
+            "vehicle_id": self.vehicle_id,
+            "connected": self.conn.is_connected,
+            "link": self.conn.link_status(),
+            "reconnect": self.reconnect.status(),
+            "readiness": self.conn.readiness_status(),
+            "armed": bool(self.control and self.control.is_arm),
+            "mission": self.missions.state,
+        }
@@ -0,0 +1,112 @@
+# registry of every vehicle served by this process. Each vehicle gets its own DroneService (connection,
+# adapters, mission runner), its own job executor and its own telemetry delta streamer, so a slow or
+# busy airframe never blocks the others. The ground link (heartbeat / ack) is shared.
+
+import logging
+import threading
+
+from adapters.dronekit_adapter.network import Network
+from core.config.config import config
+from core.utils.job_executor import JobExecutor
+from flightlog.log_query import LogCatalog, query
+from services.drone_services import DroneService
+from services.telemetry_stream import TelemetryStreamer
+
+log = logging.getLogger(__name__)
+
+
+class VehicleSlot:
+    def __init__(self, vehicle_id, service, jobs, streamer):
+        self.vehicle_id = vehicle_id
+        self.service = service
+        self.jobs = jobs
+        self.streamer = streamer
+        self.controller = None  # sid of the client that last commanded the vehicle
+
+
+class FleetManager:
+    def __init__(self, socketio):
+        self.socketio = socketio
+        self.network = Network()
+        self.network.listeners.append(self._ground_link_changed)
+        self.logs = LogCatalog(config["recorder_dir"])  # recorded flights of every vehicle
+        self.vehicles = {}
+        self.lock = threading.Lock()
+        for vehicle_id, settings in config["vehicles"].items():
+            self.register(vehicle_id, settings)
+
+    def register(self, vehicle_id, settings):
+        with self.lock:
+            if vehicle_id in self.vehicles:
+                raise ValueError(f"Vehicle '{vehicle_id}' is already registered.")
+
+            service = DroneService(vehicle_id, settings, self.network, emit=self._emitter(vehicle_id))
+            slot = VehicleSlot(
+                vehicle_id,
+                service,
+                JobExecutor(config["job_workers"], config["job_queue_limit"]),
+                TelemetryStreamer(self.socketio, service),
+            )
+            self.vehicles[vehicle_id] = slot
+            return slot
+
+    def _emitter(self, vehicle_id):
+        def emit(event, payload):
+            self.socketio.emit(event, {'message': payload, 'vehicle_id': vehicle_id})
+        return emit
+
+    def get(self, vehicle_id=None):
+        vehicle_id = vehicle_id or config["default_vehicle"]
+        slot = self.vehicles.get(vehicle_id)
+        if slot is None:
+            raise ValueError(f"Unknown vehicle '{vehicle_id}'.")
+        return slot
+
+    def slots(self):
+        return list(self.vehicles.values())
+
+    def status(self):
+        return [slot.service.vehicle_status() for slot in self.slots()]
+
+    # flight log queries, data = {"vehicle_id", "stream", "fields", "start", "end" | "last", "max_points", "method"}
+    def flight_logs(self, vehicle_id=None):
+        return self.logs.logs(vehicle_id)
+
+    def query_flight_log(self, params):
+        return query(
+            self.logs,
+            params.get("vehicle_id") or config["default_vehicle"],
+            params.get("stream", "telemetry"),
+            params["fields"],
+            params.get("start"),
+            params.get("end"),
+            params.get("last"),
+            params.get("max_points", 500),
+            params.get("method", "minmax"),
+        )
+
+    # ground link, shared by all vehicles
+    def send_heartbeat(self):
+        heartbeat = self.network.heartbeat()
+        for slot in self.slots():
+            if slot.service.recorder:
+                slot.service.recorder.record_heartbeat(heartbeat)
+        return heartbeat
+
+    def acknowledge(self, ack):
+        return self.network.acknowledge(ack)
+
+    def _ground_link_changed(self, state, stats):
+        self.socketio.emit('ground_link', {'message': stats})
+        if state == "lost" and config["ground_failsafe"]:
+            log.warning("⚠️ Ground link lost, triggering failsafe.")
+            self.trigger_failsafe()
+
+    def trigger_failsafe(self, vehicle_id=None):
+        """Failsafe for one vehicle, or for the whole fleet without a vehicle_id."""
+        slots = [self.get(vehicle_id)] if vehicle_id else self.slots()
+        for slot in slots:
+            try:
+                slot.service.trigger_failsafe()
+            except Exception as e:
+                log.error("❌ Failsafe failed for %s: %s", slot.vehicle_id, e)
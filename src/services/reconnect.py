@@ -0,0 +1,98 @@
+# reconnect supervisor. When the vehicle link expires the owning service hands it the teardown and a
+# connect function, it then retries on a background thread with exponential backoff and jitter (so a
+# fleet sharing a radio does not retry in lock step) until the link is back, the attempt budget is
+# spent or the operator disconnects.
+
+import logging
+import random
+import threading
+import time
+
+from core.config.config import config
+
+log = logging.getLogger(__name__)
+
+
+class ReconnectSupervisor:
+    def __init__(self, name, connect, on_connected=None, on_status=None, base_delay=None, max_delay=None,
+                 max_attempts=None, jitter=None):
+        """
+        :param connect: fn() -> bool, one connection attempt
+        :param on_connected: fn(attempt, elapsed) once an attempt succeeded
+        :param on_status: fn(status dict) on every attempt, for client notifications
+        """
+        self.name = name
+        self.connect = connect
+        self.on_connected = on_connected
+        self.on_status = on_status or (lambda status: None)
+        self.base_delay = config["reconnect_base_delay"] if base_delay is None else base_delay
+        self.max_delay = config["reconnect_max_delay"] if max_delay is None else max_delay
+        self.max_attempts = config["reconnect_max_attempts"] if max_attempts is None else max_attempts
+        self.jitter = config["reconnect_jitter"] if jitter is None else jitter
+        self.cancelled = threading.Event()
+        self.thread = None
+        self.attempt = 0
+        self.started = None
+
+    def active(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, teardown=None):
+        """Runs teardown() and then the retry loop on the supervisor thread, False when already running."""
+        if self.active():
+            return False
+        self.cancelled.clear()
+        self.attempt = 0
+        self.started = time.monotonic()
+        self.thread = threading.Thread(target=self._run, args=(teardown,), name=f"reconnect-{self.name}", daemon=True)
+        self.thread.start()
+        return True
+
+    def cancel(self):
+        self.cancelled.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(5.0)
+
+    def delay(self, attempt):
+        """Backoff before the next attempt, the upper jitter share of it is randomized."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+    def status(self):
+        return {
+            "reconnecting": self.active(),
+            "attempt": self.attempt,
+            "elapsed": round(time.monotonic() - self.started, 2) if self.started else None,
+        }
+
+    def _run(self, teardown):
+        if teardown:
+            try:
+                teardown()
+            except Exception as e:
+                log.error("❌ Teardown before reconnecting %s failed: %s", self.name, e)
+
+        while not self.cancelled.is_set():
+            self.attempt += 1
+            self.on_status({"state": "reconnecting", "attempt": self.attempt})
+            try:
+                connected = self.connect()
+            except Exception as e:
+                log.error("❌ Reconnect attempt %d for %s failed: %s", self.attempt, self.name, e)
+                connected = False
+
+            if connected and not self.cancelled.is_set():
+                elapsed = time.monotonic() - self.started
+                log.info("✅ %s reconnected after %d attempt(s), %.1f s.", self.name, self.attempt, elapsed)
+                if self.on_connected:
+                    self.on_connected(self.attempt, elapsed)
+                return
+
+            if self.max_attempts and self.attempt >= self.max_attempts:
+                log.error("❌ Giving up on %s after %d reconnect attempts.", self.name, self.attempt)
+                self.on_status({"state": "failed", "attempt": self.attempt})
+                return
+
+            delay = self.delay(self.attempt)
+            log.warning("⚠️ Reconnect attempt %d for %s failed, next one in %.1f s.", self.attempt, self.name, delay)
+            self.cancelled.wait(delay)
@@ -0,0 +1,135 @@
+# per-client telemetry streaming: every client subscribes to telemetry groups at its own rate and
+# receives delta frames (only changed fields) after an initial keyframe.
+
+import threading
+import time
+
+from core.config.config import config
+
+TELEMETRY_GROUPS = ("nav", "attitude", "gps", "system", "battery", "imu")
+
+
+class Subscription:
+    def __init__(self, sid, rates):
+        self.sid = sid
+        self.rates = rates              # group -> hz
+        self.next_due = {group: 0.0 for group in rates}
+        self.last_sent = {}             # group -> last field values sent to this client
+        self.seq = 0
+        self.needs_keyframe = True
+
+
+class TelemetryStreamer:
+    """
+    Single streaming thread serving every subscribed client.
+    Frames look like {"seq": n, "keyframe": bool, "timestamp": t, "vehicle_id": id, "groups": {group: {field: value}}}.
+    A client that sees a gap in seq asks for a resync and gets a fresh keyframe.
+    """
+
+    def __init__(self, socketio, service):
+        self.socketio = socketio
+        self.service = service
+        self.subscriptions = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.streaming = False
+
+    @staticmethod
+    def parse_rates(groups):
+        """Validates a {group: hz} mapping coming from the client."""
+        if not isinstance(groups, dict) or not groups:
+            raise ValueError("Expected a {group: rate_hz} mapping.")
+
+        max_rate = config["telemetry_max_rate_hz"]
+        rates = {}
+        for group, rate in groups.items():
+            if group not in TELEMETRY_GROUPS:
+                raise ValueError(f"Unknown telemetry group '{group}'.")
+            rate = float(rate)
+            if rate <= 0:
+                raise ValueError(f"Rate for '{group}' must be positive.")
+            rates[group] = min(rate, max_rate)
+        return rates
+
+    def subscribe(self, sid, groups):
+        rates = self.parse_rates(groups)
+        with self.lock:
+            self.subscriptions[sid] = Subscription(sid, rates)
+        self._start_streaming()
+        return rates
+
+    def unsubscribe(self, sid):
+        with self.lock:
+            self.subscriptions.pop(sid, None)
+
+    def resync(self, sid):
+        with self.lock:
+            sub = self.subscriptions.get(sid)
+            if sub is None:
+                return False
+            sub.needs_keyframe = True
+            for group in sub.next_due:
+                sub.next_due[group] = 0.0
+        return True
+
+    def _start_streaming(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.streaming = True
+            self.thread = threading.Thread(target=self._stream_loop, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.streaming = False
+
+    def _stream_loop(self):
+        tick = 1.0 / config["telemetry_max_rate_hz"]
+        while self.streaming:
+            telemetry = self.service.send_telemetry()
+            frames = []
+
+            with self.lock:
+                if not self.subscriptions:
+                    self.streaming = False
+                    break
+                if telemetry:
+                    now = time.time()
+                    for sub in self.subscriptions.values():
+                        frame = self._build_frame(sub, telemetry, now)
+                        if frame is not None:
+                            frames.append((sub.sid, frame))
+
+            for sid, frame in frames:
+                self.socketio.emit('telemetry_frame', frame, to=sid)
+
+            time.sleep(tick)
+
+    def _build_frame(self, sub, telemetry, now):
+        keyframe = sub.needs_keyframe
+        groups = {}
+
+        for group, rate in sub.rates.items():
+            if not keyframe and now < sub.next_due[group]:
+                continue
+            sub.next_due[group] = now + 1.0 / rate
+
+            current = telemetry.get(group)
+            if not isinstance(current, dict):
+                continue
+
+            previous = sub.last_sent.get(group)
+            if keyframe or previous is None:
+                changed = dict(current)
+            else:
+                changed = {field: value for field, value in current.items() if previous.get(field) != value}
+
+            if changed:
+                groups[group] = changed
+                sub.last_sent[group] = current
+
+        if not groups and not keyframe:
+            return None
+
+        sub.needs_keyframe = False
+        sub.seq += 1
+        return {"seq": sub.seq, "keyframe": keyframe, "timestamp": now, "vehicle_id": self.service.vehicle_id,
+                "groups": groups}
@@ -0,0 +1,15 @@
+# shared setup for the pytest suite, run with scripts/run_tests.py or `python -m pytest src/tests`.
+# Tests import the application packages the same way main.py does, with src/ on the path.
+
+import collections
+import collections.abc
+import os
+import sys
+
+# dronekit 2.9 still imports collections.MutableMapping, which Python 3.10 removed
+if not hasattr(collections, "MutableMapping"):
+    collections.MutableMapping = collections.abc.MutableMapping
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
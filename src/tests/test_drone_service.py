@@ -0,0 +1,47 @@
+# DroneService end to end on the mock backend: connect, arm, take off, land, the same path the
+# benchmark measures but asserting on the outcome
+
+import time
+
+import pytest
+
+from core.config.config import config
+from services.drone_services import DroneService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setitem(config, "recorder_enabled", False)
+    monkeypatch.setitem(config, "reconnect_enabled", False)
+    settings = {"backend": "mock", "serial_port": None, "baud": 57600,
+                "mock": {"arm_delay": 0.05, "mode_delay": 0.05, "climb_rate": 10.0, "land_rate": 10.0, "rtl_altitude": 5.0}}
+    service = DroneService("test", settings)
+    assert service.start_connection() is True
+    yield service
+    service.stop_connection()
+
+
+def _wait(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_arm_and_disarm(service):
+    assert service.start_to_arm() is True
+    assert service.conn.vehicle.armed
+    _wait(lambda: service.send_telemetry()["system"]["armed"] is True)
+
+    assert service.start_to_disarm() is True
+    assert not service.conn.vehicle.armed
+
+
+def test_takeoff_and_land(service):
+    assert service.start_to_arm() is True
+    assert service.hold_alt(5) is True
+    assert service.conn.vehicle.location.global_relative_frame.alt == pytest.approx(5.0, abs=0.5)
+
+    assert service.return_to_land() is True
+    _wait(lambda: not service.conn.vehicle.armed)
+    assert service.conn.vehicle.location.global_relative_frame.alt == 0.0
@@ -0,0 +1,105 @@
+import math
+
+import numpy as np
+import pytest
+
+from flightlog.log_query import LogCatalog, lttb, query
+from flightlog.log_reader import LogReader
+from flightlog.recorder import FlightRecorder
+
+T0 = 1700000000.0
+ROWS = 1000
+
+
+def _snapshot(i):
+    return {
+        "nav": {"altitude": 10.0 + 5.0 * math.sin(i / 50.0), "groundspeed": float(i % 7)},
+        "system": {"flight_mode": "GUIDED" if i < ROWS // 2 else "RTL", "armed": True},
+        "battery": {"voltage": 16.8 - i * 0.001},
+    }
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    # small chunks and files so queries cross chunk and file boundaries
+    recorder = FlightRecorder(str(tmp_path), "drone-1", flush_interval=0.01, max_file_bytes=32 * 1024, chunk_rows=64)
+    recorder.start()
+    for i in range(ROWS):
+        recorder.record_telemetry(_snapshot(i), timestamp=T0 + i * 0.1)
+    recorder.close()
+    assert recorder.rows_written == ROWS
+    assert len(recorder.files) > 1
+    return tmp_path
+
+
+def test_reader_sees_every_row(log_dir):
+    catalog = LogCatalog(str(log_dir))
+    logs = catalog.logs("drone-1")
+    assert sum(entry["rows"]["telemetry"] for entry in logs) == ROWS
+    assert logs[0]["start"] == T0
+    assert logs[-1]["end"] == pytest.approx(T0 + (ROWS - 1) * 0.1)
+
+    with LogReader(log_dir / logs[0]["file"]) as reader:
+        columns = reader.read("telemetry", ["timestamp", "nav.altitude", "system.flight_mode"])
+        assert columns["nav.altitude"][0] == pytest.approx(10.0)
+        assert columns["system.flight_mode"][0] == "GUIDED"
+        assert np.all(np.diff(columns["timestamp"]) > 0)
+
+
+def test_time_range_is_inclusive(log_dir):
+    catalog = LogCatalog(str(log_dir))
+    start, end = T0 + 10.0, T0 + 20.0
+    result = query(catalog, "drone-1", "telemetry", ["nav.altitude"], start=start, end=end, method="raw")
+    assert result["rows"] == 101
+    assert result["method"] == "raw"
+    assert result["t"][0] == start and result["t"][-1] == pytest.approx(end)
+    assert result["series"]["nav.altitude"][0] == pytest.approx(_snapshot(100)["nav"]["altitude"], rel=1e-6)
+
+    assert query(catalog, "drone-1", "telemetry", ["nav.altitude"], start=T0 - 10, end=T0 - 1)["rows"] == 0
+    assert query(catalog, "drone-2", "telemetry", ["nav.altitude"])["rows"] == 0
+
+
+def test_minmax_buckets_bound_the_data(log_dir):
+    catalog = LogCatalog(str(log_dir))
+    result = query(catalog, "drone-1", "telemetry", ["nav.altitude", "system.flight_mode"], max_points=50)
+    assert result["rows"] == ROWS
+    series = result["series"]["nav.altitude"]
+    assert len(result["t"]) == len(series["min"]) == 50
+    assert min(series["min"]) == pytest.approx(5.0, abs=0.01)
+    assert max(series["max"]) == pytest.approx(15.0, abs=0.01)
+    assert all(lo <= mean <= hi for lo, mean, hi in zip(series["min"], series["mean"], series["max"]))
+    assert result["series"]["system.flight_mode"][0] == "GUIDED"
+    assert result["series"]["system.flight_mode"][-1] == "RTL"
+
+
+def test_lttb_query_keeps_the_extremes(log_dir):
+    catalog = LogCatalog(str(log_dir))
+    result = query(catalog, "drone-1", "telemetry", ["nav.altitude"], max_points=100, method="lttb")
+    series = result["series"]["nav.altitude"]
+    assert len(series["t"]) == 100
+    assert series["t"][0] == T0 and series["t"][-1] == pytest.approx(T0 + (ROWS - 1) * 0.1)
+    assert max(series["v"]) == pytest.approx(15.0, abs=0.05)
+    assert min(series["v"]) == pytest.approx(5.0, abs=0.05)
+
+
+def test_lttb_indexes():
+    t = np.arange(200, dtype=float)
+    v = np.zeros(200)
+    v[137] = 10.0  # a single spike has the largest triangle of its bucket
+    keep = lttb(t, v, 20)
+    assert len(keep) == 20
+    assert keep[0] == 0 and keep[-1] == 199
+    assert np.all(np.diff(keep) > 0)
+    assert 137 in keep
+
+    assert np.array_equal(lttb(t[:10], v[:10], 20), np.arange(10))
+
+
+def test_query_validates_arguments(log_dir):
+    catalog = LogCatalog(str(log_dir))
+    with pytest.raises(ValueError, match="downsampling"):
+        query(catalog, "drone-1", "telemetry", ["nav.altitude"], method="median")
+    with pytest.raises(ValueError, match="stream"):
+        query(catalog, "drone-1", "video", ["nav.altitude"])
+    with pytest.raises(ValueError, match="fields"):
+        query(catalog, "drone-1", "telemetry", ["nav.depth"])
@@ -0,0 +1,116 @@
+# watchdog state machine against the mock vehicle's message listeners, with timeouts scaled down to
+# fractions of a second
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from adapters.dronekit_adapter.heartbeat_watchdog import DEGRADED, EXPIRED, LOST, OK, HeartbeatWatchdog
+from adapters.virtual_adapter.mock_vehicle import MockVehicle
+
+
+class Transitions:
+    def __init__(self):
+        self.states = []
+        self.changed = threading.Condition()
+
+    def __call__(self, state, status):
+        with self.changed:
+            self.states.append(state)
+            self.changed.notify_all()
+
+    def wait_for(self, state, timeout=2.0):
+        with self.changed:
+            assert self.changed.wait_for(lambda: state in self.states, timeout), f"never {state}: {self.states}"
+
+
+@pytest.fixture
+def vehicle():
+    return MockVehicle()
+
+
+@pytest.fixture
+def watch(vehicle):
+    watchdogs = []
+
+    def start(**timeouts):
+        transitions = Transitions()
+        watchdog = HeartbeatWatchdog(vehicle, transitions, **timeouts)
+        watchdog.start()
+        watchdogs.append(watchdog)
+        return watchdog, transitions
+
+    yield start
+    for watchdog in watchdogs:
+        watchdog.stop()
+
+
+def _heartbeat(vehicle, type=2):
+    vehicle.notify_message("HEARTBEAT", SimpleNamespace(type=type, autopilot=3, system_status="ACTIVE"))
+
+
+def _message(vehicle, seq=None):
+    msg = vehicle._imu()
+    if seq is not None:
+        msg.get_seq = lambda: seq
+        msg.get_srcSystem = lambda: 1
+        msg.get_srcComponent = lambda: 1
+    vehicle.notify_message("RAW_IMU", msg)
+
+
+def test_silent_link_escalates_to_expired(vehicle, watch):
+    watchdog, transitions = watch(link_timeout=0.05, heartbeat_timeout=0.15, lost_timeout=0.15)
+    vehicle.step()  # first step sends a heartbeat
+    transitions.wait_for(EXPIRED)
+    assert transitions.states == [DEGRADED, LOST, EXPIRED]
+    assert watchdog.status()["heartbeat_age"] >= 0.3
+
+
+def test_any_message_clears_a_degraded_link(vehicle, watch):
+    watchdog, transitions = watch(link_timeout=0.05, heartbeat_timeout=5.0, lost_timeout=5.0)
+    transitions.wait_for(DEGRADED)
+    _message(vehicle)
+    assert watchdog.state == OK
+    assert transitions.states == [DEGRADED, OK]
+
+
+def test_lost_link_needs_a_vehicle_heartbeat(vehicle, watch):
+    watchdog, transitions = watch(link_timeout=0.5, heartbeat_timeout=0.1, lost_timeout=5.0)
+    # the IMU stream keeps flowing, only heartbeats are missing
+    deadline = time.monotonic() + 2.0
+    while watchdog.state != LOST and time.monotonic() < deadline:
+        _message(vehicle)
+        time.sleep(0.01)
+    assert transitions.states == [LOST]
+
+    _message(vehicle)
+    _heartbeat(vehicle, type=6)  # a ground station on the same link does not count
+    assert watchdog.state == LOST
+
+    vehicle.step()
+    assert watchdog.state == OK
+    assert transitions.states == [LOST, OK]
+
+
+def test_counts_sequence_gaps(vehicle, watch):
+    watchdog, _ = watch(link_timeout=5.0, heartbeat_timeout=5.0, lost_timeout=5.0)
+    for seq in (250, 251, 252, 255, 0, 1):  # 253, 254 missing, then the counter wraps
+        _message(vehicle, seq)
+    _message(vehicle, 0)  # a duplicate is not a loss of 255 messages
+
+    status = watchdog.status()
+    assert status["received"] == 7
+    assert status["dropped"] == 2
+    assert status["loss_pct"] == pytest.approx(100 * 2 / 9, abs=0.01)
+
+
+def test_heartbeat_rate(vehicle, watch):
+    watchdog, _ = watch(link_timeout=5.0, heartbeat_timeout=5.0, lost_timeout=5.0)
+    for _ in range(5):
+        _heartbeat(vehicle)
+        time.sleep(0.05)
+    status = watchdog.status()
+    assert 5.0 < status["heartbeat_rate_hz"] < 25.0
+    assert status["state"] == OK
@@ -0,0 +1,54 @@
+import pytest
+
+from mission.mission_io import (
+    MAV_CMD_NAV_WAYPOINT, MAV_FRAME_GLOBAL, MAV_FRAME_GLOBAL_RELATIVE_ALT, WPL_HEADER,
+    Mission, WplParseError, read_wpl, write_wpl,
+)
+
+WAYPOINTS = [[28.5104, 77.37, 10.0], [28.5110, 77.3712, 15.5], [28.5121, 77.3698, 20.0]]
+
+
+def test_wpl_round_trip(tmp_path):
+    mission = Mission.from_waypoints(WAYPOINTS)
+    mission.append(MAV_FRAME_GLOBAL_RELATIVE_ALT, 21, 28.5104, 77.37, 0.0, params=(0, 0, 0, 1.5), autocontinue=0)
+
+    loaded = read_wpl(write_wpl(tmp_path / "plan.waypoints", mission))
+    assert len(loaded) == len(mission) == len(WAYPOINTS) + 2
+    assert list(loaded) == list(mission)
+    assert loaded.waypoint(2) == pytest.approx(tuple(WAYPOINTS[1]))
+
+
+def test_home_item_comes_first():
+    mission = Mission.from_waypoints(WAYPOINTS)
+    assert mission.current[0] == 1
+    assert mission.frame[0] == MAV_FRAME_GLOBAL
+    assert mission.waypoint(0) == mission.waypoint(1)
+    assert all(command == MAV_CMD_NAV_WAYPOINT for command in mission.command)
+
+
+def test_autocontinue_column_is_optional(tmp_path):
+    path = tmp_path / "old.waypoints"
+    path.write_text(f"{WPL_HEADER}\n0\t1\t0\t16\t0\t0\t0\t0\t28.5104000\t77.3700000\t0\n")
+    mission = read_wpl(path)
+    assert len(mission) == 1
+    assert mission.autocontinue[0] == 1
+
+
+def test_bad_column_count_names_the_line(tmp_path):
+    path = tmp_path / "broken.waypoints"
+    path.write_text(f"{WPL_HEADER}\n0\t1\t0\t16\t0\t0\t0\t0\t28.5104\t77.37\t0\t1\n\n1\t0\t3\t16\t0\n")
+    with pytest.raises(WplParseError, match="expected 11 or 12 tab separated columns, got 5") as error:
+        read_wpl(path)
+    assert error.value.line_no == 4
+
+
+def test_bad_number_and_header(tmp_path):
+    path = tmp_path / "nan.waypoints"
+    path.write_text(f"{WPL_HEADER}\n0\t1\t0\t16\t0\t0\t0\t0\tnorth\t77.37\t0\t1\n")
+    with pytest.raises(WplParseError, match="invalid number") as error:
+        read_wpl(path)
+    assert error.value.line_no == 2
+
+    path.write_text("QGC WPL 100\n")
+    with pytest.raises(WplParseError, match="header"):
+        read_wpl(path)
@@ -0,0 +1,125 @@
+# mission upload handshake against a scripted autopilot, the messages go through a real CommandDispatcher
+
+import threading
+from collections import defaultdict
+from types import SimpleNamespace
+
+import pytest
+
+from adapters.dronekit_adapter.dispatcher import CommandDispatcher
+from adapters.dronekit_adapter.mission_transfer import MissionTransfer, MissionTransferError, mission_checksum, wire_item
+from mission.mission_io import Mission
+
+WAYPOINTS = [[28.5104, 77.37, 10.0], [28.5110, 77.3712, 15.3], [28.5121, 77.3698, 20.7]]
+
+
+class FakeAutopilot:
+    """
+    Answers the mission protocol from its own thread like an autopilot would. store_count overrides
+    the count it reports back, skip holds item numbers it never requests, drop loses the first
+    transmission of those items.
+    """
+
+    def __init__(self, store_count=None, skip=(), drop=(), reject=None):
+        self.listeners = defaultdict(list)
+        self.message_factory = self
+        self.stored = {}
+        self.count = 0
+        self.store_count = store_count
+        self.skip = set(skip)
+        self.drop = set(drop)
+        self.reject = reject
+
+    def add_message_listener(self, name, fn):
+        self.listeners[name].append(fn)
+
+    def remove_message_listener(self, name, fn):
+        self.listeners[name].remove(fn)
+
+    def _send(self, name, **fields):
+        msg = SimpleNamespace(**fields)
+        threading.Timer(0.001, lambda: [fn(self, name, msg) for fn in list(self.listeners[name])]).start()
+
+    def _request(self, seq):
+        while seq in self.skip:
+            seq += 1
+        if seq < self.count:
+            self._send("MISSION_REQUEST_INT", seq=seq)
+        else:
+            self._send("MISSION_ACK", type=0)
+
+    # message_factory
+
+    def mission_count_send(self, target_system, target_component, count):
+        self.count = count
+        if self.reject is not None:
+            self._send("MISSION_ACK", type=self.reject)
+        else:
+            self._request(0)
+
+    def mission_item_int_send(self, target_system, target_component, seq, *item):
+        if seq in self.drop:
+            self.drop.discard(seq)
+            return
+        self.stored[seq] = item
+        self._request(seq + 1)
+
+    def mission_request_list_send(self, target_system, target_component):
+        self._send("MISSION_COUNT", count=len(self.stored) if self.store_count is None else self.store_count)
+
+    def mission_ack_send(self, target_system, target_component, type):
+        pass
+
+
+@pytest.fixture
+def upload():
+    links = []
+
+    def run(autopilot, items, max_retries=3):
+        link = CommandDispatcher(autopilot)
+        link.start()
+        links.append(link)
+        return MissionTransfer(autopilot, link, items, item_timeout=0.1, max_retries=max_retries).run()
+
+    yield run
+    for link in links:
+        link.stop()
+
+
+def test_accepted_upload_matches_the_plan(upload):
+    mission = Mission.from_waypoints(WAYPOINTS)
+    autopilot = FakeAutopilot()
+    checksum = upload(autopilot, mission)
+
+    assert checksum == mission_checksum([wire_item(item) for item in mission])
+    assert [autopilot.stored[seq] for seq in range(len(mission))] == [wire_item(item) for item in mission]
+
+
+def test_lost_item_is_sent_again(upload):
+    mission = Mission.from_waypoints(WAYPOINTS)
+    autopilot = FakeAutopilot(drop={2})
+    assert upload(autopilot, mission) == mission_checksum([wire_item(item) for item in mission])
+    assert len(autopilot.stored) == len(mission)
+
+
+def test_reported_count_mismatch_fails(upload):
+    autopilot = FakeAutopilot(store_count=len(WAYPOINTS))  # one short, home is item 0
+    with pytest.raises(MissionTransferError, match="holds 3 items, 4 were planned"):
+        upload(autopilot, Mission.from_waypoints(WAYPOINTS))
+
+
+def test_item_never_requested_fails(upload):
+    with pytest.raises(MissionTransferError, match=r"never requested items \[2\]"):
+        upload(FakeAutopilot(skip={2}), Mission.from_waypoints(WAYPOINTS))
+
+
+def test_rejected_count_fails(upload):
+    with pytest.raises(MissionTransferError, match="rejected"):
+        upload(FakeAutopilot(reject=4), Mission.from_waypoints(WAYPOINTS))
+
+
+def test_silent_autopilot_times_out(upload):
+    autopilot = FakeAutopilot()
+    autopilot.mission_count_send = lambda *args: None
+    with pytest.raises(MissionTransferError, match="timed out"):
+        upload(autopilot, Mission.from_waypoints(WAYPOINTS), max_retries=1)
@@ -0,0 +1,109 @@
+# the mock vehicle is stepped by hand here, so every assertion happens at a known simulation tick
+
+from types import SimpleNamespace
+
+import pytest
+from dronekit import VehicleMode
+
+from adapters.virtual_adapter.mock_vehicle import MockVehicle
+from core.utils.geo import haversine
+
+RATE_HZ = 20
+
+
+@pytest.fixture
+def vehicle():
+    return MockVehicle({"rate_hz": RATE_HZ, "mode_delay": 0.2, "arm_delay": 0.5, "climb_rate": 2.5, "land_rate": 1.0})
+
+
+def _run(vehicle, seconds):
+    for _ in range(int(round(seconds * RATE_HZ))):
+        vehicle.step()
+
+
+def _until(vehicle, condition, seconds):
+    for tick in range(int(seconds * RATE_HZ)):
+        if condition():
+            return tick
+        vehicle.step()
+    raise AssertionError(f"condition not met within {seconds} s of simulation")
+
+
+def _arm_in_guided(vehicle):
+    vehicle.mode = VehicleMode("GUIDED")
+    _run(vehicle, 0.2)
+    vehicle.armed = True
+    _run(vehicle, 0.5)
+    assert vehicle.armed
+
+
+def test_mode_switch_and_arming_take_the_configured_ticks(vehicle):
+    vehicle.mode = VehicleMode("GUIDED")
+    assert vehicle.mode.name == "STABILIZE"
+    assert _until(vehicle, lambda: vehicle.mode.name == "GUIDED", 1.0) == 4
+
+    vehicle.armed = True
+    assert _until(vehicle, lambda: vehicle.armed, 2.0) == 10
+    assert vehicle.system_status.state == "ACTIVE"
+
+    vehicle.armed = False  # disarm is immediate
+    assert not vehicle.armed
+
+
+def test_refuses_to_arm_outside_armable_modes(vehicle):
+    vehicle.mode = VehicleMode("LAND")
+    _run(vehicle, 0.2)
+    vehicle.armed = True
+    _run(vehicle, 1.0)
+    assert not vehicle.armed
+
+
+def test_takeoff_climbs_to_the_target_altitude(vehicle):
+    vehicle.simple_takeoff(10)  # ignored while disarmed
+    _run(vehicle, 1.0)
+    assert vehicle.location.global_relative_frame.alt == 0.0
+
+    _arm_in_guided(vehicle)
+    vehicle.simple_takeoff(10)
+    _run(vehicle, 2.0)
+    assert vehicle.location.global_relative_frame.alt == pytest.approx(5.0)
+    _run(vehicle, 3.0)
+    assert vehicle.location.global_relative_frame.alt == pytest.approx(10.0)
+    assert vehicle.velocity[2] == 0.0
+
+
+def test_goto_rtl_and_land(vehicle):
+    _arm_in_guided(vehicle)
+    home = vehicle.home
+    target = SimpleNamespace(lat=home[0] + 0.0005, lon=home[1], alt=20.0)  # ~56 m north
+    vehicle.simple_goto(target, groundspeed=5)
+    _until(vehicle, lambda: haversine(vehicle.location.global_relative_frame.lat,
+                                      vehicle.location.global_relative_frame.lon, target.lat, target.lon) < 0.1, 20.0)
+    assert vehicle.location.global_relative_frame.alt == pytest.approx(20.0)
+
+    vehicle.mode = VehicleMode("RTL")
+    _until(vehicle, lambda: vehicle.mode.name == "LAND", 30.0)
+    here = vehicle.location.global_relative_frame
+    assert haversine(here.lat, here.lon, *home) < 0.1
+
+    _until(vehicle, lambda: not vehicle.armed, 30.0)
+    assert vehicle.location.global_relative_frame.alt == 0.0
+    assert vehicle.system_status.state == "STANDBY"
+
+
+def test_listeners_and_battery(vehicle):
+    seen = []
+    vehicle.add_attribute_listener("armed", lambda v, name, value: seen.append(value))
+    messages = []
+    vehicle.add_message_listener("RAW_IMU", lambda v, name, msg: messages.append(msg))
+
+    _arm_in_guided(vehicle)
+    assert seen == [True]
+    assert len(messages) == int(0.7 * RATE_HZ)
+
+    _run(vehicle, 60.0)
+    assert vehicle.battery.level == 95  # a 20 minute pack, one minute armed
+    assert vehicle.battery.current == 15.0
+    vehicle.armed = False
+    vehicle.step()
+    assert vehicle.battery.current == 0.0
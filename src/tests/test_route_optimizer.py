@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from mission.route_optimizer import distance_matrix, optimize_route, route_length
+
+
+def _random_points(seed, n):
+    rng = random.Random(seed)
+    return [[28.51 + rng.uniform(-0.01, 0.01), 77.37 + rng.uniform(-0.01, 0.01), 20.0] for _ in range(n)]
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("fixed_end", [False, True])
+def test_never_longer_than_the_input(seed, fixed_end):
+    points = _random_points(seed, 5 + seed * 3)
+    result = optimize_route(points, fixed_end=fixed_end, time_budget=0.2)
+
+    assert result["optimized_length"] <= result["original_length"]
+    assert sorted(result["order"]) == list(range(len(points)))
+    assert result["order"][0] == 0
+    if fixed_end:
+        assert result["order"][-1] == len(points) - 1
+
+    # the reported length is the length of the returned route
+    dist = distance_matrix(points)
+    assert route_length(dist, result["order"]) == pytest.approx(result["optimized_length"], abs=0.1)
+    assert result["waypoints"] == [points[i] for i in result["order"]]
+
+
+def test_untangles_a_crossing_route():
+    # corners of a square visited diagonally, the optimizer walks the perimeter instead
+    square = [[28.510, 77.370, 10], [28.511, 77.371, 10], [28.510, 77.371, 10], [28.511, 77.370, 10]]
+    result = optimize_route(square)
+    assert result["saved"] > 0
+    assert result["saved_pct"] > 0
+
+
+def test_short_routes_are_returned_as_they_are():
+    points = _random_points(1, 2)
+    result = optimize_route(points)
+    assert result["order"] == [0, 1]
+    assert result["saved"] == 0.0
+    assert optimize_route([])["order"] == []
@@ -0,0 +1,67 @@
+import math
+
+import numpy as np
+import pytest
+
+from mission.survey import plan_survey, polygon_area, to_enu
+
+# roughly 200 m x 100 m around the mock vehicle's home
+FIELD = [[28.5100, 77.3700], [28.5100, 77.3720], [28.5109, 77.3720], [28.5109, 77.3700]]
+
+
+def _enu(result, lat0, lon0):
+    points = np.asarray(result["waypoints"])
+    return to_enu(points[:, 0], points[:, 1], lat0, lon0)
+
+
+def test_passes_cover_the_polygon():
+    result = plan_survey(FIELD, altitude=30, footprint=20, overlap=0.2, heading=90)
+    lat0, lon0 = np.mean(FIELD, axis=0)
+    x, y = to_enu(np.array(FIELD)[:, 0], np.array(FIELD)[:, 1], lat0, lon0)
+    width = y.max() - y.min()
+
+    assert result["spacing"] == pytest.approx(16.0)
+    assert result["passes"] == math.ceil(width / result["spacing"])
+    assert len(result["waypoints"]) == 2 * result["passes"]  # convex field, one leg per pass
+    assert all(wp[2] == 30.0 for wp in result["waypoints"])
+
+    # every leg stays inside the outline and runs east / west
+    px, py = _enu(result, lat0, lon0)
+    assert px.min() >= x.min() - 0.5 and px.max() <= x.max() + 0.5
+    assert py.min() >= y.min() - 0.5 and py.max() <= y.max() + 0.5
+    assert np.allclose(py[0::2], py[1::2], atol=0.01)
+
+    # neighbouring passes are one spacing apart and no stripe of the field is left out
+    lines = np.unique(np.round(py, 2))
+    assert np.allclose(np.diff(lines), result["spacing"], atol=0.01)
+    assert lines.min() - y.min() <= result["spacing"] and y.max() - lines.max() <= result["spacing"]
+
+
+def test_boustrophedon_alternates_direction():
+    result = plan_survey(FIELD, altitude=30, footprint=20, heading=90)
+    lat0, lon0 = np.mean(FIELD, axis=0)
+    px, _ = _enu(result, lat0, lon0)
+    directions = np.sign(px[1::2] - px[0::2])
+    assert np.all(directions[1:] == -directions[:-1])
+
+
+def test_area_and_start_corner():
+    result = plan_survey(FIELD, altitude=30, footprint=20, start=FIELD[2])
+    lat0, lon0 = np.mean(FIELD, axis=0)
+    x, y = to_enu(np.array(FIELD)[:, 0], np.array(FIELD)[:, 1], lat0, lon0)
+    assert result["area"] == pytest.approx(polygon_area(x, y), abs=0.1)
+
+    first = result["waypoints"][0]
+    corners = [math.dist(first[:2], corner) for corner in FIELD]
+    assert int(np.argmin(corners)) == 2
+
+
+@pytest.mark.parametrize("polygon, footprint, overlap", [
+    ([[28.51, 77.37], [28.52, 77.37]], 20, 0.2),
+    (FIELD, 0, 0.2),
+    (FIELD, 20, 1.0),
+    ([[28.51, 77.37], [28.511, 77.37], [28.512, 77.37]], 20, 0.2),  # no width across the passes
+])
+def test_rejects_bad_input(polygon, footprint, overlap):
+    with pytest.raises(ValueError):
+        plan_survey(polygon, altitude=30, footprint=footprint, overlap=overlap)
@@ -0,0 +1,81 @@
+import math
+import struct
+
+import pytest
+
+from models import telemetry_codec
+from models.telemetry_codec import FRAME_SIZE, HEADER, SCHEMA_CRC, decode, describe_schema, encode
+
+SNAPSHOT = {
+    "nav": {"latitude": 28.5104123, "longitude": 77.3700456, "altitude": 12.5, "groundspeed": 4.0,
+            "airspeed": None, "climbrate": -0.5},
+    "attitude": {"yaw": 1.25, "pitch": 0.0, "roll": -0.125, "tilt": 0.5},
+    "gps": {"fixtype": 3, "satellites": 12, "gpsaltitude": 210.0},
+    "system": {"flight_mode": "GUIDED", "armed": True, "ekfstatus": False},
+    "battery": {"voltage": 16.5, "current": 15.0, "level": 97},
+    "imu": {"acceleration": {"x": 0.0, "y": 0.0, "z": -9.75},
+            "gyroscope": {"x": 0.0, "y": 0.0, "z": 0.0},
+            "magnetometer": {"x": 0.25, "y": 0.0, "z": -0.5}},
+}
+
+
+def test_round_trip():
+    frame = encode(SNAPSHOT, seq=42, timestamp=1700000000.5, vehicle_id="drone-7")
+    assert len(frame) == FRAME_SIZE
+
+    decoded = decode(frame)
+    assert decoded["seq"] == 42
+    assert decoded["timestamp"] == 1700000000.5
+    assert decoded["vehicle_id"] == "drone-7"
+
+    telemetry = decoded["telemetry"]
+    assert telemetry["nav"]["latitude"] == SNAPSHOT["nav"]["latitude"]  # doubles survive exactly
+    assert telemetry["nav"]["altitude"] == 12.5
+    assert telemetry["system"] == {"flight_mode": "GUIDED", "armed": True, "ekfstatus": False}
+    assert telemetry["gps"]["satellites"] == 12
+    assert telemetry["battery"]["level"] == 97
+    assert telemetry["imu"]["acceleration"]["z"] == -9.75
+
+
+def test_missing_values_decode_to_none():
+    decoded = decode(encode({"nav": {"altitude": 3.0}}, vehicle_id="v"))["telemetry"]
+    assert decoded["nav"]["altitude"] == 3.0
+    assert decoded["nav"]["airspeed"] is None
+    assert decoded["gps"]["fixtype"] is None
+    assert decoded["system"]["armed"] is None
+    assert decoded["system"]["flight_mode"] == ""
+
+
+def test_sequence_wraps_at_32_bits():
+    assert decode(encode(SNAPSHOT, seq=2 ** 32 + 5))["seq"] == 5
+
+
+def test_rejects_foreign_frames():
+    frame = bytearray(encode(SNAPSHOT))
+    frame[:2] = b"XX"
+    with pytest.raises(ValueError, match="Not a telemetry frame"):
+        decode(bytes(frame))
+
+
+def test_rejects_stale_schema():
+    frame = encode(SNAPSHOT, seq=1, timestamp=1.0, vehicle_id="v")
+    magic, version, crc, seq, timestamp, vehicle_id = HEADER.unpack_from(frame, 0)
+    stale = HEADER.pack(magic, version, crc ^ 1, seq, timestamp, vehicle_id) + frame[HEADER.size:]
+    with pytest.raises(ValueError, match="schema mismatch"):
+        decode(stale)
+
+
+def test_describe_schema_matches_the_frame():
+    schema = describe_schema()
+    assert schema["version"] == telemetry_codec.SCHEMA_VERSION
+    assert schema["crc"] == SCHEMA_CRC
+
+    # a client decoding with only the description gets the same values as decode()
+    frame = encode(SNAPSHOT)
+    for field in schema["fields"]:
+        value, = struct.unpack_from("<" + field["format"], frame, field["offset"])
+        expected = telemetry_codec.lookup(SNAPSHOT, field["group"], field["field"])
+        if field["format"] == "f" and expected is not None:
+            assert math.isclose(value, expected, rel_tol=1e-6)
+    last = schema["fields"][-1]
+    assert last["offset"] + last["size"] == FRAME_SIZE